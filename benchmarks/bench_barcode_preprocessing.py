@@ -0,0 +1,265 @@
+"""
+Throughput benchmark of `openst barcode_preprocessing` (flow cell stage).
+
+Generates (or reuses) a synthetic FASTQ, then reports reads/sec and peak RSS for
+    - the end-to-end `process_multiple_unsorted_tiles`, for every --num-workers value;
+    - a serial, per-phase breakdown: decompress, parse (read IDs), preprocess (crop/reverse complement), write.
+
+Every measurement runs in a fresh process, so that peak RSS values are not inherited between runs.
+The peak RSS is summed over the measuring process and its worker processes (sampled from /proc).
+
+Example:
+    python benchmarks/bench_barcode_preprocessing.py --n-reads 5000000 --num-workers 1 4 8 --json-out bench.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_fastq import write_synthetic_fastq  # noqa: E402
+
+
+def _peak_rss_mb() -> float:
+    # peak of this process or of its largest (single) child; ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    _scale = 1 / 1024 if sys.platform != "darwin" else 1 / 1024**2
+    peak_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(peak_self, peak_children) * _scale
+
+
+def _process_tree_rss_kb(pid: int) -> int:
+    """Summed RSS (VmRSS, in kilobytes) of a process and all its descendants, read from /proc."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # the command name (2nd field) is in parentheses and may contain spaces
+                parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue  # the process exited in the meantime
+
+    tree, pending = [], [pid]
+    while pending:
+        tree.append(pending.pop())
+        pending.extend(child for child, parent in parents.items() if parent == tree[-1])
+
+    rss_kb = 0
+    for tree_pid in tree:
+        try:
+            with open(f"/proc/{tree_pid}/status") as f:
+                rss_kb += next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), 0)
+        except OSError:
+            continue
+    return rss_kb
+
+
+class _PeakRssSampler:
+    """
+    Samples the summed RSS of this process and all its descendants (e.g., pool workers) in a background thread.
+    Without /proc (e.g., macOS), falls back to `_peak_rss_mb`, the peak of this process or its largest child.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while True:
+            self.peak_kb = max(self.peak_kb, _process_tree_rss_kb(os.getpid()))
+            if self._stop.wait(self.interval):
+                break
+
+    def __enter__(self):
+        if os.path.isdir("/proc"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    @property
+    def peak_rss_mb(self) -> float:
+        return self.peak_kb / 1024 if self.peak_kb else _peak_rss_mb()
+
+
+def _run_end_to_end(in_fastq: str, out_path: str, num_workers: int, out_format: str, crop_seq: slice) -> dict:
+    from openst.preprocessing.barcode_preprocessing import OUT_FORMAT_SUFFIXES, process_multiple_unsorted_tiles
+
+    start = time.perf_counter()
+    process_multiple_unsorted_tiles(
+        in_fastq=in_fastq,
+        out_path=out_path,
+        out_prefix="",
+        out_suffix=OUT_FORMAT_SUFFIXES[out_format],
+        crop_seq_slice=crop_seq,
+        rev_comp=True,
+        num_workers=num_workers,
+        out_format=out_format,
+    )
+    return {"seconds": time.perf_counter() - start}
+
+
+def _run_phases(in_fastq: str, out_path: str, out_format: str, crop_seq: slice) -> dict:
+    import numpy as np
+
+    from openst.preprocessing import barcode_preprocessing as bp
+
+    seconds = {"decompress": 0.0, "parse": 0.0, "preprocess": 0.0, "write": 0.0}
+    n_reads = 0
+
+    chunks = bp.read_fastq_blocks(bp.read_fastq_chunks(in_fastq))
+    with bp.TileWriterPool(
+        out_path=out_path,
+        out_prefix="",
+        out_suffix=bp.OUT_FORMAT_SUFFIXES[out_format],
+        out_format=out_format,
+    ) as writer_pool:
+        while True:
+            t = time.perf_counter()
+            block = next(chunks, None)
+            seconds["decompress"] += time.perf_counter() - t
+            if block is None:
+                break
+
+            t = time.perf_counter()
+            buf = np.frombuffer(block[0], dtype=np.uint8)
+            line_starts, line_ends = bp._line_bounds(buf)
+            n_block = len(line_starts) // 4
+            tile_info = bp.parse_tile_info(buf, line_starts[0::4][:n_block], line_ends[0::4][:n_block])
+            seconds["parse"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            barcodes = bp.preprocess_sequences(
+                buf,
+                line_starts[1::4][:n_block],
+                line_ends[1::4][:n_block],
+                crop_seq_slice=crop_seq,
+                rev_comp=True,
+            )
+            seconds["preprocess"] += time.perf_counter() - t
+
+            t = time.perf_counter()
+            lane_tile = tile_info[:, :2]
+            run_bounds = np.flatnonzero(np.any(lane_tile[1:] != lane_tile[:-1], axis=1)) + 1
+            run_bounds = np.concatenate([[0], run_bounds, [n_block]])
+            for s, e in zip(run_bounds[:-1], run_bounds[1:]):
+                writer_pool.append(
+                    lane=lane_tile[s, 0],
+                    tile=lane_tile[s, 1],
+                    barcodes=barcodes[s:e],
+                    xs=tile_info[s:e, 2],
+                    ys=tile_info[s:e, 3],
+                )
+            seconds["write"] += time.perf_counter() - t
+
+            n_reads += n_block
+
+        t = time.perf_counter()
+    seconds["write"] += time.perf_counter() - t  # remaining buffers are written on close
+
+    return {"seconds": seconds, "n_reads": n_reads}
+
+
+def _with_peak_rss(fn, *args) -> dict:
+    with _PeakRssSampler() as rss:
+        result = fn(*args)
+    result["peak_rss_mb"] = rss.peak_rss_mb
+    return result
+
+
+def _in_fresh_process(fn, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(_with_peak_rss, fn, *args).result()
+
+
+def get_benchmark_parser():
+    parser = argparse.ArgumentParser(description="Benchmark barcode_preprocessing throughput", allow_abbrev=False)
+    parser.add_argument(
+        "--fastq-in",
+        type=str,
+        default=None,
+        help="Existing FASTQ to benchmark on. If not set, a synthetic one is generated (see options below)",
+    )
+    parser.add_argument("--n-reads", type=int, default=2_000_000, help="Reads of the synthetic FASTQ")
+    parser.add_argument("--n-tiles", type=int, default=32, help="Tiles of the synthetic FASTQ")
+    parser.add_argument("--mean-run-length", type=float, default=1000, help="Tile interleaving of the synthetic FASTQ")
+    parser.add_argument("--bgzf", action="store_true", help="Write the synthetic FASTQ as BGZF")
+    parser.add_argument("--num-workers", type=int, nargs="+", default=[1, 4], help="Worker counts to benchmark")
+    parser.add_argument("--out-format", type=str, default="tsv", help="Output format of the tile files")
+    parser.add_argument("--crop-seq", type=str, default="2:27", help="Slice used to crop the barcodes")
+    parser.add_argument("--tmp-dir", type=str, default=None, help="Where temporary inputs/outputs are written")
+    parser.add_argument("--json-out", type=str, default=None, help="(Optional) Write the results as json")
+    return parser
+
+
+def main(args):
+    crop_seq = slice(*[None if x == "" else int(x) for x in (args.crop_seq.split(":") + ["", "", ""])[:3]])
+    tmp_dir = tempfile.mkdtemp(dir=args.tmp_dir, prefix="openst_bench_")
+    results = {"args": vars(args)}
+
+    try:
+        in_fastq = args.fastq_in
+        if in_fastq is None:
+            in_fastq = os.path.join(tmp_dir, "synthetic_R1.fastq.gz")
+            t = time.perf_counter()
+            write_synthetic_fastq(
+                in_fastq,
+                bgzf=args.bgzf,
+                n_reads=args.n_reads,
+                n_tiles=args.n_tiles,
+                mean_run_length=args.mean_run_length,
+            )
+            print(f"Generated {args.n_reads} reads in {time.perf_counter() - t:.1f} s ({in_fastq})")
+        results["fastq_size_mb"] = os.stat(in_fastq).st_size / 1024**2
+
+        out_path = os.path.join(tmp_dir, "phases")
+        os.makedirs(out_path)
+        phases = _in_fresh_process(_run_phases, in_fastq, out_path, args.out_format, crop_seq)
+        n_reads = phases["n_reads"]
+        results["n_reads"] = n_reads
+        results["phases"] = phases
+        print(f"\nPer-phase breakdown (serial, {n_reads} reads, peak RSS {phases['peak_rss_mb']:.0f} MB)")
+        for phase, seconds in phases["seconds"].items():
+            print(f"    {phase:<12}{seconds:8.2f} s {n_reads / max(seconds, 1e-9):14,.0f} reads/s")
+
+        results["end_to_end"] = {}
+        print("\nEnd to end (process_multiple_unsorted_tiles)")
+        for num_workers in args.num_workers:
+            out_path = os.path.join(tmp_dir, f"workers_{num_workers}")
+            os.makedirs(out_path)
+            run = _in_fresh_process(_run_end_to_end, in_fastq, out_path, num_workers, args.out_format, crop_seq)
+            run["reads_per_second"] = n_reads / run["seconds"]
+            results["end_to_end"][num_workers] = run
+            print(
+                f"    num_workers={num_workers:<4}{run['seconds']:8.2f} s "
+                f"{run['reads_per_second']:14,.0f} reads/s   peak RSS {run['peak_rss_mb']:.0f} MB"
+            )
+            shutil.rmtree(out_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.json_out is not None:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return results
+
+
+if __name__ == "__main__":
+    main(get_benchmark_parser().parse_args())
@@ -0,0 +1,155 @@
+"""
+Generates synthetic Illumina FASTQ files (read 1 of an Open-ST capture area library) for benchmarking
+`openst barcode_preprocessing`.
+
+Read IDs follow the Illumina format (see https://help.basespace.illumina.com/files-used-by-basespace/fastq-files):
+    @<instrument>:<run>:<flowcell>:<lane>:<tile>:<x>:<y> <read>:<is_filtered>:<control>:<index>
+
+Reads are emitted in runs of consecutive reads from the same (lane, tile); the run lengths follow a geometric
+distribution with mean `--mean-run-length`. Small values interleave tiles (worst case for the writers),
+large values mimic tile-sorted output from bcl2fastq.
+"""
+
+import argparse
+import gzip
+import struct
+import zlib
+
+import numpy as np
+
+# BGZF members hold at most 64 KiB (compressed), so the uncompressed payload is kept slightly below
+_BGZF_MAX_PAYLOAD = 65280
+_BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def novaseq_tile_ids(n_tiles: int) -> list[int]:
+    """Tile numbers as <surface><swath><tile>, e.g., 1101...2678 for a NovaSeq S4 flow cell lane."""
+    tiles = [
+        surface * 1000 + swath * 100 + tile for surface in (1, 2) for swath in range(1, 7) for tile in range(1, 79)
+    ]
+    if n_tiles > len(tiles):
+        raise ValueError(f"A lane has at most {len(tiles)} tiles")
+    return tiles[:n_tiles]
+
+
+def generate_fastq_records(
+    n_reads: int,
+    n_lanes: int = 1,
+    n_tiles: int = 16,
+    mean_run_length: float = 1000,
+    read_length: int = 50,
+    n_base_rate: float = 0.001,
+    batch_size: int = 100_000,
+    seed: int = 0,
+):
+    """
+    Yields FASTQ records (as bytes) in batches of up to `batch_size` reads.
+    """
+    rng = np.random.default_rng(seed)
+    lane_tiles = [(lane, tile) for lane in range(1, n_lanes + 1) for tile in novaseq_tile_ids(n_tiles)]
+    bases = np.frombuffer(b"ACGT", dtype=np.uint8)
+    quality = b"F" * read_length
+
+    curr_tile = rng.integers(len(lane_tiles))
+    remaining_in_run = rng.geometric(1 / max(mean_run_length, 1))
+    n_written = 0
+    while n_written < n_reads:
+        n_batch = min(batch_size, n_reads - n_written)
+
+        tile_idx = np.empty(n_batch, dtype=np.int64)
+        i = 0
+        while i < n_batch:
+            run = min(remaining_in_run, n_batch - i)
+            tile_idx[i : i + run] = curr_tile
+            i += run
+            remaining_in_run -= run
+            if remaining_in_run == 0:
+                curr_tile = rng.integers(len(lane_tiles))
+                remaining_in_run = rng.geometric(1 / max(mean_run_length, 1))
+
+        xs = rng.integers(1000, 33000, n_batch)
+        ys = rng.integers(1000, 50000, n_batch)
+        seqs = bases[rng.integers(0, 4, (n_batch, read_length))]
+        seqs[rng.random((n_batch, read_length)) < n_base_rate] = ord("N")
+        seqs = seqs.view(f"S{read_length}").ravel().tolist()
+
+        yield b"".join(
+            [
+                b"@A00123:456:HXXXXXXXX:%d:%d:%d:%d 1:N:0:ACGTACGT\n%s\n+\n%s\n"
+                % (*lane_tiles[t], x, y, seq, quality)
+                for t, x, y, seq in zip(tile_idx.tolist(), xs.tolist(), ys.tolist(), seqs)
+            ]
+        )
+        n_written += n_batch
+
+
+def _bgzf_member(payload: bytes, compresslevel: int) -> bytes:
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    data = compressor.compress(payload) + compressor.flush()
+    return (
+        b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+        + struct.pack("<H", len(data) + 25)
+        + data
+        + struct.pack("<II", zlib.crc32(payload), len(payload))
+    )
+
+
+def write_synthetic_fastq(out: str, bgzf: bool = False, compresslevel: int = 6, **kwargs) -> None:
+    """
+    Writes a gzip (or BGZF, as written by `bgzip`) compressed synthetic FASTQ.
+    Keyword arguments are passed to `generate_fastq_records`.
+    """
+    if not bgzf:
+        with gzip.open(out, "wb", compresslevel=compresslevel) as f:
+            for records in generate_fastq_records(**kwargs):
+                f.write(records)
+        return
+
+    with open(out, "wb") as f:
+        pending = b""
+        for records in generate_fastq_records(**kwargs):
+            pending += records
+            n_full = len(pending) // _BGZF_MAX_PAYLOAD * _BGZF_MAX_PAYLOAD
+            for i in range(0, n_full, _BGZF_MAX_PAYLOAD):
+                f.write(_bgzf_member(pending[i : i + _BGZF_MAX_PAYLOAD], compresslevel))
+            pending = pending[n_full:]
+        if pending:
+            f.write(_bgzf_member(pending, compresslevel))
+        f.write(_BGZF_EOF)
+
+
+def get_synthetic_fastq_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Illumina FASTQ for benchmarking barcode_preprocessing",
+        allow_abbrev=False,
+    )
+    parser.add_argument("--out", type=str, required=True, help="Path of the output .fastq.gz")
+    parser.add_argument("--n-reads", type=int, default=1_000_000, help="Number of reads")
+    parser.add_argument("--n-lanes", type=int, default=1, help="Number of lanes")
+    parser.add_argument("--n-tiles", type=int, default=16, help="Number of tiles per lane")
+    parser.add_argument(
+        "--mean-run-length",
+        type=float,
+        default=1000,
+        help="Mean number of consecutive reads from the same tile (1 interleaves tiles on every read)",
+    )
+    parser.add_argument("--read-length", type=int, default=50, help="Length of the reads")
+    parser.add_argument("--n-base-rate", type=float, default=0.001, help="Fraction of 'N' base calls")
+    parser.add_argument("--bgzf", action="store_true", help="Write BGZF (block gzip) instead of plain gzip")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random number generator")
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_synthetic_fastq_parser().parse_args()
+    write_synthetic_fastq(
+        args.out,
+        bgzf=args.bgzf,
+        n_reads=args.n_reads,
+        n_lanes=args.n_lanes,
+        n_tiles=args.n_tiles,
+        mean_run_length=args.mean_run_length,
+        read_length=args.read_length,
+        n_base_rate=args.n_base_rate,
+        seed=args.seed,
+    )
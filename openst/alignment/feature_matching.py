@@ -1,14 +1,56 @@
 import logging
+import threading
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from itertools import product
 
 import numpy as np
-from skimage.measure import ransac
 from skimage.transform import SimilarityTransform
 
 SUPPORTED_MATCHING_METHODS = ["LoFTR", "SIFT", "KeyNet"]
 
 
+@lru_cache(maxsize=None)
+def _load_matcher_model(method: str, device: str, pretrained: str):
+    try:
+        import kornia.feature as KF
+    except ImportError:
+        raise ImportError(
+            """Optional modules need to be installed to run thi s feature.
+               Please run 'pip install kornia'"""
+        )
+
+    logging.info(f"Loading {method} model on '{device}'")
+    if method == "LoFTR":
+        return KF.LoFTR(pretrained=pretrained).to(device)
+    elif method == "KeyNet":
+        return KF.KeyNetAffNetHardNet(5000, True).eval().to(device)
+    else:
+        raise ValueError(f"Feature matching method '{method}' does not use a model")
+
+
+def get_matcher_model(method: str, device: str = "cpu", pretrained: str = "outdoor"):
+    """
+    Get the model of a feature matching method. Models are loaded once per process (and device),
+    and reused by all later calls, e.g., across flips, rotations and tiles.
+
+    Args:
+        method (str): 'LoFTR' or 'KeyNet'.
+        device (str, optional): Device where the model is kept. Default is 'cpu'.
+        pretrained (str, optional): Pretrained LoFTR model variant. Default is 'outdoor'.
+
+    Returns:
+        torch.nn.Module: The model, on 'device'.
+    """
+    return _load_matcher_model(method, str(device), pretrained if method == "LoFTR" else "")
+
+
+def clear_matcher_models():
+    """Release all models loaded by `get_matcher_model` (e.g., to free GPU memory)."""
+    _load_matcher_model.cache_clear()
+
+
 def _find_matches_loftr(im_0: np.ndarray, im_1: np.ndarray, pretrained: str = "outdoor", device: str = "cpu") -> tuple:
     """
     Find matching keypoints between two images using LoFTR.
@@ -29,7 +71,6 @@ def _find_matches_loftr(im_0: np.ndarray, im_1: np.ndarray, pretrained: str = "o
     """
 
     try:
-        import kornia.feature as KF
         import torch
     except ImportError:
         raise ImportError(
@@ -37,7 +78,7 @@ def _find_matches_loftr(im_0: np.ndarray, im_1: np.ndarray, pretrained: str = "o
                Please run 'pip install kornia'"""
         )
 
-    matcher = KF.LoFTR(pretrained=pretrained).to(device)
+    matcher = get_matcher_model("LoFTR", device, pretrained)
 
     input_dict = {
         "image0": torch.tensor(im_0.copy())[None, None].float().to(device),
@@ -77,7 +118,7 @@ def _find_matches_keynet(im_0: np.ndarray, im_1: np.ndarray, device: str = "cpu"
                Please run 'pip install kornia'"""
         )
 
-    feature = KF.KeyNetAffNetHardNet(5000, True).eval().to(device)
+    feature = get_matcher_model("KeyNet", device)
 
     input_dict = {
         "image0": torch.tensor(im_0)[None, None].float().to(device),
@@ -113,13 +154,61 @@ def _find_matches_keynet(im_0: np.ndarray, im_1: np.ndarray, device: str = "cpu"
     return mkpts1, mkpts2
 
 
-def _find_matches_sift(im_0: np.ndarray, im_1: np.ndarray, *args, **kwargs) -> tuple:
+def _sift_features(im: np.ndarray) -> tuple:
+    """SIFT keypoints and descriptors of an image."""
+    try:
+        from skimage.feature import SIFT
+    except ImportError:
+        raise ImportError(
+            """Could not find module scikit-image.
+                          Please run 'pip install scikit-image'"""
+        )
+    feat_descriptor = SIFT()
+    feat_descriptor.detect_and_extract(im)
+    return feat_descriptor.keypoints, feat_descriptor.descriptors
+
+
+class SIFTFeatureCache:
+    """
+    SIFT keypoints and descriptors, computed once per image and reused afterwards; e.g., the staining image
+    is the same for all flips and rotations of the pseudoimage in `match_images`.
+
+    Images are identified by their array object, so they must not be modified while the cache is in use.
+    Safe to use from several threads; concurrent requests of the same image wait for a single computation.
+    """
+
+    def __init__(self):
+        self._features = {}
+        self._lock = threading.Lock()
+
+    def get(self, im: np.ndarray) -> tuple:
+        """
+        Get the SIFT features of an image.
+
+        Args:
+            im (np.ndarray): Input image.
+
+        Returns:
+            tuple: (keypoints, descriptors) of the image.
+        """
+        with self._lock:
+            # The image is kept alive by the entry, so that its id is not reused
+            entry = self._features.setdefault(id(im), [im, threading.Lock(), None])
+        with entry[1]:
+            if entry[2] is None:
+                entry[2] = _sift_features(im)
+        return entry[2]
+
+
+def _find_matches_sift(im_0: np.ndarray, im_1: np.ndarray, features_cache: SIFTFeatureCache = None) -> tuple:
     """
     Find matching keypoints between two images using SIFT.
 
     Args:
         im_0 (np.ndarray): First input image.
         im_1 (np.ndarray): Second input image.
+        features_cache (SIFTFeatureCache, optional): Where the features of the images are looked up
+                                                     (and stored); by default, both are computed.
 
     Returns:
         tuple: A tuple containing two arrays:
@@ -129,26 +218,362 @@ def _find_matches_sift(im_0: np.ndarray, im_1: np.ndarray, *args, **kwargs) -> t
     Notes:
         - This function uses SIFT to find matching keypoints between two input images.
     """
+    from skimage.feature import match_descriptors
+
+    _features = features_cache.get if features_cache is not None else _sift_features
+    keypoints0, descriptors0 = _features(im_0)
+    keypoints1, descriptors1 = _features(im_1)
+
+    matches01 = match_descriptors(descriptors0, descriptors1, max_ratio=0.6, cross_check=True)
+
+    return keypoints0[matches01[:, 0]], keypoints1[matches01[:, 1]]
+
+
+def _stack_padded(images: list, device: str = "cpu"):
+    """Stack images of different shapes into a (B, 1, H, W) float tensor, zero-padded at the bottom/right."""
+    import torch
+
+    h = max(im.shape[0] for im in images)
+    w = max(im.shape[1] for im in images)
+    batch = torch.zeros((len(images), 1, h, w), dtype=torch.float32)
+    for i, im in enumerate(images):
+        batch[i, 0, : im.shape[0], : im.shape[1]] = torch.from_numpy(np.ascontiguousarray(im, dtype=np.float32))
+    return batch.to(device)
+
+
+def _find_matches_loftr_batch(pairs: list, pretrained: str = "outdoor", device: str = "cpu") -> list:
+    """
+    Find matching keypoints between several pairs of images using LoFTR, in a single forward pass.
+
+    Args:
+        pairs (list): List of (im_0, im_1) image pairs; images are zero-padded to the largest shape.
+        pretrained (str, optional): Pretrained LoFTR model variant. Default is 'outdoor'.
+
+    Returns:
+        list: (keypoints0, keypoints1) of every pair, as returned by `_find_matches_loftr`.
+              Matches on the padding are discarded.
+    """
     try:
-        from skimage.feature import SIFT, match_descriptors
+        import torch
     except ImportError:
         raise ImportError(
-            """Could not find module scikit-image.
-                          Please run 'pip install scikit-image'"""
+            """Optional modules need to be installed to run thi s feature.
+               Please run 'pip install kornia'"""
         )
-    feat_descriptor = SIFT()
 
-    feat_descriptor.detect_and_extract(im_0)
-    keypoints0 = feat_descriptor.keypoints
-    descriptors0 = feat_descriptor.descriptors
+    matcher = get_matcher_model("LoFTR", device, pretrained)
 
-    feat_descriptor.detect_and_extract(im_1)
-    keypoints1 = feat_descriptor.keypoints
-    descriptors1 = feat_descriptor.descriptors
+    input_dict = {
+        "image0": _stack_padded([im_0 for im_0, _ in pairs], device),
+        "image1": _stack_padded([im_1 for _, im_1 in pairs], device),
+    }
 
-    matches01 = match_descriptors(descriptors0, descriptors1, max_ratio=0.6, cross_check=True)
+    with torch.inference_mode():
+        correspondences = matcher(input_dict)
 
-    return keypoints0[matches01[:, 0]], keypoints1[matches01[:, 1]]
+    keypoints0 = correspondences["keypoints0"].cpu().numpy()
+    keypoints1 = correspondences["keypoints1"].cpu().numpy()
+    batch_indexes = correspondences["batch_indexes"].cpu().numpy()
+
+    matches = []
+    for i, (im_0, im_1) in enumerate(pairs):
+        _i = (
+            (batch_indexes == i)
+            & (keypoints0[:, 0] < im_0.shape[1])
+            & (keypoints0[:, 1] < im_0.shape[0])
+            & (keypoints1[:, 0] < im_1.shape[1])
+            & (keypoints1[:, 1] < im_1.shape[0])
+        )
+        matches.append((keypoints0[_i], keypoints1[_i]))
+
+    return matches
+
+
+def _find_matches_keynet_batch(pairs: list, device: str = "cpu") -> list:
+    """
+    Find matching keypoints between several pairs of images using KeyNet (AdaLAM matching).
+    Features are extracted once per distinct image (e.g., a source paired with several destinations),
+    in a single forward pass.
+
+    Args:
+        pairs (list): List of (im_0, im_1) image pairs; images are zero-padded to the largest shape.
+
+    Returns:
+        list: (keypoints0, keypoints1) of every pair, as returned by `_find_matches_keynet`.
+              Features on the padding are discarded.
+    """
+    try:
+        import kornia.feature as KF
+        import torch
+    except ImportError:
+        raise ImportError(
+            """Optional modules need to be installed to run thi s feature.
+               Please run 'pip install kornia'"""
+        )
+
+    feature = get_matcher_model("KeyNet", device)
+
+    images, image_index = [], {}
+    for pair in pairs:
+        for im in pair:
+            if id(im) not in image_index:
+                image_index[id(im)] = len(images)
+                images.append(im)
+
+    adalam_config = {"device": device}
+
+    with torch.inference_mode():
+        lafs, _, descs = feature(_stack_padded(images, device))
+
+        features = []
+        for i, im in enumerate(images):
+            centers = KF.get_laf_center(lafs[i : i + 1])[0]
+            _i = (centers[:, 0] < im.shape[1]) & (centers[:, 1] < im.shape[0])
+            features.append((lafs[i : i + 1, _i], descs[i, _i]))
+
+        matches = []
+        for im_0, im_1 in pairs:
+            lafs1, descs1 = features[image_index[id(im_0)]]
+            lafs2, descs2 = features[image_index[id(im_1)]]
+            hw = torch.tensor(im_0.shape[:2])  # as in '_find_matches_keynet'
+            _, idxs = KF.match_adalam(descs1, descs2, lafs1, lafs2, config=adalam_config, hw1=hw, hw2=hw)
+            matches.append(
+                (
+                    KF.get_laf_center(lafs1)[0][idxs[:, 0]].detach().cpu().numpy(),
+                    KF.get_laf_center(lafs2)[0][idxs[:, 1]].detach().cpu().numpy(),
+                )
+            )
+
+    return matches
+
+
+def _image_pairs(src: list, dst: list) -> list:
+    if type(src) is not list:
+        raise TypeError("'src' must be a list of images")
+
+    if type(dst) is not list:
+        raise TypeError("'dst' must be a list of images")
+
+    return [(_i_dst, _i_src) for _i_dst in dst for _i_src in src]
+
+
+def match_image_pairs(
+    pairs: list,
+    method: str = "LoFTR",
+    device: str = "cpu",
+    batch_size: int = 1,
+    features_cache: SIFTFeatureCache = None,
+) -> list:
+    """
+    Find matching keypoints between every pair of images.
+
+    Args:
+        pairs (list): List of (im_0, im_1) image pairs.
+        method (str, optional): Method (LoFTR, SIFT or KeyNet) used for feature detection and matching.
+        device (str, optional): Device used to run the feature matching model.
+        batch_size (int, optional): Number of pairs per forward pass (LoFTR and KeyNet).
+                                    Images of a batch are zero-padded to the same shape.
+        features_cache (SIFTFeatureCache, optional): Cache of SIFT features, for images matched repeatedly.
+
+    Returns:
+        list: (keypoints0, keypoints1) of every pair.
+    """
+    if method not in SUPPORTED_MATCHING_METHODS:
+        raise ValueError(f"Feature matching method '{method}' is not supported")
+
+    if batch_size > 1 and method in ["LoFTR", "KeyNet"]:
+        _find_matches_batch = _find_matches_loftr_batch if method == "LoFTR" else _find_matches_keynet_batch
+        matches = []
+        for i in range(0, len(pairs), batch_size):
+            matches += _find_matches_batch(pairs[i : i + batch_size], device=device)
+        return matches
+
+    matches = []
+    for _i_dst, _i_src in pairs:
+        if method == "LoFTR":
+            matches.append(_find_matches_loftr(_i_dst, _i_src, device=device))
+        elif method == "SIFT":
+            matches.append(_find_matches_sift(_i_dst, _i_src, features_cache))
+        elif method == 'KeyNet':
+            matches.append(_find_matches_keynet(_i_dst, _i_src, device=device))
+        else:
+            raise ValueError(f"Registration method {method} not supported")
+    return matches
+
+
+def _fit_similarity(src: np.ndarray, dst: np.ndarray) -> tuple:
+    """
+    Least-squares similarity transforms (rotation, uniform scale, translation) for a batch of point sets.
+
+    Args:
+        src (np.ndarray): Source points, of shape (k, m, 2).
+        dst (np.ndarray): Destination points, of shape (k, m, 2).
+
+    Returns:
+        tuple: (a, b, tx, ty) arrays of length k, with the transform being
+               x' = a * x - b * y + tx, y' = b * x + a * y + ty.
+               Degenerate point sets (all points coincide) yield non-finite parameters.
+    """
+    src_mean, dst_mean = src.mean(axis=1), dst.mean(axis=1)
+    src_c = src - src_mean[:, None]
+    dst_c = dst - dst_mean[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        norm = (src_c**2).sum(axis=(1, 2))
+        a = (src_c * dst_c).sum(axis=(1, 2)) / norm
+        b = (src_c[..., 0] * dst_c[..., 1] - src_c[..., 1] * dst_c[..., 0]).sum(axis=1) / norm
+
+    tx = dst_mean[:, 0] - (a * src_mean[:, 0] - b * src_mean[:, 1])
+    ty = dst_mean[:, 1] - (b * src_mean[:, 0] + a * src_mean[:, 1])
+    return a, b, tx, ty
+
+
+def _similarity_sq_residuals(params: tuple, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Squared residuals of every point (n, 2) under every transform of 'params', of shape (k, n)."""
+    a, b, tx, ty = (p[:, None] for p in params)
+    x, y = src[:, 0], src[:, 1]
+    return (a * x - b * y + tx - dst[:, 0]) ** 2 + (b * x + a * y + ty - dst[:, 1]) ** 2
+
+
+def ransac_similarity(
+    src: np.ndarray,
+    dst: np.ndarray,
+    min_samples: int = 2,
+    residual_threshold: float = 1,
+    max_trials: int = 1000,
+    stop_probability: float = 0.999,
+    max_refinements: int = 10,
+    random_state=None,
+) -> tuple:
+    """
+    RANSAC estimation of a similarity transform from 'src' to 'dst' points.
+    Equivalent to `skimage.measure.ransac((src, dst), SimilarityTransform, ...)`, but hypotheses are
+    drawn, fitted and scored in batches as array operations.
+
+    Args:
+        src (np.ndarray): Source points, of shape (n, 2).
+        dst (np.ndarray): Destination points, of shape (n, 2).
+        min_samples (int, optional): Points per hypothesis (at least 2, the minimal sample of the transform).
+        residual_threshold (float, optional): Points closer than this (after transforming) are inliers.
+        max_trials (int, optional): Maximum number of hypotheses.
+        stop_probability (float, optional): Sampling stops once a hypothesis consisting only of inliers has been
+                                            drawn with this probability, given the inlier ratio of the best
+                                            hypothesis so far. 1 always evaluates 'max_trials' hypotheses.
+        max_refinements (int, optional): The best hypothesis is refitted to its inliers (least-squares)
+                                         while this increases the number of inliers, up to this many times.
+        random_state (optional): Seed or `np.random.Generator` used to draw the samples.
+
+    Returns:
+        tuple: A tuple containing:
+            - The estimated `SimilarityTransform` (None if no valid hypothesis was found).
+            - Boolean array of inliers, of shape (n,).
+    """
+    src = np.asarray(src, dtype=np.float64).reshape(-1, 2)
+    dst = np.asarray(dst, dtype=np.float64).reshape(-1, 2)
+    n = len(src)
+    min_samples = max(int(min_samples), 2)
+    threshold = residual_threshold**2
+
+    best_params, best_inliers = None, np.zeros(n, dtype=bool)
+    if n < min_samples:
+        return None, best_inliers
+
+    rng = np.random.default_rng(random_state)
+    # Hypotheses per batch, bounded so that the (hypotheses, points) residual arrays stay small
+    batch_size = int(np.clip(2**22 // n, 1, 1000))
+    best_score = (0, 0.0)
+    n_trials, required_trials = 0, max_trials
+    while n_trials < min(max_trials, required_trials):
+        k = min(batch_size, max_trials - n_trials)
+        samples = rng.integers(0, n, size=(k, min_samples))
+        n_trials += k
+
+        # Samples drawing the same point twice are not valid hypotheses
+        samples.sort(axis=1)
+        samples = samples[(samples[:, 1:] != samples[:, :-1]).all(axis=1)]
+        params = _fit_similarity(src[samples], dst[samples])
+        valid = np.isfinite(params).all(axis=0) & ((params[0] != 0) | (params[1] != 0))
+        if not valid.any():
+            continue
+        params = tuple(p[valid] for p in params)
+
+        sq_residuals = _similarity_sq_residuals(params, src, dst)
+        inliers = sq_residuals < threshold
+        n_inliers = inliers.sum(axis=1)
+        residual_sums = np.where(inliers, sq_residuals, 0).sum(axis=1)
+
+        # Most inliers, ties broken by the smallest residuals (as in skimage)
+        i = np.lexsort((residual_sums, -n_inliers))[0]
+        if (n_inliers[i], -residual_sums[i]) > (best_score[0], -best_score[1]):
+            best_score = (n_inliers[i], residual_sums[i])
+            best_params = tuple(p[i : i + 1] for p in params)
+            best_inliers = inliers[i]
+
+            inlier_ratio = n_inliers[i] / n
+            if stop_probability < 1 and inlier_ratio > 0:
+                if inlier_ratio == 1:
+                    required_trials = 0
+                else:
+                    required_trials = np.ceil(
+                        np.log(1 - stop_probability) / np.log1p(-(inlier_ratio**min_samples))
+                    )
+
+    if best_params is None:
+        return None, best_inliers
+
+    # Refit to all inliers of the best hypothesis, as long as the consensus grows
+    for _ in range(max_refinements):
+        params = _fit_similarity(src[None, best_inliers], dst[None, best_inliers])
+        if not np.isfinite(params).all():
+            break
+        inliers = _similarity_sq_residuals(params, src, dst)[0] < threshold
+        if inliers.sum() < best_inliers.sum():
+            break
+        best_params, improved = params, inliers.sum() > best_inliers.sum()
+        best_inliers = inliers
+        if not improved:
+            break
+
+    a, b, tx, ty = (p[0] for p in best_params)
+    model = SimilarityTransform(matrix=np.array([[a, -b, tx], [b, a, ty], [0, 0, 1]]))
+    return model, best_inliers
+
+
+def _merge_matches(
+    matches: list,
+    prefilter: bool = False,
+    ransac_min_samples: float = 1,
+    ransac_residual_threshold: float = 1,
+    ransac_max_trials: float = 10000,
+) -> tuple:
+    mkpts0 = np.array([])
+    mkpts1 = np.array([])
+
+    for _i_mkpts0, _i_mkpts1 in matches:
+        if prefilter and _i_mkpts0.size > 0:
+            model, inliers = ransac_similarity(
+                _i_mkpts0,
+                _i_mkpts1,
+                min_samples=ransac_min_samples,
+                residual_threshold=ransac_residual_threshold,
+                max_trials=ransac_max_trials,
+            )
+
+            if model is not None:
+                _i_mkpts0 = _i_mkpts0[inliers]
+                _i_mkpts1 = _i_mkpts1[inliers]
+            else:
+                _i_mkpts0 = []
+                _i_mkpts1 = []
+
+        if len(_i_mkpts0) > 0 and len(mkpts0) > 0:
+            mkpts0 = np.concatenate([_i_mkpts0, mkpts0])
+            mkpts1 = np.concatenate([_i_mkpts1, mkpts1])
+        elif len(_i_mkpts0) > 0 and len(mkpts0) == 0:
+            mkpts0 = _i_mkpts0
+            mkpts1 = _i_mkpts1
+
+    return mkpts0, mkpts1
 
 
 def find_matches(
@@ -160,6 +585,8 @@ def find_matches(
     ransac_residual_threshold: float = 1,
     ransac_max_trials: float = 10000,
     device: str = "cpu",
+    batch_size: int = 1,
+    features_cache: SIFTFeatureCache = None,
 ) -> tuple:
     """
     Find matching keypoints between source and destination images using a specified method.
@@ -168,6 +595,8 @@ def find_matches(
         src (list): List of source images for keypoint matching.
         dst (list): List of destination images for keypoint matching.
         method (str, optional): Method (LoFTR or SIFT) used for feature detection and matching.
+        batch_size (int, optional): Number of (dst, src) pairs per forward pass (LoFTR and KeyNet).
+        features_cache (SIFTFeatureCache, optional): Cache of SIFT features, for images matched repeatedly.
 
     Returns:
         tuple: A tuple containing two arrays:
@@ -183,54 +612,17 @@ def find_matches(
         - The function returns a tuple of arrays containing the keypoints for matching.
     """
 
-    if type(src) is not list:
-        raise TypeError("'src' must be a list of images")
-
-    if type(dst) is not list:
-        raise TypeError("'dst' must be a list of images")
-
-    if method not in SUPPORTED_MATCHING_METHODS:
-        raise ValueError(f"Feature matching method '{method}' is not supported")
-
-    mkpts0 = np.array([])
-    mkpts1 = np.array([])
-
-    for _i_dst in dst:
-        for _i_src in src:
-            if method == "LoFTR":
-                _i_mkpts0, _i_mkpts1 = _find_matches_loftr(_i_dst, _i_src, device=device)
-            elif method == "SIFT":
-                _i_mkpts0, _i_mkpts1 = _find_matches_sift(_i_dst, _i_src)
-            elif method == 'KeyNet':
-                _i_mkpts0, _i_mkpts1 = _find_matches_keynet(_i_dst, _i_src, device=device)
-            else:
-                raise ValueError(f"Registration method {method} not supported")
-
-            if prefilter and _i_mkpts0.size > 0:
-                _, inliers = ransac(
-                    (_i_mkpts0, _i_mkpts1),
-                    SimilarityTransform,
-                    min_samples=ransac_min_samples,
-                    residual_threshold=ransac_residual_threshold,
-                    max_trials=ransac_max_trials,
-                )
+    matches = match_image_pairs(_image_pairs(src, dst), method, device, batch_size, features_cache)
 
-                if inliers is not None:
-                    inliers = inliers > 0
-                    _i_mkpts0 = _i_mkpts0[inliers.flatten()]
-                    _i_mkpts1 = _i_mkpts1[inliers.flatten()]
-                else:
-                    _i_mkpts0 = []
-                    _i_mkpts1 = []
+    return _merge_matches(matches, prefilter, ransac_min_samples, ransac_residual_threshold, ransac_max_trials)
 
-            if len(_i_mkpts0) > 0 and len(mkpts0) > 0:
-                mkpts0 = np.concatenate([_i_mkpts0, mkpts0])
-                mkpts1 = np.concatenate([_i_mkpts1, mkpts1])
-            elif len(_i_mkpts0) > 0 and len(mkpts0) == 0:
-                mkpts0 = _i_mkpts0
-                mkpts1 = _i_mkpts1
 
-    return mkpts0, mkpts1
+def _dominates(n_inliers: list, margin: float) -> bool:
+    """Whether the largest of (at least two) inlier counts is at least 'margin' times all others."""
+    if len(n_inliers) < 2:
+        return False
+    second, best = sorted(n_inliers)[-2:]
+    return best > 0 and best >= margin * max(second, 1)
 
 
 def match_images(
@@ -247,6 +639,9 @@ def match_images(
     ransac_residual_threshold: float = 1,
     ransac_max_trials: float = 10000,
     device: str = "cpu",
+    batch_size: int = 1,
+    num_workers: int = 1,
+    early_exit_margin: float = None,
 ) -> (np.ndarray, np.ndarray, list, float):
     """
     Matching of two images (A,B), with augmentation (optionally)
@@ -259,6 +654,13 @@ def match_images(
         rotations (list): a list of rotations applied to dst before matching.
         src_augmenter (function): augmentation function to apply to image A.
         dst_augmenter (function): augmentation function to apply to image B.
+        ransac_max_trials (float): maximum RANSAC hypotheses (x1000), see `ransac_similarity`.
+        batch_size (int): when larger than 1, the image pairs of all flips/rotations are matched
+                          together, with this many pairs per forward pass (LoFTR and KeyNet).
+        num_workers (int): number of flip/rotation hypotheses evaluated concurrently (threads).
+        early_exit_margin (float): if set, the search stops (pending hypotheses are cancelled) once the
+                                   inliers of one hypothesis exceed those of every other evaluated hypothesis
+                                   (at least one) by this factor.
 
     Returns:
         tuple: A tuple containing:
@@ -283,51 +685,93 @@ def match_images(
     _best_mkpts0 = None
     _best_mkpts1 = None
 
-    for (_flip_x, _flip_y), _rotation in product(flips, rotations):
-        logging.info(f"Flip {_flip_x, _flip_y}, rotation {_rotation}")
-
+    def _augment(flip, rotation):
         # Preparing image and pseudoimage modalities for the feature matching model
+        _aug_src, _aug_dst = _src, _dst
         if callable(src_augmenter):
-            _src = src_augmenter(src, flip=[_flip_x, _flip_y], rotation=_rotation)
+            _aug_src = src_augmenter(src, flip=flip, rotation=rotation)
         if callable(dst_augmenter):
-            _dst = dst_augmenter(dst, flip=[_flip_x, _flip_y], rotation=_rotation)
+            _aug_dst = dst_augmenter(dst, flip=flip, rotation=rotation)
+        return _aug_src, _aug_dst
+
+    augmentations = list(product(flips, rotations))
+    # The SIFT features of images shared by several flips/rotations (e.g., an unaugmented src) are computed once
+    features_cache = SIFTFeatureCache() if feature_matcher == "SIFT" else None
+
+    if batch_size > 1:
+        # Matching the image pairs of all flips/rotations at once
+        _pairs = [_image_pairs(*_augment(list(_flip), _rotation)) for _flip, _rotation in augmentations]
+        _matches = iter(
+            match_image_pairs([p for _p in _pairs for p in _p], feature_matcher, device, batch_size, features_cache)
+        )
+        augmentation_matches = [[next(_matches) for _ in _p] for _p in _pairs]
 
-        # Find matching keypoints between image and STS pseudoimage modalities
-        mkpts0, mkpts1 = find_matches(_src, _dst, feature_matcher, prefilter, device=device)
+    def _evaluate(i):
+        (_flip_x, _flip_y), _rotation = augmentations[i]
 
-        logging.info(f"{len(mkpts0)} matches")
+        # Find matching keypoints between image and STS pseudoimage modalities
+        if batch_size > 1:
+            mkpts0, mkpts1 = _merge_matches(augmentation_matches[i], prefilter)
+        else:
+            mkpts0, mkpts1 = find_matches(
+                *_augment([_flip_x, _flip_y], _rotation),
+                feature_matcher,
+                prefilter,
+                device=device,
+                features_cache=features_cache,
+            )
 
         # Run RANSAC to remove outliers,
         # after all pairwise channels have been matched
         if ransac_enabled:
-            sum_inliers = 0
-            best_inliers = None
-            for _ in range(ransac_max_trials):
-                _, inliers = ransac(
-                    (mkpts0, mkpts1),
-                    SimilarityTransform,
-                    min_samples=ransac_min_samples,
-                    residual_threshold=ransac_residual_threshold,
-                    max_trials=1000,
-                )
-                inliers = inliers > 0
-
-                if inliers.sum() > sum_inliers:
-                    sum_inliers = inliers.sum()
-                    best_inliers = inliers
+            _, best_inliers = ransac_similarity(
+                mkpts0,
+                mkpts1,
+                min_samples=ransac_min_samples,
+                residual_threshold=ransac_residual_threshold,
+                max_trials=int(ransac_max_trials * 1000),
+            )
         else:
             best_inliers = np.ones(len(mkpts0), dtype=bool)
 
+        logging.info(
+            f"Flip {_flip_x, _flip_y}, rotation {_rotation}: "
+            f"{len(mkpts0)} matches, {best_inliers.sum()} inliers (RANSAC)"
+        )
+        return mkpts0, mkpts1, best_inliers
+
+    results = {}
+    if num_workers > 1 and len(augmentations) > 1:
+        # Hypotheses are evaluated concurrently; matching models and RANSAC spend most time outside the GIL
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = {executor.submit(_evaluate, i): i for i in range(len(augmentations))}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if early_exit_margin is not None and _dominates(
+                    [r[2].sum() for r in results.values()], early_exit_margin
+                ):
+                    logging.info(f"Stopping early; one of {len(results)} evaluated hypotheses dominates")
+                    for f in futures:
+                        f.cancel()
+                    break
+    else:
+        for i in range(len(augmentations)):
+            results[i] = _evaluate(i)
+            if early_exit_margin is not None and _dominates([r[2].sum() for r in results.values()], early_exit_margin):
+                logging.info(f"Stopping early; one of {len(results)} evaluated hypotheses dominates")
+                break
+
+    # Same selection as a sequential search: the first hypothesis (in order) with most inliers
+    for i in sorted(results):
+        mkpts0, mkpts1, best_inliers = results[i]
         if best_inliers.sum() > max_keypoints:
             max_keypoints = best_inliers.sum()
-            best_flip = [_flip_x, _flip_y]
-            best_rotation = _rotation
+            best_flip = list(augmentations[i][0])
+            best_rotation = augmentations[i][1]
 
             _best_mkpts0 = mkpts0[best_inliers.flatten()]
             _best_mkpts1 = mkpts1[best_inliers.flatten()]
 
-        logging.info(f"{best_inliers.sum()} inliers (RANSAC)")
-
     # Retrieve the results for the best flip combination
     # Filter keypoints with selected inliers
     in_mkpts0 = _best_mkpts0
@@ -47,7 +47,7 @@ from PyQt5.QtGui import QBrush, QColor, QStandardItemModel, QStandardItem, QIntV
 from skimage.transform import warp
 
 from openst.alignment.apply_transform import estimate_transform, apply_transform_to_coords, keypoints_json_to_dict
-from openst.utils.pseudoimage import create_paired_pseudoimage
+from openst.utils.pseudoimage import create_paired_pseudoimage, load_pseudoimage_pyramid
 from openst.utils.file import h5_to_dict
 
 # GUI elements
@@ -267,6 +267,7 @@ class ImageRenderer(QThread):
         total_counts: np.ndarray,
         tile_id: np.ndarray,
         staining_image: np.ndarray,
+        pyramid=None,
     ) -> dict:
         """
         Perform manual registration of spatial transcriptomics (STS) data with a staining image.
@@ -278,6 +279,8 @@ class ImageRenderer(QThread):
                     this 'tile_id' is used to aggregate the coordinates into buckets that
                     are aligned separately. Recommended for flow-cell based STS.
             staining_image (np.ndarray): Staining image for registration.
+            pyramid (PseudoimagePyramid, optional): Pseudoimage pyramid of the coordinates (with counts above
+                    the threshold), used to render all tiles.
 
         Returns:
             image_pair (dict): Dictionary containing the pseudoimages, cropping and scaling limits, rendering scale.
@@ -336,6 +339,7 @@ class ImageRenderer(QThread):
                 staining_image_rescaled.shape,
                 recenter=self.recenter_coarse,
                 resize_method="cv2",
+                pyramid=pyramid,
             )
 
             image_pair = {
@@ -397,12 +401,25 @@ class ImageRenderer(QThread):
 
     def run(self):
         try:
+            in_coords = self.adata[self.spatial_path][:]
+            total_counts = self.adata["obs/total_counts"][:]
+
+            pyramid = None
+            if self.layer == "all_tiles_coarse":
+                self.update_text.emit("Loading pseudoimage pyramid")
+                pyramid = load_pseudoimage_pyramid(
+                    self.adata,
+                    f"{self.spatial_path.strip('/').replace('/', '_')}_total_counts_gt_{self.threshold_counts}",
+                    in_coords[total_counts > self.threshold_counts],
+                )
+
             image_pair = self.render_image_pair(
                 # put coordinates into XY (for correct rendering)
-                self.adata[self.spatial_path][:][..., ::-1],
-                self.adata["obs/total_counts"][:],
+                in_coords[..., ::-1],
+                total_counts,
                 self.adata["obs/tile_id/codes"][:],
                 self.adata[self.img_path],
+                pyramid,
             )
 
             self.result_ready.emit(image_pair)
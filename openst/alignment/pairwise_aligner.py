@@ -1,13 +1,19 @@
 import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from itertools import product
+from multiprocessing import shared_memory
 
 import cv2
 import numpy as np
 import h5py
+from scipy import ndimage as ndi
 from skimage.color import rgb2gray, rgb2hsv
 from skimage.exposure import equalize_adapthist
 from skimage.filters import gaussian
-from skimage.transform import estimate_transform, rescale, rotate
+from skimage.transform import estimate_transform, rotate
 from threadpoolctl import threadpool_limits
 
 from openst.alignment import feature_matching
@@ -19,7 +25,7 @@ from openst.utils.file import (check_adata_structure, check_directory_exists,
                                write_key_to_h5)
 from openst.utils.pimage import mask_tissue as p_mask_tissue
 from openst.utils.pimage import is_grayscale
-from openst.utils.pseudoimage import create_paired_pseudoimage
+from openst.utils.pseudoimage import create_paired_pseudoimage, load_pseudoimage_pyramid
 
 
 def transform_image(im, flip: list = None, crop: list = None, rotation: int = None):
@@ -27,7 +33,8 @@ def transform_image(im, flip: list = None, crop: list = None, rotation: int = No
     _im = im
     if flip is not None:
         _im = _im[:: flip[0], :: flip[1]]
-    if rotation is not None:
+    # Rotating by 0 degrees is the identity, but would interpolate (and copy) the whole image before cropping
+    if rotation is not None and rotation != 0:
         _im = rotate(_im, rotation, clip=True, preserve_range=True, resize=True)
     if crop is not None:
         _im = _im[crop[0] : crop[1], crop[2] : crop[3]]
@@ -62,6 +69,91 @@ def transform_coords(coords, flip: list = None, rotation: int = 0):
 
     return transformed_coords
 
+
+def rescale_image_coarse(image, factor: int, block_size: int = 1024) -> np.ndarray:
+    """
+    Downscale an image (1:factor) with a box filter and nearest-neighbour sampling (`cv2.blur`, `cv2.resize`).
+    The image is read in bands of rows, so it can be a (lazy) h5 dataset larger than the available memory;
+    the result is the same as for the whole image.
+
+    Args:
+        image (np.ndarray or h5py.Dataset): Input image, XxY or XxYxC.
+        factor (int): Rescaling factor.
+        block_size (int, optional): Approximate number of image rows read at once.
+
+    Returns:
+        np.ndarray: The downscaled image.
+    """
+    _ker = tuple(np.maximum(0, (np.array([factor, factor]) - 1) / 2).astype(int))
+    out_size = (np.array(image.shape)[[0, 1]] / factor).astype(int)
+
+    # Rows and columns sampled by the nearest-neighbour resize, from resizing their indices
+    rows, cols = (
+        cv2.resize(np.arange(n, dtype=np.float64)[:, None], (1, int(o)), interpolation=cv2.INTER_NEAREST)[:, 0]
+        for n, o in zip(image.shape[:2], out_size)
+    )
+    rows, cols = rows.astype(int), cols.astype(int)
+
+    out = np.empty((len(rows), len(cols)) + image.shape[2:], dtype=image.dtype)
+    out_block_size = max(1, block_size // factor)
+    for o_start in range(0, len(rows), out_block_size):
+        o_end = min(o_start + out_block_size, len(rows))
+        # The band is extended by the size of the box filter, except at the image border
+        i_start = max(rows[o_start] - _ker[0], 0)
+        i_end = min(rows[o_end - 1] + _ker[0] + 1, image.shape[0])
+        band = cv2.blur(np.asarray(image[i_start:i_end]), _ker)
+        out[o_start:o_end] = band[rows[o_start:o_end] - i_start][:, cols]
+    return out
+
+
+def rescale_image_fine(image, factor: int, block_size: int = 1024) -> np.ndarray:
+    """
+    Downscale an image (1:factor) with anti-aliasing and bilinear interpolation, as
+    `skimage.transform.rescale(image, 1 / factor, preserve_range=True, anti_aliasing=True)` per channel,
+    converted to uint8. The image is read in bands of rows, so it can be a (lazy) h5 dataset larger than
+    the available memory; the result is the same as for the whole image.
+
+    Args:
+        image (np.ndarray or h5py.Dataset): Input image, XxY or XxYxC.
+        factor (int): Rescaling factor.
+        block_size (int, optional): Approximate number of image rows read at once.
+
+    Returns:
+        np.ndarray: The downscaled image (uint8).
+    """
+    in_shape = np.array(image.shape[:2])
+    out_shape = np.maximum(np.round((1 / factor) * in_shape), 1).astype(int)
+    factors = in_shape / out_shape
+    sigma = np.maximum(0, (factors - 1) / 2)
+    # Margin covering the gaussian kernel (truncated at 4 sigma) and the bilinear interpolation
+    depth = int(4 * sigma[0] + 0.5) + 2
+
+    cols = (np.arange(out_shape[1]) + 0.5) * factors[1] - 0.5
+    out = np.empty(tuple(out_shape) + image.shape[2:], dtype=np.float64)
+    min_val, max_val = np.inf, -np.inf
+    out_block_size = max(1, block_size // factor)
+    for o_start in range(0, out_shape[0], out_block_size):
+        o_end = min(o_start + out_block_size, out_shape[0])
+        rows = (np.arange(o_start, o_end) + 0.5) * factors[0] - 0.5
+        # At the image border, bands are not extended, so the boundary modes match those of the whole image
+        i_start = max(int(np.floor(rows[0])) - depth, 0)
+        i_end = min(int(np.ceil(rows[-1])) + 1 + depth, in_shape[0])
+        band = np.asarray(image[i_start:i_end])
+        min_val, max_val = min(min_val, band.min()), max(max_val, band.max())
+
+        coords = np.meshgrid(rows - i_start, cols, indexing="ij")
+        band = band.reshape(band.shape[:2] + (-1,))
+        for c in range(band.shape[2]):
+            filtered = ndi.gaussian_filter(band[..., c].astype(np.float64), sigma, mode="mirror")
+            out.reshape(out.shape[:2] + (-1,))[o_start:o_end, :, c] = ndi.map_coordinates(
+                filtered, coords, order=1, mode="mirror"
+            )
+
+    # Clipped to the range of the input, as in skimage
+    np.clip(out, min_val, max_val, out=out)
+    return out.astype(np.uint8)
+
+
 def prepare_image_for_feature_matching(
     image: np.ndarray,
     gaussian_blur: float = 0,
@@ -221,12 +313,266 @@ def prepare_pseudoimage_for_feature_matching(
     return [gaussian(equalize_adapthist(_image), gaussian_blur)[:: flip[0], :: flip[1]]]
 
 
+# Arrays of the fine registration, in the current process
+_fine_registration = {}
+# Pseudoimages of all tiles have the same shape; their buffers are reused (by each thread)
+_fine_registration_buffers = threading.local()
+
+
+def _share_arrays(arrays: dict) -> tuple:
+    """
+    Copy arrays into shared memory; returns the shared memory blocks and the specs to attach to them,
+    ('shm', name, shape, dtype) per array. Datasets of an h5 file are not copied, they are opened again
+    by every worker process from their spec ('h5', file name, dataset name).
+    """
+    blocks, specs = [], {}
+    for key, arr in arrays.items():
+        if isinstance(arr, h5py.Dataset):
+            specs[key] = ("h5", arr.file.filename, arr.name)
+            continue
+        block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+        blocks.append(block)
+        specs[key] = ("shm", block.name, arr.shape, arr.dtype.str)
+    return blocks, specs
+
+
+def _free_shared_memory() -> float:
+    """Free bytes of the shared memory file system (often small in containers); infinite if there is none."""
+    if not os.path.isdir("/dev/shm"):
+        return float("inf")
+    return shutil.disk_usage("/dev/shm").free
+
+
+def _init_fine_registration(arrays: dict, args, shared: bool = False):
+    """Set up the state used by `_register_tile`, attaching to the specs of `_share_arrays` if 'shared'."""
+    _fine_registration.clear()
+    if shared:
+        # A single thread per worker process, as the workers already use all CPUs
+        threadpool_limits(limits=1)
+        handles = []  # keep the blocks and files open while the arrays are used
+        for key, (kind, name, *spec) in arrays.items():
+            if kind == "h5":
+                handles.append(h5py.File(name, "r"))
+                _fine_registration[key] = handles[-1][spec[0]]
+            else:
+                handles.append(shared_memory.SharedMemory(name=name))
+                _fine_registration[key] = np.ndarray(spec[0], dtype=spec[1], buffer=handles[-1].buf)
+        _fine_registration["handles"] = handles
+    else:
+        _fine_registration.update(arrays)
+
+    _fine_registration["args"] = args
+
+
+def _register_tile(tile_code: int) -> tuple:
+    """
+    Fine registration of a single tile, with the state set by `_init_fine_registration`.
+
+    Args:
+        tile_code (int): Code (of the 'tile_id' categorical) of the tile.
+
+    Returns:
+        tuple: A tuple containing:
+            - Coordinates of the tile after fine registration.
+            - AlignmentResult of the tile.
+    """
+    args = _fine_registration["args"]
+    src = _fine_registration["src"]
+    sts_coords_transformed = _fine_registration["sts_coords_transformed"]
+    sts_coords_coarse = _fine_registration["sts_coords_coarse"]
+    tile_codes = _fine_registration["tile_codes"]
+    valid_tile_codes = _fine_registration["valid_tile_codes"]
+    valid_counts = _fine_registration["valid_counts"]
+
+    buffers = _fine_registration_buffers
+    if getattr(buffers, "shape", None) != src.shape[:2]:
+        buffers.shape = src.shape[:2]
+        buffers.pseudoimage = np.empty(src.shape[:2], dtype=np.uint8)
+        buffers.pseudoimage_counts = np.empty(src.shape[:2], dtype=np.uint8)
+
+    # Create a pseudoimage
+    _t_tile_id = tile_codes == tile_code
+    _t_valid_coords = valid_tile_codes == tile_code
+
+    logging.info(f"Registering tile {tile_code} with {_t_valid_coords.sum()} coordinates")
+
+    _t_sts_pseudoimage = create_paired_pseudoimage(
+        sts_coords_transformed[:, ::-1],  # we flip these coordinates
+        args.pseudoimage_size_fine,
+        src.shape,
+        _t_valid_coords,
+        recenter=False,
+        rescale=True,
+        values=None,
+        resize_method="bincount",
+        out=buffers.pseudoimage,
+    )
+
+    _t_counts = valid_counts[_t_valid_coords]
+
+    _t_sts_pseudoimage_counts = create_paired_pseudoimage(
+        sts_coords_transformed[:, ::-1],  # we flip these coordinates
+        args.pseudoimage_size_fine,
+        src.shape,
+        _t_valid_coords,
+        recenter=False,
+        rescale=True,
+        values=_t_counts,
+        resize_method="bincount",
+        out=buffers.pseudoimage_counts,
+    )
+
+    # Axis limits to crop both modalities to tile region
+    _t_sts_coords_to_transform = _t_sts_pseudoimage["coords_rescaled"] * _t_sts_pseudoimage["rescaling_factor"]
+
+    min_lim, max_lim = _t_sts_coords_to_transform[_t_valid_coords].min(axis=0).astype(
+        int
+    ), _t_sts_coords_to_transform[_t_valid_coords].max(axis=0).astype(int)
+    x_min, y_min = min_lim
+    x_max, y_max = max_lim
+
+    # Only the window of the tile is read from the staining image (it may be an h5 dataset)
+    src_tile = np.asarray(src[x_min:x_max, y_min:y_max])
+
+    _fn_prepare_image_for_feature_matching = prepare_image_for_feature_matching
+
+    if is_grayscale(src_tile):
+        _fn_prepare_image_for_feature_matching = prepare_image_for_feature_matching_grayscale
+
+    # Preparing image and pseudoimage modalities for feature detection (imaging modality has optimal flip)
+    src_augmented  = _fn_prepare_image_for_feature_matching(
+        image=src_tile,
+        gaussian_blur=args.gaussian_sigma_fine,
+        mask_tissue=args.mask_tissue,
+        keep_black_background=args.keep_black_background,
+        mask_gaussian_blur=args.mask_gaussian_sigma,
+    )
+
+    dst = []
+    for pseudoimage, invert in product(
+        [_t_sts_pseudoimage["pseudoimage"], _t_sts_pseudoimage_counts["pseudoimage"].astype(int)], [False, True]
+    ):
+        dst += prepare_pseudoimage_for_feature_matching(
+            pseudoimage[x_min:x_max, y_min:y_max],
+            gaussian_blur=args.gaussian_sigma_fine,
+            invert=invert,
+        )
+
+    # Finding matches between modalities
+    _t_mkpts0, _t_mkpts1, _, _ = feature_matching.match_images(
+        src_augmented,
+        dst,
+        flips=[[1, 1]],
+        rotations=[0],
+        ransac_min_samples=args.ransac_fine_min_samples,
+        ransac_residual_threshold=args.ransac_fine_residual_threshold,
+        ransac_max_trials=args.ransac_fine_max_trials,
+        device=args.device,
+        batch_size=args.matching_batch_size,
+    )
+
+    # Apply the same transformation to the tiles
+    _t_sts_coords_fine_to_transform = sts_coords_coarse[_t_tile_id] / args.rescale_factor_fine
+    _t_sts_coords_fine_to_transform = (_t_sts_coords_fine_to_transform - np.array([[y_min, x_min]]))[:, ::-1]
+
+    # Compute similarity matrix and compute point transformation
+    if len(_t_mkpts0) > args.min_matches:
+        _t_tform_points = estimate_transform("similarity", _t_mkpts0, _t_mkpts1)
+
+        _t_sts_coords_fine_transformed = apply_transform(
+            _t_sts_coords_fine_to_transform, _t_tform_points, check_bounds=True
+        )[:, :2]
+
+        _tform_params = _t_tform_points.params.tolist()
+    else:
+        logging.warning(f"There were not enough matching points ({len(_t_mkpts0)} out of selected {args.min_matches})")
+        _t_sts_coords_fine_transformed = _t_sts_coords_fine_to_transform[:, ::-1]
+        _tform_params = None
+
+    # Rescale points to original HE dimensions
+    _t_sts_coords_fine_transformed = _t_sts_coords_fine_transformed + np.array([[y_min, x_min]])
+    _t_sts_coords_fine_transformed = _t_sts_coords_fine_transformed * args.rescale_factor_fine
+
+    # Saving alignment results here (only when passed)
+    # TODO: check order of keypoints (in all functions throughout package)
+    _align_result = AlignmentResult(
+        name=f"fine_alignment_tile_{tile_code}",
+        im_0=src_tile,
+        im_1=_t_sts_pseudoimage["pseudoimage"][x_min:x_max, y_min:y_max].copy(),  # the buffer is reused
+        transformation_matrix=_tform_params,
+        ransac_results=None,
+        sift_results=None,
+        keypoints0=_t_mkpts1[:, ::-1],
+        keypoints1=_t_mkpts0[:, ::-1],
+    )
+    return _t_sts_coords_fine_transformed, _align_result
+
+
+def _register_tiles(tile_codes: np.ndarray, arrays: dict, args) -> list:
+    """
+    Fine registration of every tile, with 'args.num_workers' workers.
+
+    With a CPU device, tiles are registered in worker processes, which read the coordinates from shared memory,
+    and the staining image from shared memory or, if it is an h5 dataset, from its file. Otherwise (GPU), or if
+    the shared memory is too small, worker threads share the arrays (and feature matching model) of this process.
+
+    Args:
+        tile_codes (np.ndarray): Codes of the tiles to register.
+        arrays (dict): Input arrays of `_register_tile`.
+        args: Namespace containing the registration parameters.
+
+    Returns:
+        list: (coordinates, AlignmentResult) of every tile, in the order of 'tile_codes'.
+    """
+    num_workers = min(args.num_workers, len(tile_codes))
+    use_processes = num_workers > 1 and args.device == "cpu"
+    if use_processes:
+        shared_bytes = sum(arr.nbytes for arr in arrays.values() if not isinstance(arr, h5py.Dataset))
+        if shared_bytes > _free_shared_memory():
+            logging.warning(
+                f"Not enough free shared memory in /dev/shm for {shared_bytes} bytes; registering tiles in threads"
+            )
+            use_processes = False
+
+    if not use_processes:
+        _init_fine_registration(arrays, args)
+        try:
+            if num_workers <= 1:
+                return [_register_tile(tile_code) for tile_code in tile_codes]
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                return list(executor.map(_register_tile, tile_codes))
+        finally:
+            _fine_registration.clear()
+
+    blocks, specs = _share_arrays(arrays)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=num_workers, initializer=_init_fine_registration, initargs=(specs, args, True)
+        ) as executor:
+            return list(executor.map(_register_tile, tile_codes))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _load_coarse_pyramid(pseudoimage_cache: h5py.File, in_coords: np.ndarray, total_counts: np.ndarray, args):
+    """Pseudoimage pyramid of the coordinates of the coarse registration, cached in 'pseudoimage_cache'."""
+    return load_pseudoimage_pyramid(
+        pseudoimage_cache,
+        f"obsm_spatial_total_counts_gt_{args.threshold_counts_coarse}",
+        in_coords[total_counts > args.threshold_counts_coarse],
+    )
+
+
 def run_registration(
     in_coords: np.ndarray,
     total_counts: np.ndarray,
     tile_id: np.ndarray,
-    staining_image: np.ndarray,
+    staining_image,
     args,
+    pseudoimage_cache: h5py.File = None,
 ) -> (np.ndarray, np.ndarray, PairwiseAlignmentMetadata): 
     """
     Perform registration of spatial transcriptomics (STS) data with a staining image.
@@ -237,8 +583,10 @@ def run_registration(
         tile_id: Identifier for each STS coordinate. During the fine registration,
                  this 'tile_id' is used to aggregate the coordinates into buckets that
                  are aligned separately. Recommended for flow-cell based STS.
-        staining_image (np.ndarray): Staining image for registration.
+        staining_image (np.ndarray or h5py.Dataset): Staining image for registration. Datasets are read lazily.
         args: Namespace containing various registration parameters.
+        pseudoimage_cache (h5py.File, optional): Spatial object (with 'in_coords' at 'obsm/spatial') where the
+                                                 pseudoimage pyramid of the coarse registration is cached.
 
     Returns:
         tuple: A tuple containing four elements:
@@ -255,11 +603,7 @@ def run_registration(
     # Preparing images and preprocessing routines
     
     logging.info(f"Rescaling input image for coarse registration")
-    factors = np.array([args.rescale_factor_coarse, args.rescale_factor_coarse])
-    _ker = np.maximum(0, (factors - 1) / 2).astype(int)
-    src = cv2.resize(cv2.blur(staining_image, _ker),
-                     (np.array(staining_image.shape)[[0, 1]]/args.rescale_factor_coarse).astype(int)[::-1],
-                     interpolation=cv2.INTER_NEAREST)
+    src = rescale_image_coarse(staining_image, args.rescale_factor_coarse)
 
     _fn_prepare_image_for_feature_matching = prepare_image_for_feature_matching
 
@@ -281,7 +625,12 @@ def run_registration(
         )
 
     sts_coords = in_coords[total_counts > args.threshold_counts_coarse]
-    sts_pseudoimage = create_paired_pseudoimage(sts_coords, args.pseudoimage_size_coarse, src.shape, resize_method='cv2')
+    sts_pyramid = None
+    if pseudoimage_cache is not None:
+        sts_pyramid = _load_coarse_pyramid(pseudoimage_cache, in_coords, total_counts, args)
+    sts_pseudoimage = create_paired_pseudoimage(
+        sts_coords, args.pseudoimage_size_coarse, src.shape, resize_method='cv2', pyramid=sts_pyramid
+    )
     dst = sts_pseudoimage["pseudoimage"]
 
     # Feature matching
@@ -294,6 +643,9 @@ def run_registration(
         ransac_residual_threshold=args.ransac_coarse_residual_threshold,
         ransac_max_trials=args.ransac_coarse_max_trials,
         device=args.device,
+        batch_size=args.matching_batch_size,
+        num_workers=args.num_workers,
+        early_exit_margin=args.early_exit_margin,
     )
 
     # Estimate and apply transform
@@ -361,133 +713,27 @@ def run_registration(
     tile_codes = np.unique(tile_id.codes)
 
     # Apply scaling to input image again, for fine registration
-    staining_image_rescaled = rescale(
-        staining_image, 1 / args.rescale_factor_fine, preserve_range=True, anti_aliasing=True, channel_axis=-1
-    ).astype(np.uint8)
-    src = staining_image_rescaled.astype(np.uint8)
-
-
-    for tile_code in tile_codes:
-        # Create a pseudoimage
-        _t_tile_id = np.isin(tile_id.codes, tile_code)
-        _t_valid_coords = np.isin(
-            tile_id[(total_counts > args.threshold_counts_coarse)].codes[_i_sts_coords_coarse_within_image_bounds],
-            tile_code,
-        )
-
-        logging.info(f"Registering tile {tile_code} with {_t_valid_coords.sum()} coordinates")
-
-        _t_sts_pseudoimage = create_paired_pseudoimage(
-            sts_coords_transformed[:, ::-1],  # we flip these coordinates
-            args.pseudoimage_size_fine,
-            staining_image_rescaled.shape,
-            _t_valid_coords,
-            recenter=False,
-            rescale=True,
-            values=None,
-        )
-
-        _t_counts = total_counts[(total_counts > args.threshold_counts_coarse)][
-            _i_sts_coords_coarse_within_image_bounds
-        ][_t_valid_coords]
-
-        _t_sts_pseudoimage_counts = create_paired_pseudoimage(
-            sts_coords_transformed[:, ::-1],  # we flip these coordinates
-            args.pseudoimage_size_fine,
-            staining_image_rescaled.shape,
-            _t_valid_coords,
-            recenter=False,
-            rescale=True,
-            values=_t_counts,
-        )
-
-        # assign same coarse coordinates if the tile falls outside of the image
-        if len(_t_sts_pseudoimage['coords_rescaled']) == 0:
-            out_coords_output_fine[_t_tile_id] = out_coords_output_coarse[_t_tile_id]
-
-        # Axis limits to crop both modalities to tile region
-        _t_sts_coords_to_transform = _t_sts_pseudoimage["coords_rescaled"] * _t_sts_pseudoimage["rescaling_factor"]
-
-        min_lim, max_lim = _t_sts_coords_to_transform[_t_valid_coords].min(axis=0).astype(
-            int
-        ), _t_sts_coords_to_transform[_t_valid_coords].max(axis=0).astype(int)
-        x_min, y_min = min_lim
-        x_max, y_max = max_lim
-
-        _fn_prepare_image_for_feature_matching = prepare_image_for_feature_matching
-
-        if is_grayscale(src):
-            _fn_prepare_image_for_feature_matching = prepare_image_for_feature_matching_grayscale
-
-        # Preparing image and pseudoimage modalities for feature detection (imaging modality has optimal flip)
-        src_augmented  = _fn_prepare_image_for_feature_matching(
-            image=src,
-            gaussian_blur=args.gaussian_sigma_fine,
-            crop=[x_min, x_max, y_min, y_max],
-            mask_tissue=args.mask_tissue,
-            keep_black_background=args.keep_black_background,
-            mask_gaussian_blur=args.mask_gaussian_sigma,
-        )
-
-        dst = []
-        for pseudoimage, invert in product(
-            [_t_sts_pseudoimage["pseudoimage"], _t_sts_pseudoimage_counts["pseudoimage"].astype(int)], [False, True]
-        ):
-            dst += prepare_pseudoimage_for_feature_matching(
-                pseudoimage[x_min:x_max, y_min:y_max],
-                gaussian_blur=args.gaussian_sigma_fine,
-                invert=invert,
-            )
-
-        # Finding matches between modalities
-        _t_mkpts0, _t_mkpts1, _, _ = feature_matching.match_images(
-            src_augmented,
-            dst,
-            flips=[[1, 1]],
-            rotations=[0],
-            ransac_min_samples=args.ransac_fine_min_samples,
-            ransac_residual_threshold=args.ransac_fine_residual_threshold,
-            ransac_max_trials=args.ransac_fine_max_trials,
-            device=args.device,
-        )
-
-        # Apply the same transformation to the tiles
-        _t_sts_coords_fine_to_transform = sts_coords_coarse[_t_tile_id] / args.rescale_factor_fine
-        _t_sts_coords_fine_to_transform = (_t_sts_coords_fine_to_transform - np.array([[y_min, x_min]]))[:, ::-1]
-
-        # Compute similarity matrix and compute point transformation
-        if len(_t_mkpts0) > args.min_matches:
-            _t_tform_points = estimate_transform("similarity", _t_mkpts0, _t_mkpts1)
-
-            _t_sts_coords_fine_transformed = apply_transform(
-                _t_sts_coords_fine_to_transform, _t_tform_points, check_bounds=True
-            )[:, :2]
-
-            _tform_params = _t_tform_points.params.tolist()
-        else:
-            logging.warning(f"There were not enough matching points ({len(_t_mkpts0)} out of selected {args.min_matches})")
-            _t_sts_coords_fine_transformed = _t_sts_coords_fine_to_transform[:, ::-1]
-            _tform_params = None
-            
-
-        # Rescale points to original HE dimensions
-        _t_sts_coords_fine_transformed = _t_sts_coords_fine_transformed + np.array([[y_min, x_min]])
-        _t_sts_coords_fine_transformed = _t_sts_coords_fine_transformed * args.rescale_factor_fine
-
-        out_coords_output_fine[_t_tile_id] = _t_sts_coords_fine_transformed
-
-        # Saving alignment results here (only when passed)
-        # TODO: check order of keypoints (in all functions throughout package)
-        _align_result = AlignmentResult(
-            name=f"fine_alignment_tile_{tile_code}",
-            im_0=src[x_min:x_max, y_min:y_max],
-            im_1=_t_sts_pseudoimage["pseudoimage"][x_min:x_max, y_min:y_max],
-            transformation_matrix=_tform_params,
-            ransac_results=None,
-            sift_results=None,
-            keypoints0=_t_mkpts1[:, ::-1],
-            keypoints1=_t_mkpts0[:, ::-1],
-        )
+    if args.rescale_factor_fine == 1 and staining_image.dtype == np.uint8:
+        # At full resolution, every tile reads its own window of the (possibly lazy) staining image
+        src = staining_image
+    else:
+        src = rescale_image_fine(staining_image, args.rescale_factor_fine)
+
+    # Per-tile registration only reads these arrays; with several workers, they are shared (not copied)
+    _valid_counts = total_counts > args.threshold_counts_coarse
+    fine_registration_arrays = {
+        "src": src,
+        "sts_coords_transformed": sts_coords_transformed,
+        "sts_coords_coarse": sts_coords_coarse,
+        "tile_codes": tile_id.codes,
+        "valid_tile_codes": tile_id[_valid_counts].codes[_i_sts_coords_coarse_within_image_bounds],
+        "valid_counts": total_counts[_valid_counts][_i_sts_coords_coarse_within_image_bounds],
+    }
+    tile_results = _register_tiles(tile_codes, fine_registration_arrays, args)
+
+    # Merged in the order of the tiles, as with sequential registration
+    for tile_code, (_t_sts_coords_fine_transformed, _align_result) in zip(tile_codes, tile_results):
+        out_coords_output_fine[tile_id.codes == tile_code] = _t_sts_coords_fine_transformed
         metadata.add_alignment_result(_align_result)
 
     return (
@@ -508,18 +754,24 @@ def run_pairwise_aligner(args):
     # Loading the spatial transcriptomics data
     sts = load_properties_from_adata(args.h5_in, properties=["obsm/spatial", "obs/total_counts", "obs/tile_id"])
 
-    # Loading image data
+    # The pseudoimage pyramid of the coarse registration is cached in the file, which is only kept
+    # open for writing while the cache is updated
+    with h5py.File(args.h5_in, 'r+') as adata:
+        _load_coarse_pyramid(adata, sts["obsm/spatial"], sts["obs/total_counts"], args)
+
     with h5py.File(args.h5_in, 'r') as adata:
-        staining_image = adata[args.image_in][:]
-
-    # Running registration
-    sts_aligned_coarse, sts_aligned_fine, metadata = run_registration(
-        sts["obsm/spatial"],
-        sts["obs/total_counts"],
-        sts["obs/tile_id"],
-        staining_image,
-        args,
-    )
+        # Image data is read lazily (in bands of rows, or the windows of the tiles)
+        staining_image = adata[args.image_in]
+
+        # Running registration (the cached pseudoimage pyramid is read from the file)
+        sts_aligned_coarse, sts_aligned_fine, metadata = run_registration(
+            sts["obsm/spatial"],
+            sts["obs/total_counts"],
+            sts["obs/tile_id"],
+            staining_image,
+            args,
+            pseudoimage_cache=adata,
+        )
 
     # Saving the metadata (for QC)
     if args.metadata != "":
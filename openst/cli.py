@@ -51,6 +51,28 @@ def get_pseudoimage_parser():
         default=0.6,
         help="Final resolution (micron/pixel) for the segmentation mask.",
     )
+
+    # Gene (set) pseudoimages
+    parser.add_argument(
+        "--genes",
+        type=str,
+        nargs="+",
+        default=None,
+        help="""Genes to render as additional pseudoimages (one channel each), separated by space.
+              Gene sets are rendered as the sum of their genes, specified as 'NAME=GENE1,GENE2'""",
+    )
+    parser.add_argument(
+        "--gene-key",
+        type=str,
+        default=None,
+        help="Column of 'var' with the gene names used by --genes. If not set, the index of 'var' is used",
+    )
+    parser.add_argument(
+        "--matrix-key",
+        type=str,
+        default="X",
+        help="Path to the spot-by-gene matrix used by --genes (e.g., 'X' or 'layers/counts')",
+    )
     return parser
 
 
@@ -289,7 +311,8 @@ def get_segment_parser():
     parser.add_argument(
         "--chunked",
         action="store_true",
-        help="If set, segmentation is computed at non-overlapping chunks of size '--chunk-size'",
+        help="""If set, segmentation is computed at non-overlapping chunks of size '--chunk-size'.
+              With --rna-segment, the pseudoimage is also smoothed and resized by chunks""",
     )
     parser.add_argument(
         "--max-image-pixels",
@@ -648,6 +671,31 @@ def get_spatial_stitch_parser():
         help="If set, spatial coordinates are not transformed - just combine tiles into a single spatial object",
     )
 
+    parser.add_argument(
+        "--streaming",
+        default=False,
+        action="store_true",
+        help="""If set, tiles are merged into --h5-out one at a time, instead of loading all tiles in memory.
+                Only X, obs, var, obsm and uns are merged (layers and obsp are skipped)""",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        default=False,
+        action="store_true",
+        help="""If set and --h5-out was stitched before (with --streaming and the same settings), only the tiles
+                that are new or changed since (by modification time and size) are rewritten in place.
+                Otherwise, --h5-out is fully stitched in streaming mode (see --streaming)""",
+    )
+
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=1,
+        help="""Number of worker processes that load (and transform) tiles concurrently; the order of tiles
+                in the output is preserved. Set to -1 to use all CPUs""",
+    )
+
     parser.add_argument(
         "--metadata",
         type=str,
@@ -758,8 +806,9 @@ def get_barcode_preprocessing_parser():
     parser.add_argument(
         "--out-suffix",
         type=str,
-        default=".txt",
-        help="Suffix added to the name of the output files (i.e., extension)",
+        default=None,
+        help="""Suffix added to the name of the output files (i.e., extension).
+              Defaults to '.txt' for --out-format tsv (use '.txt.gz' for compressed output), or the format name""",
     )
     parser.add_argument(
         "--out-prefix",
@@ -778,6 +827,58 @@ def get_barcode_preprocessing_parser():
         action="store_true",
         help="(Optional) Apply reverse complementary after sequence cropping",
     )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=1,
+        help="""(Optional) Number of worker processes that parse the fastq in record-aligned blocks
+              (and of threads that decompress BGZF-compressed input).
+              Output is identical to the serial run. Set to -1 to use all CPUs""",
+    )
+    parser.add_argument(
+        "--max-open-files",
+        type=int,
+        default=128,
+        help="""(Optional) Maximum number of tile files kept open at once. Rows are buffered per tile,
+              and the least recently used file is closed (and later reopened for appending) beyond this limit""",
+    )
+    parser.add_argument(
+        "--out-format",
+        type=str,
+        default="tsv",
+        choices=["tsv", "parquet", "npz", "h5"],
+        help="""(Optional) Format of the output files. 'tsv' writes the 'cell_bc', 'xcoord' and 'ycoord' columns
+              as text; the columnar formats store 2-bit packed barcodes and int32 coordinates in chunks
+              (they can be loaded with openst.preprocessing.barcode_preprocessing.read_barcode_tile)""",
+    )
+    parser.add_argument(
+        "--checkpoint-interval-mb",
+        type=float,
+        default=1024,
+        help="""(Optional) Every this many MB of (uncompressed) fastq, all tile files are flushed and a checkpoint
+              is written into --tilecoords-out, so that an interrupted run can be resumed. Set to 0 to disable""",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="""(Optional) Resume an interrupted run (with the same arguments) from its last checkpoint.
+              Tile files are truncated to their state at the checkpoint""",
+    )
+    parser.add_argument(
+        "--tiles",
+        type=int,
+        nargs="+",
+        default=None,
+        help="""(Optional) Only write the barcodes of these tiles (e.g., 2101 2102), separated by space.
+              Only the parts of the fastq containing these tiles are decompressed, using the tile index""",
+    )
+    parser.add_argument(
+        "--tile-index",
+        type=str,
+        default=None,
+        help="""(Optional) Path of the tile index used with --tiles. It is built with a one-time scan of the fastq
+              if it does not exist. Defaults to '<fastq-in>.tile_index.tsv'""",
+    )
 
     return parser
 
@@ -1098,7 +1199,16 @@ def get_pairwise_aligner_parser():
         "--ransac-coarse-max-trials",
         type=int,
         default=2,
-        help="Times RANSAC will run (x1000 iterations) during coarse registration",
+        help="""Maximum RANSAC iterations (x1000) during coarse registration. Sampling stops earlier
+        once an all-inlier sample has been drawn with 99.9%% probability""",
+    )
+    coarse_params.add_argument(
+        "--early-exit-margin",
+        type=float,
+        default=None,
+        help="""If set, the search over flips and rotations during coarse registration stops once the
+        inliers of one hypothesis are this many times those of any other evaluated hypothesis (e.g., 3).
+        Disabled by default, so all hypotheses are evaluated""",
     )
 
     fine_params = parser.add_argument_group('Fine registration parameters')
@@ -1144,7 +1254,8 @@ def get_pairwise_aligner_parser():
         "--ransac-fine-max-trials",
         type=int,
         default=1,
-        help="Times RANSAC will run (x1000 iterations) during fine registration",
+        help="""Maximum RANSAC iterations (x1000) during fine registration. Sampling stops earlier
+        once an all-inlier sample has been drawn with 99.9%% probability""",
     )
     fine_params.add_argument(
         "--min-matches",
@@ -1185,7 +1296,8 @@ def get_pairwise_aligner_parser():
         "--num-workers",
         type=int,
         default=1,
-        help="Number of CPU workers for parallel processing",
+        help="""Number of CPU workers for parallel processing, e.g., of the flips and rotations during coarse
+        registration, and of the tiles during fine registration""",
     )
     compu_params.add_argument(
         "--device",
@@ -1194,6 +1306,13 @@ def get_pairwise_aligner_parser():
         choices=["cpu", "cuda"],
         help="Device used to run feature matching model. Can be ['cpu', 'cuda']",
     )
+    compu_params.add_argument(
+        "--matching-batch-size",
+        type=int,
+        default=1,
+        help="""Number of image pairs (e.g., all flips and rotations) matched in a single forward pass
+        of the feature matching model (LoFTR, KeyNet). Images are zero-padded to the same shape""",
+    )
     return parser
 
 
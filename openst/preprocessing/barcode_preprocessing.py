@@ -1,14 +1,32 @@
+import bz2
+import functools
 import gzip
+import json
 import logging
+import lzma
 import os
+import queue
+import shutil
+import struct
+import threading
 import time
-from collections.abc import Callable
+import zlib
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
-import pandas as pd
+import numpy as np
 from tqdm import tqdm
 
 tab = str.maketrans("ACTG", "TGAC")
 
+# byte-wise lookup table equivalent to `tab`, for uint8 sequence matrices
+_rev_comp_lut = np.arange(256, dtype=np.uint8)
+_rev_comp_lut[np.frombuffer(b"ACTG", dtype=np.uint8)] = np.frombuffer(b"TGAC", dtype=np.uint8)
+
+# amount of decompressed FASTQ (in bytes) handed to a worker at once
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
 
 def reverse_complement_table(seq):
     return seq.translate(tab)[::-1]
@@ -23,92 +41,1194 @@ def get_tile_info(seq_id: str) -> tuple[int, int, int, int]:
     return tuple(int(x) for x in info)
 
 
-written_files = set()
+def _parse_uints(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Parses the decimal digits in buf[starts[i]:ends[i]] for all i at once.
+    Runs one array pass per digit position, instead of one int() call per field.
+    """
+    widths = ends - starts
+    if len(widths) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if widths.min() < 1:
+        raise ValueError("Found an empty numeric field in the sequence ID lines")
+
+    values = np.zeros(len(starts), dtype=np.int64)
+    for j in range(widths.max()):
+        in_field = j < widths
+        digits = buf[np.where(in_field, starts + j, 0)].astype(np.int64) - ord("0")
+        if np.any(in_field & ((digits < 0) | (digits > 9))):
+            raise ValueError("Found a non-numeric lane, tile or coordinate in the sequence ID lines")
+        values = np.where(in_field, values * 10 + digits, values)
+    return values
+
+
+def _line_bounds(buf: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive, without '\\n' or '\\r\\n') positions of every line in buf."""
+    ends = np.flatnonzero(buf == ord("\n"))
+    if len(buf) > 0 and buf[-1] != ord("\n"):
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    has_cr = buf[np.maximum(ends - 1, 0)] == ord("\r")
+    ends = ends - (has_cr & (ends > starts))
+    return starts, ends
+
+
+def parse_tile_info(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of `get_tile_info`, for the sequence ID lines buf[starts[i]:ends[i]].
+
+    Returns:
+        np.ndarray: (n, 4) array with the lane, tile, x-coord and y-coord of every line.
+    """
+    # the read ID ends at the first space (if any)
+    spaces = np.flatnonzero(buf == ord(" "))
+    next_space = np.searchsorted(spaces, starts)
+    id_ends = np.append(spaces, len(buf))[next_space]
+    id_ends = np.minimum(id_ends, ends)
+
+    # the last 4 colon-separated fields of the read ID
+    colons = np.flatnonzero(buf == ord(":"))
+    last_colon = np.searchsorted(colons, id_ends)
+    if np.any(last_colon - np.searchsorted(colons, starts) < 4):
+        raise ValueError("Could not find lane, tile and coordinates in the sequence ID lines")
+    field_starts = [colons[last_colon - k] + 1 for k in (4, 3, 2, 1)]
+    field_ends = [colons[last_colon - k] for k in (3, 2, 1)] + [id_ends]
+
+    return np.stack([_parse_uints(buf, s, e) for s, e in zip(field_starts, field_ends)], axis=1)
+
+
+def preprocess_sequences(
+    buf: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    *,
+    crop_seq_slice: slice = slice(None),
+    rev_comp: bool = False,
+) -> np.ndarray:
+    """
+    Crops and (optionally) reverse-complements the sequences buf[starts[i]:ends[i]].
+    Sequences of the same length are processed together, as a lookup-table gather over a uint8 matrix.
+
+    Returns:
+        np.ndarray: fixed-width bytes array (dtype 'S') with one barcode per sequence.
+    """
+    lengths = ends - starts
+    barcodes = np.zeros(len(lengths), dtype="S1")
+    for length in np.unique(lengths):
+        columns = np.arange(length)[crop_seq_slice]
+        if len(columns) == 0:
+            continue
+        if rev_comp:
+            columns = columns[::-1]
+        is_length = lengths == length
+        seqs = buf[starts[is_length, None] + columns]
+        if rev_comp:
+            seqs = _rev_comp_lut[seqs]
+        seqs = np.ascontiguousarray(seqs).view(f"S{len(columns)}").ravel()
+        if seqs.itemsize > barcodes.itemsize:
+            barcodes = barcodes.astype(seqs.dtype)
+        barcodes[is_length] = seqs
+    return barcodes
+
+
+# per-tile buffers are written once they reach this size, or once all buffers add up to the total
+DEFAULT_FLUSH_BYTES = 1024 * 1024
+DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_OPEN_FILES = 128
+
+# appending to these creates a new stream member, which readers (gzip, zcat, pandas) concatenate transparently
+_COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+TILE_FILE_HEADER = b"cell_bc\txcoord\tycoord\n"
+
+SUPPORTED_OUT_FORMATS = ["tsv", "parquet", "npz", "h5"]
+OUT_FORMAT_SUFFIXES = {"tsv": ".txt", "parquet": ".parquet", "npz": ".npz", "h5": ".h5"}
+
+# 2-bit codes of the (case-insensitive) bases; anything else is stored as 'N' in the columnar formats
+_base_codes = np.zeros(256, dtype=np.uint8)
+_is_base = np.zeros(256, dtype=bool)
+for _code, _bases in enumerate([b"Aa", b"Cc", b"Gg", b"Tt"]):
+    _base_codes[np.frombuffer(_bases, dtype=np.uint8)] = _code
+    _is_base[np.frombuffer(_bases, dtype=np.uint8)] = True
+_code_bases = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+# rows per chunk of the h5 datasets
+H5_CHUNK_ROWS = 16384
+
+
+def pack_barcodes(barcodes: np.ndarray, barcode_length: int | None = None) -> dict[str, np.ndarray]:
+    """
+    Packs a fixed-width bytes array of barcodes into 2 bits per base.
+
+    Args:
+        barcodes (np.ndarray): barcodes (dtype 'S'), shorter barcodes are padded with null bytes.
+        barcode_length (int, optional): width of the packed barcodes; defaults to the width of `barcodes`.
+
+    Returns:
+        dict: with the following arrays, one row per barcode
+            - 'cell_bc' (uint8, ceil(barcode_length / 4) columns): 2-bit codes, A=0, C=1, G=2, T=3.
+            - 'cell_bc_n' (uint8, ceil(barcode_length / 8) columns): bit mask of positions that are not A/C/G/T.
+            - 'cell_bc_len' (uint8): length of each barcode.
+    """
+    if barcode_length is None:
+        barcode_length = barcodes.itemsize
+    elif barcodes.itemsize > barcode_length:
+        raise ValueError(f"Found barcodes longer than {barcode_length}, the barcode length of the output file")
+
+    bases = barcodes.astype(f"S{barcode_length}").view(np.uint8).reshape(len(barcodes), barcode_length)
+    lengths = np.char.str_len(barcodes).astype(np.uint8)
+    in_barcode = np.arange(barcode_length) < lengths[:, None]
+
+    codes = np.zeros((len(barcodes), -(-barcode_length // 4) * 4), dtype=np.uint8)
+    codes[:, :barcode_length] = _base_codes[bases]
+    codes = codes.reshape(len(barcodes), -1, 4)
+    packed = (codes[..., 0] << 6) | (codes[..., 1] << 4) | (codes[..., 2] << 2) | codes[..., 3]
+
+    return {
+        "cell_bc": packed,
+        "cell_bc_n": np.packbits(in_barcode & ~_is_base[bases], axis=1),
+        "cell_bc_len": lengths,
+    }
+
+
+def unpack_barcodes(cell_bc: np.ndarray, cell_bc_n: np.ndarray, cell_bc_len: np.ndarray) -> np.ndarray:
+    """
+    Inverse of `pack_barcodes`.
+
+    Returns:
+        np.ndarray: barcodes (dtype 'S'), with every base other than A/C/G/T as 'N'.
+    """
+    barcode_length = int(cell_bc_len.max()) if len(cell_bc_len) else 1
+    codes = np.stack([(cell_bc >> shift) & 3 for shift in (6, 4, 2, 0)], axis=-1).reshape(len(cell_bc), -1)
+    bases = _code_bases[codes[:, :barcode_length]]
+    bases[np.unpackbits(cell_bc_n, axis=1, count=barcode_length).astype(bool)] = ord("N")
+    bases[np.arange(barcode_length) >= cell_bc_len[:, None]] = 0
+    return np.ascontiguousarray(bases).view(f"S{barcode_length}").ravel()
+
+
+def _pack_tile_columns(barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray, barcode_length: int) -> dict:
+    columns = pack_barcodes(barcodes, barcode_length)
+    columns["xcoord"] = xs.astype(np.int32)
+    columns["ycoord"] = ys.astype(np.int32)
+    return columns
+
+
+class _TsvTileFormat:
+    """Tab-separated text, compressed on the fly if the file name ends in '.gz', '.bz2' or '.xz'."""
+
+    def open(self, fpath: str, new: bool):
+        handle = _COMPRESSED_OPENERS.get(os.path.splitext(fpath)[1], open)(fpath, "ab")
+        if new:
+            handle.write(TILE_FILE_HEADER)
+        return handle
+
+    def write(self, handle, barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        handle.write(b"".join([b"%s\t%d\t%d\n" % row for row in zip(barcodes.tolist(), xs.tolist(), ys.tolist())]))
+
+    def close(self, handle) -> None:
+        handle.close()
+
+    def truncate(self, fpath: str, n_rows: int, n_bytes: int) -> None:
+        # files are closed at checkpoints, so compressed streams end at n_bytes, too
+        os.truncate(fpath, n_bytes)
+
+
+class _H5TileFormat:
+    """One resizable, chunked and compressed dataset per column; every write appends rows."""
+
+    def open(self, fpath: str, new: bool):
+        import h5py
+
+        return h5py.File(fpath, "a")
+
+    def write(self, handle, barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        if "barcode_length" not in handle.attrs:
+            handle.attrs["barcode_length"] = barcodes.itemsize
+
+        columns = _pack_tile_columns(barcodes, xs, ys, int(handle.attrs["barcode_length"]))
+        for name, values in columns.items():
+            if name not in handle:
+                handle.create_dataset(
+                    name,
+                    shape=(0,) + values.shape[1:],
+                    maxshape=(None,) + values.shape[1:],
+                    chunks=(H5_CHUNK_ROWS,) + values.shape[1:],
+                    dtype=values.dtype,
+                    compression="gzip",
+                )
+            n_rows = handle[name].shape[0]
+            handle[name].resize(n_rows + len(values), axis=0)
+            handle[name][n_rows:] = values
+
+    def close(self, handle) -> None:
+        handle.close()
+
+    def truncate(self, fpath: str, n_rows: int, n_bytes: int) -> None:
+        import h5py
+
+        with h5py.File(fpath, "a") as f:
+            for name in f.keys():
+                f[name].resize(n_rows, axis=0)
+
+
+class _NpzTileFormat:
+    """A zip archive (as np.savez_compressed) with one member per column and written chunk."""
+
+    def open(self, fpath: str, new: bool):
+        import zipfile
+
+        return zipfile.ZipFile(fpath, "a", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, handle, barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        chunk = sum(name.startswith("xcoord.") for name in handle.namelist())
+        for name, values in _pack_tile_columns(barcodes, xs, ys, barcodes.itemsize).items():
+            with handle.open(f"{name}.{chunk:06d}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, values)
+
+    def close(self, handle) -> None:
+        handle.close()
+
+    def truncate(self, fpath: str, n_rows: int, n_bytes: int) -> None:
+        import zipfile
+
+        # members cannot be removed from a zip archive, so the chunks that are kept are copied over
+        with zipfile.ZipFile(fpath, "r") as src, zipfile.ZipFile(f"{fpath}.tmp", "w", zipfile.ZIP_DEFLATED) as dst:
+            n_kept = 0
+            for chunk_name in sorted(name for name in src.namelist() if name.startswith("xcoord.")):
+                if n_kept >= n_rows:
+                    break
+                chunk = chunk_name[len("xcoord.") :]
+                for name in src.namelist():
+                    if name.endswith(f".{chunk}"):
+                        dst.writestr(name, src.read(name))
+                with src.open(chunk_name) as f:
+                    n_kept += len(np.lib.format.read_array(f))
+        os.replace(f"{fpath}.tmp", fpath)
+
+
+class _ParquetTileFormat:
+    """
+    Fixed-size binary columns for the packed barcodes and int32 columns for the coordinates;
+    every write is a row group. Parquet files cannot be appended to once closed, so a tile is a
+    directory of part files (readable as a parquet dataset), and every reopen of the tile
+    (after being closed by the writer pool) starts a new part.
+    """
+
+    def __init__(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                """Optional modules need to be installed to write parquet files.
+                   Please run 'pip install pyarrow'"""
+            )
+
+    def open(self, fpath: str, new: bool):
+        import pyarrow.parquet as pq
+
+        os.makedirs(fpath, exist_ok=True)
+        parts = _parquet_parts(fpath)
+        part = os.path.join(fpath, f"part-{len(parts):04d}.parquet")
+        handle = {"fpath": part, "writer": None, "barcode_length": None}
+        if parts:
+            handle["barcode_length"] = int(pq.read_schema(parts[0]).metadata[b"barcode_length"])
+        return handle
+
+    def write(self, handle, barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if handle["barcode_length"] is None:
+            handle["barcode_length"] = barcodes.itemsize
+
+        columns = _pack_tile_columns(barcodes, xs, ys, handle["barcode_length"])
+        table = pa.table(
+            {
+                name: (
+                    pa.FixedSizeBinaryArray.from_buffers(
+                        pa.binary(values.shape[1]), len(values), [None, pa.py_buffer(values.tobytes())]
+                    )
+                    if values.ndim == 2
+                    else pa.array(values)
+                )
+                for name, values in columns.items()
+            }
+        ).replace_schema_metadata({"barcode_length": str(handle["barcode_length"])})
+
+        if handle["writer"] is None:
+            handle["writer"] = pq.ParquetWriter(handle["fpath"], table.schema)
+        handle["writer"].write_table(table)
+
+    def close(self, handle) -> None:
+        if handle["writer"] is not None:
+            handle["writer"].close()
+
+    def truncate(self, fpath: str, n_rows: int, n_bytes: int) -> None:
+        import pyarrow.parquet as pq
+
+        n_kept = 0
+        for part in _parquet_parts(fpath):
+            part_rows = pq.read_metadata(part).num_rows
+            if n_kept >= n_rows:
+                os.remove(part)
+            elif n_kept + part_rows > n_rows:
+                pq.write_table(pq.read_table(part).slice(0, n_rows - n_kept), part)
+            n_kept += part_rows
+
+
+def _parquet_parts(fpath: str) -> list[str]:
+    if not os.path.isdir(fpath):
+        return []
+    return [os.path.join(fpath, name) for name in sorted(os.listdir(fpath)) if name.startswith("part-")]
+
+
+def _tile_file_size(fpath: str) -> int:
+    if os.path.isdir(fpath):
+        return sum(os.path.getsize(part) for part in _parquet_parts(fpath))
+    return os.path.getsize(fpath)
+
+
+def _fixed_size_binary_to_numpy(column) -> np.ndarray:
+    width = column.type.byte_width
+    chunks = [
+        np.frombuffer(chunk.buffers()[1], dtype=np.uint8)[chunk.offset * width : (chunk.offset + len(chunk)) * width]
+        for chunk in column.chunks
+    ]
+    return np.concatenate(chunks or [np.zeros(0, dtype=np.uint8)]).reshape(-1, width)
+
+
+_TILE_FORMATS = {"tsv": _TsvTileFormat, "parquet": _ParquetTileFormat, "npz": _NpzTileFormat, "h5": _H5TileFormat}
+
+
+def read_barcode_tile(fpath: str, out_format: str | None = None):
+    """
+    Reads a tile file written by `barcode_preprocessing`, in any of the SUPPORTED_OUT_FORMATS.
+
+    Args:
+        fpath (str): path to the tile file.
+        out_format (str, optional): format of the file; inferred from the file suffix if not given.
+
+    Returns:
+        pd.DataFrame: with the columns 'cell_bc', 'xcoord' and 'ycoord'.
+    """
+    import pandas as pd
+
+    if out_format is None:
+        suffix = os.path.splitext(fpath)[1]
+        out_format = {".parquet": "parquet", ".npz": "npz", ".h5": "h5", ".hdf5": "h5"}.get(suffix, "tsv")
+
+    if out_format == "tsv":
+        return pd.read_csv(fpath, sep="\t")
+    elif out_format == "h5":
+        import h5py
+
+        with h5py.File(fpath, "r") as f:
+            columns = {name: f[name][:] for name in f.keys()}
+    elif out_format == "npz":
+        with np.load(fpath) as f:
+            columns = {
+                name: np.concatenate([f[k] for k in sorted(f.files) if k.split(".")[0] == name])
+                for name in {k.split(".")[0] for k in f.files}
+            }
+    elif out_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.concat_tables([pq.read_table(part) for part in _parquet_parts(fpath)] or [pq.read_table(fpath)])
+        columns = {name: table[name].to_numpy() for name in ["cell_bc_len", "xcoord", "ycoord"]}
+        for name in ["cell_bc", "cell_bc_n"]:
+            columns[name] = _fixed_size_binary_to_numpy(table[name])
+    else:
+        raise ValueError(f"Unknown output format '{out_format}', must be one of {SUPPORTED_OUT_FORMATS}")
+
+    return pd.DataFrame(
+        {
+            "cell_bc": unpack_barcodes(columns["cell_bc"], columns["cell_bc_n"], columns["cell_bc_len"]).astype(str),
+            "xcoord": columns["xcoord"],
+            "ycoord": columns["ycoord"],
+        }
+    )
 
 
-def append_barcodes_to_disk(
+class TileWriterPool:
+    """
+    Writes barcodes and coordinates into one file per tile, holding the state of a single run.
+
+    Rows are buffered per tile and written once a tile buffer reaches `flush_bytes` (or when all buffers
+    exceed `max_buffered_bytes`). At most `max_open_files` handles are kept open; the least recently
+    used one is closed when the limit is reached, and reopened in append mode if the tile shows up again.
+    Files are written in `out_format`, one of SUPPORTED_OUT_FORMATS (see `read_barcode_tile`).
+    """
+
+    def __init__(
+        self,
+        *,  # enforce kwargs
+        out_path: str,
+        out_prefix: str,
+        out_suffix: str,
+        out_format: str = "tsv",
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        max_buffered_bytes: int = DEFAULT_MAX_BUFFERED_BYTES,
+        max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+        resume_state: dict | None = None,
+        on_new_file: Callable[[str], None] | None = None,
+    ):
+        if out_format not in _TILE_FORMATS:
+            raise ValueError(f"Unknown output format '{out_format}', must be one of {SUPPORTED_OUT_FORMATS}")
+
+        self.out_path = out_path
+        self.out_prefix = out_prefix
+        self.out_suffix = out_suffix
+        self.flush_bytes = flush_bytes
+        self.max_buffered_bytes = max_buffered_bytes
+        self.max_open_files = max(max_open_files, 1)
+        self.on_new_file = on_new_file
+
+        self.written_files = set()
+        self.n_rows = {}
+        self._format = _TILE_FORMATS[out_format]()
+        self._opened_files = set()
+        self._handles = OrderedDict()  # in least to most recently used order
+        self._buffers = {}
+        self._buffer_sizes = {}
+        self._buffered_bytes = 0
+
+        # files from an interrupted run are cut back to their state at the last checkpoint
+        for fpath, tile_state in (resume_state or {}).items():
+            self._format.truncate(fpath, tile_state["n_rows"], tile_state["n_bytes"])
+            self.written_files.add(fpath)
+            self._opened_files.add(fpath)
+            self.n_rows[fpath] = tile_state["n_rows"]
+
+    def tile_path(self, lane: int, tile: int) -> str:
+        # fname = f"{lane}_{tile}"
+        fname = f"{tile}"
+        return os.path.join(self.out_path, f"{self.out_prefix}{fname}{self.out_suffix}")
+
+    def append(self, *, lane: int, tile: int, barcodes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> None:
+        fpath = self.tile_path(lane, tile)
+        if fpath not in self.written_files:
+            if os.path.exists(fpath):
+                raise FileExistsError(f"{fpath} already exists prior to this run")
+            if self.on_new_file is not None:
+                self.on_new_file(fpath)
+            self.written_files.add(fpath)
+
+        if barcodes.dtype.kind == "U":
+            barcodes = np.char.encode(barcodes)
+        self._buffers.setdefault(fpath, []).append((barcodes, xs, ys))
+        n_bytes = barcodes.nbytes + xs.nbytes + ys.nbytes
+        self._buffer_sizes[fpath] = self._buffer_sizes.get(fpath, 0) + n_bytes
+        self._buffered_bytes += n_bytes
+
+        if self._buffered_bytes > self.max_buffered_bytes:
+            self.flush()
+        elif self._buffer_sizes[fpath] >= self.flush_bytes:
+            self._flush_file(fpath)
+
+    def flush(self) -> None:
+        """Writes all buffered rows to disk."""
+        for fpath in list(self._buffers):
+            self._flush_file(fpath)
+
+    def close(self) -> None:
+        self.flush()
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            self._format.close(handle)
+
+    def checkpoint(self) -> dict:
+        """
+        Writes all buffered rows and closes all files, so that they are complete on disk.
+        The pool can still be used afterwards.
+
+        Returns:
+            dict: number of rows and bytes of every file, which can be passed as `resume_state`.
+        """
+        self.close()
+        return {fpath: {"n_rows": n_rows, "n_bytes": _tile_file_size(fpath)} for fpath, n_rows in self.n_rows.items()}
+
+    def _flush_file(self, fpath: str) -> None:
+        buffer = self._buffers.pop(fpath, None)
+        if not buffer:
+            return
+        self._buffered_bytes -= self._buffer_sizes.pop(fpath)
+        barcodes, xs, ys = [np.concatenate(column) for column in zip(*buffer)]
+        self._format.write(self._get_handle(fpath), barcodes, xs, ys)
+        self.n_rows[fpath] = self.n_rows.get(fpath, 0) + len(xs)
+
+    def _get_handle(self, fpath: str):
+        if fpath in self._handles:
+            self._handles.move_to_end(fpath)
+            return self._handles[fpath]
+
+        if len(self._handles) >= self.max_open_files:
+            _, lru_handle = self._handles.popitem(last=False)
+            self._format.close(lru_handle)
+
+        self._handles[fpath] = self._format.open(fpath, new=fpath not in self._opened_files)
+        self._opened_files.add(fpath)
+        return self._handles[fpath]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _run_bounds(lane_tile: np.ndarray) -> np.ndarray:
+    """Bounds of the runs of consecutive rows with the same (lane, tile), from 0 to the number of rows."""
+    run_starts = np.flatnonzero(np.any(lane_tile[1:] != lane_tile[:-1], axis=1)) + 1
+    return np.concatenate([[0], run_starts, [len(lane_tile)]])
+
+
+def parse_fastq_block(
+    block: bytes,
     *,  # enforce kwargs
-    lane: int,
-    tile: int,
-    barcodes: list[str],
-    xs: list[int],
-    ys: list[int],
-    out_path: str,
-    out_prefix: str,
-    out_suffix: str,
-) -> None:
-    # fname = f"{lane}_{tile}"
-    fname = f"{tile}"
-    fpath = os.path.join(out_path, f"{out_prefix}{fname}{out_suffix}")
-    df = pd.DataFrame({"cell_bc": barcodes, "xcoord": xs, "ycoord": ys})
-
-    exists = os.path.exists(fpath)
-    if exists and fpath not in written_files:
-        raise FileExistsError(f"{fpath} already exists prior to this run")
-    written_files.add(fpath)
-
-    df.to_csv(
-        fpath,
-        index=False,
-        header=not exists,
-        sep="\t",
-        mode="a",
+    crop_seq_slice: slice = slice(None),
+    rev_comp: bool = False,
+    sequence_preprocessor: Callable[[str], str] | None = None,
+) -> list[tuple[tuple[int, int], np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Parses a record-aligned FASTQ block into runs of consecutive reads from the same (lane, tile).
+    Headers and sequences are parsed with array operations over the whole block; when a custom
+    `sequence_preprocessor` is given, it is applied per read instead of `crop_seq_slice` and `rev_comp`.
+
+    Returns:
+        list: one (lane_tile, barcodes, xs, ys) tuple per run, in input order.
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    line_starts, line_ends = _line_bounds(buf)
+    n_reads = len(line_starts) // 4
+    header_starts, header_ends = line_starts[0::4][:n_reads], line_ends[0::4][:n_reads]
+    seq_starts, seq_ends = line_starts[1::4][:n_reads], line_ends[1::4][:n_reads]
+
+    tile_info = parse_tile_info(buf, header_starts, header_ends)
+    if sequence_preprocessor is None:
+        barcodes = preprocess_sequences(buf, seq_starts, seq_ends, crop_seq_slice=crop_seq_slice, rev_comp=rev_comp)
+    else:
+        barcodes = np.array([sequence_preprocessor(block[s:e].decode()) for s, e in zip(seq_starts, seq_ends)])
+
+    lane_tile = tile_info[:, :2]
+    run_bounds = _run_bounds(lane_tile) if n_reads else []
+    return [
+        (tuple(lane_tile[s].tolist()), barcodes[s:e], tile_info[s:e, 2], tile_info[s:e, 3])
+        for s, e in zip(run_bounds[:-1], run_bounds[1:])
+    ]
+
+
+def _map_bounded(executor: Executor | None, fn: Callable, iterable: Iterable, max_pending: int) -> Iterator:
+    """
+    Like `executor.map`, but keeps at most `max_pending` tasks in flight (bounded memory),
+    and yields results in submission order. Runs in the calling process if `executor` is None.
+    """
+    if executor is None:
+        yield from map(fn, iterable)
+        return
+
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# decompressed chunks (or groups of BGZF blocks) that are read ahead of the parser
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_READ_AHEAD = 8
+
+
+def is_bgzf(fpath: str) -> bool:
+    """
+    Whether the file is BGZF-compressed, i.e., a series of gzip members with a 'BC' extra field
+    that holds the member size (see the SAM/BAM specification, section 4.1).
+    """
+    with open(fpath, "rb") as f:
+        header = f.read(18)
+    return (
+        len(header) == 18
+        and header[:4] == b"\x1f\x8b\x08\x04"
+        and header[12:14] == b"BC"
+        and struct.unpack("<H", header[14:16])[0] == 2
     )
 
 
+def _read_bgzf_members(f) -> Iterator[bytes]:
+    """Reads the (compressed) members of a BGZF file one at a time, without decompressing them."""
+    while True:
+        header = f.read(12)
+        if not header:
+            break
+        if len(header) < 12 or header[:4] != b"\x1f\x8b\x08\x04":
+            raise ValueError("Found an invalid BGZF block header")
+        extra = f.read(struct.unpack("<H", header[10:12])[0])
+
+        member_size = None
+        i = 0
+        while i + 4 <= len(extra):
+            subfield_size = struct.unpack("<H", extra[i + 2 : i + 4])[0]
+            if extra[i : i + 2] == b"BC" and subfield_size == 2:
+                member_size = struct.unpack("<H", extra[i + 4 : i + 6])[0] + 1
+            i += 4 + subfield_size
+        if member_size is None:
+            raise ValueError("Found a BGZF block without block size ('BC' field)")
+
+        yield header + extra + f.read(member_size - len(header) - len(extra))
+
+
+def _inflate_bgzf_members(members: list[bytes]) -> bytes:
+    data = []
+    for member in members:
+        header_size = 12 + struct.unpack("<H", member[10:12])[0]
+        inflated = zlib.decompress(member[header_size:-8], wbits=-15)
+        if len(inflated) != struct.unpack("<I", member[-4:])[0]:
+            raise ValueError("Found a corrupted BGZF block (unexpected decompressed size)")
+        data.append(inflated)
+    return b"".join(data)
+
+
+def _iter_bgzf_chunks(
+    fpath: str, num_threads: int, chunk_size: int, seek_point: tuple[int, int] = (0, 0)
+) -> Iterator[tuple[bytes, int, tuple[int, int]]]:
+    """
+    Decompresses a BGZF file in `num_threads` threads (zlib releases the GIL), in groups of
+    members adding up to about `chunk_size` compressed bytes, starting from the member at `seek_point`.
+    Every chunk starts at a member boundary, so it can be used as a seek point itself.
+    """
+
+    def _member_groups(f):
+        group, group_size, group_start = [], 0, f.tell()
+        for member in _read_bgzf_members(f):
+            group.append(member)
+            group_size += len(member)
+            if group_size >= chunk_size:
+                yield group, group_start, f.tell()
+                group, group_size, group_start = [], 0, f.tell()
+        if group:
+            yield group, group_start, f.tell()
+
+    offsets = deque()
+
+    def _groups_with_offsets(f):
+        for group, group_start, group_end in _member_groups(f):
+            offsets.append((group_start, group_end))
+            yield group
+
+    with open(fpath, "rb") as f, ThreadPoolExecutor(max_workers=num_threads) as executor:
+        f.seek(seek_point[0])
+        uncompressed_offset = seek_point[1]
+        for data in _map_bounded(executor, _inflate_bgzf_members, _groups_with_offsets(f), 2 * num_threads):
+            group_start, group_end = offsets.popleft()
+            yield data, group_end, (group_start, uncompressed_offset)
+            uncompressed_offset += len(data)
+
+
+def _iter_gzip_chunks(fpath: str, chunk_size: int, read_ahead: int) -> Iterator[tuple[bytes, int, tuple[int, int]]]:
+    """
+    Decompresses a gzip file in a background thread, which keeps up to `read_ahead` chunks of
+    `chunk_size` decompressed bytes ready for the consumer. Plain gzip can only be decompressed
+    from the start, so the seek point of every chunk is (0, 0).
+    """
+    chunks = queue.Queue(maxsize=read_ahead)
+    stop = threading.Event()
+
+    def _reader():
+        try:
+            with gzip.open(fpath, "rb") as f:
+                while not stop.is_set():
+                    data = f.read(chunk_size)
+                    chunks.put((data, f.fileobj.tell()))
+                    if not data:
+                        break
+        except BaseException as e:
+            chunks.put(e)
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = chunks.get()
+            if isinstance(item, BaseException):
+                raise item
+            data, offset = item
+            if not data:
+                break
+            yield data, offset, (0, 0)
+    finally:
+        stop.set()
+        # unblock the reader if it is waiting on a full queue
+        while reader.is_alive():
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                reader.join(0.01)
+
+
+def read_fastq_chunks(
+    fpath: str,
+    *,  # enforce kwargs
+    start: int = 0,
+    seek_point: tuple[int, int] = (0, 0),
+    num_threads: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    read_ahead: int = DEFAULT_READ_AHEAD,
+) -> Iterator[tuple[bytes, int, tuple[int, int]]]:
+    """
+    Yields the decompressed content of a gzip-compressed FASTQ as raw byte chunks, from the
+    uncompressed offset `start` onwards. BGZF files are decompressed in parallel by `num_threads`
+    threads; other gzip files are decompressed ahead of time in a single thread.
+
+    Args:
+        start (int, optional): uncompressed offset of the first byte to yield.
+        seek_point (tuple, optional): (compressed, uncompressed) offsets of a BGZF member at or before `start`,
+            as yielded with a previous chunk. Decompression starts there; ignored for plain gzip.
+
+    Yields:
+        tuple: the chunk, the offset (in compressed bytes) read so far, and the seek point of the chunk.
+    """
+    if is_bgzf(fpath):
+        logging.info(f"Detected BGZF compression for {fpath}, decompressing with {num_threads} threads")
+        chunks = _iter_bgzf_chunks(fpath, num_threads, chunk_size, tuple(seek_point))
+        position = seek_point[1]
+    else:
+        chunks = _iter_gzip_chunks(fpath, chunk_size, read_ahead)
+        position = 0
+
+    if position > start:
+        raise ValueError(f"The seek point {seek_point} is after the start offset {start}")
+
+    for data, compressed_offset, chunk_seek_point in chunks:
+        position += len(data)
+        if position <= start:
+            continue
+        yield data[max(start - position + len(data), 0) :], compressed_offset, chunk_seek_point
+
+
+def _record_boundary(data: bytes) -> int:
+    """Position right after the last complete FASTQ record (i.e., group of 4 lines) in data."""
+    n_incomplete_lines = data.count(b"\n") % 4
+    end = len(data)
+    for _ in range(n_incomplete_lines + 1):
+        end = data.rfind(b"\n", 0, end)
+        if end < 0:
+            return 0
+    return end + 1
+
+
+def read_fastq_blocks(
+    chunks: Iterable[tuple[bytes, int, tuple[int, int]]], block_size: int = DEFAULT_BLOCK_SIZE, start: int = 0
+) -> Iterator[tuple[bytes, int, int, tuple[int, int]]]:
+    """
+    Joins the raw chunks from `read_fastq_chunks` (read from the uncompressed offset `start`) into blocks
+    of at least `block_size` bytes. Every block ends at a record boundary, i.e., it contains a multiple of 4 lines.
+
+    Yields:
+        tuple: the block, the offset (in compressed bytes) read so far, the uncompressed offset right after
+            the block, and a seek point (see `read_fastq_chunks`) to restart reading from that offset.
+    """
+    pending, pending_size = [], 0
+    compressed_offset, seek_point = 0, (0, 0)
+    for chunk, compressed_offset, seek_point in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < block_size:
+            continue
+        data = b"".join(pending)
+        boundary = _record_boundary(data)
+        if boundary > 0:
+            start += boundary
+            yield data[:boundary], compressed_offset, start, seek_point
+            data = data[boundary:]
+        pending, pending_size = [data], len(data)
+    if pending_size > 0:
+        yield b"".join(pending), compressed_offset, start + pending_size, seek_point
+
+
+TILE_INDEX_COLUMNS = ["lane", "tile", "start", "end", "n_reads", "seek_compressed", "seek_uncompressed"]
+
+
+def _index_fastq_block(block: bytes) -> np.ndarray:
+    """
+    Finds the runs of consecutive reads from the same (lane, tile) in a record-aligned block.
+
+    Returns:
+        np.ndarray: (n_runs, 5) array with the lane, tile, start and end (byte offsets within the block)
+            and number of reads of every run.
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    line_starts, line_ends = _line_bounds(buf)
+    n_reads = len(line_starts) // 4
+    if n_reads == 0:
+        return np.zeros((0, 5), dtype=np.int64)
+
+    header_starts = line_starts[0::4][:n_reads]
+    lane_tile = parse_tile_info(buf, header_starts, line_ends[0::4][:n_reads])[:, :2]
+    run_bounds = _run_bounds(lane_tile)
+    return np.column_stack(
+        [
+            lane_tile[run_bounds[:-1]],
+            header_starts[run_bounds[:-1]],
+            np.append(header_starts[run_bounds[1:-1]], len(block)),
+            np.diff(run_bounds),
+        ]
+    )
+
+
+def build_tile_index(fpath: str, *, num_workers: int = 1, block_size: int = DEFAULT_BLOCK_SIZE):
+    """
+    Scans a FASTQ once, and records where every run of consecutive reads from the same (lane, tile) is.
+
+    Returns:
+        pd.DataFrame: one row per run, with the columns
+            - 'lane', 'tile', 'n_reads': the lane and tile of the run, and its number of reads.
+            - 'start', 'end': uncompressed byte offsets of the run.
+            - 'seek_compressed', 'seek_uncompressed': a seek point to start reading at 'start'
+              (see `read_fastq_chunks`); (0, 0) unless the FASTQ is BGZF-compressed.
+    """
+    import pandas as pd
+
+    if num_workers <= 0:
+        num_workers = os.cpu_count()
+    executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+
+    block_positions = deque()
+
+    def _blocks():
+        chunks = read_fastq_chunks(fpath, num_threads=num_workers)
+        for block, *position in read_fastq_blocks(chunks, block_size):
+            block_positions.append((len(block), *position))
+            yield block
+
+    runs = []
+    block_seek_point = (0, 0)  # the seek point of the previous block end is valid for the next block start
+    last_byte = 0
+    try:
+        with tqdm(total=os.stat(fpath).st_size, unit="B", desc="Indexing tiles") as pbar:
+            for block_runs in _map_bounded(executor, _index_fastq_block, _blocks(), max_pending=2 * num_workers):
+                block_length, curr_byte, block_end, seek_point = block_positions.popleft()
+                block_runs[:, 2:4] += block_end - block_length
+                for lane, tile, start, end, n_reads in block_runs.tolist():
+                    if runs and runs[-1][:2] == [lane, tile] and runs[-1][3] == start:
+                        # the same run, split across blocks
+                        runs[-1][3] = end
+                        runs[-1][4] += n_reads
+                    else:
+                        runs.append([lane, tile, start, end, n_reads, *block_seek_point])
+                block_seek_point = seek_point
+                pbar.update(curr_byte - last_byte)
+                last_byte = curr_byte
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return pd.DataFrame(runs, columns=TILE_INDEX_COLUMNS, dtype=np.int64)
+
+
+def load_tile_index(fpath: str, index_path: str, *, num_workers: int = 1):
+    """
+    Loads the tile index of the FASTQ `fpath` from `index_path`; the index is built and written there
+    first if it does not exist yet (or belongs to a FASTQ of a different size).
+    """
+    import pandas as pd
+
+    fastq_size = os.stat(fpath).st_size
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            header = f.readline().strip()
+        if header == f"# fastq_size={fastq_size}":
+            return pd.read_csv(index_path, sep="\t", comment="#", dtype=np.int64)
+        logging.warning(f"The tile index {index_path} does not match {fpath}, it will be rebuilt")
+
+    logging.info(f"Building tile index of {fpath} into {index_path}")
+    index = build_tile_index(fpath, num_workers=num_workers)
+    with open(index_path, "w") as f:
+        f.write(f"# fastq_size={fastq_size}\n")
+        index.to_csv(f, sep="\t", index=False)
+    return index
+
+
+def _tile_spans(index, tiles: Iterable[int], max_gap: int = DEFAULT_CHUNK_SIZE) -> list[tuple[int, int, tuple]]:
+    """
+    (start, end, seek_point) spans of the FASTQ that contain all reads of `tiles`, according to the tile index.
+    Runs less than `max_gap` bytes apart are merged into a single span (with the reads in between).
+    """
+    spans = []
+    for run in index[index["tile"].isin(list(tiles))].sort_values("start").itertuples():
+        if spans and run.start - spans[-1][1] < max_gap:
+            spans[-1][1] = max(spans[-1][1], run.end)
+        else:
+            spans.append([run.start, run.end, (run.seek_compressed, run.seek_uncompressed)])
+    return [tuple(span) for span in spans]
+
+
+def read_fastq_spans(
+    fpath: str,
+    spans: list[tuple[int, int, tuple[int, int]]],
+    *,  # enforce kwargs
+    num_threads: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[tuple[bytes, int, tuple[int, int]]]:
+    """
+    Like `read_fastq_chunks`, but only yields the data within the sorted (start, end, seek_point) `spans`.
+    BGZF files are read from the seek point of every span (random access); plain gzip is decompressed
+    in a single pass, until the end of the last span.
+    """
+    bgzf = is_bgzf(fpath)
+    chunks, leftover, position, compressed_offset = None, b"", 0, 0
+    try:
+        for start, end, seek_point in spans:
+            if chunks is None or (bgzf and start > position + len(leftover)):
+                if chunks is not None:
+                    chunks.close()
+                chunks = read_fastq_chunks(
+                    fpath, start=start, seek_point=seek_point, num_threads=num_threads, chunk_size=chunk_size
+                )
+                leftover, position = b"", start
+
+            # `leftover` holds the data read past the previous span, from `position` onwards
+            while position < end:
+                if not leftover:
+                    leftover, compressed_offset, _ = next(chunks, (b"", compressed_offset, None))
+                    if not leftover:
+                        return
+                skip = min(max(start - position, 0), len(leftover))
+                take = min(len(leftover), end - position)
+                if take > skip:
+                    yield leftover[skip:take], compressed_offset, (0, 0)
+                leftover = leftover[take:]
+                position += take
+    finally:
+        if chunks is not None:
+            chunks.close()
+
+
+# a checkpoint is written whenever this many (uncompressed) FASTQ bytes were processed since the last one
+DEFAULT_CHECKPOINT_INTERVAL = 1024 * 1024 * 1024
+CHECKPOINT_SUFFIX = "barcode_preprocessing.checkpoint.json"
+
+
+class RunCheckpoint:
+    """
+    Manifest of a `process_multiple_unsorted_tiles` run, stored as json at `fpath`. It records the input offset up to
+    which every read was written, a seek point to restart reading there (see `read_fastq_chunks`), and the number
+    of rows and bytes of every tile file at that moment. Tile files are appended to a log (`fpath` + '.files')
+    before they are created, so that the files created after the last checkpoint are known, too.
+    Both files are removed when the run finishes.
+    """
+
+    def __init__(self, fpath: str, run_config: dict):
+        self.fpath = fpath
+        self.files_log = f"{fpath}.files"
+        self.run_config = run_config
+        self._files_log_handle = None
+
+    def start(self) -> None:
+        if os.path.exists(self.fpath):
+            raise FileExistsError(
+                f"{self.fpath} already exists; resume the interrupted run, or remove its output and this file"
+            )
+        self._files_log_handle = open(self.files_log, "w")
+        self.save(tiles={}, input_offset=0, seek_point=(0, 0), compressed_offset=0)
+
+    def resume(self) -> dict | None:
+        """
+        Loads the last checkpoint, and removes the tile files that were created after it.
+
+        Returns:
+            dict: the checkpoint state; None if there is no checkpoint to resume from.
+        """
+        if not os.path.exists(self.fpath):
+            return None
+
+        with open(self.fpath) as f:
+            state = json.load(f)
+
+        mismatches = [k for k, v in self.run_config.items() if state["run_config"].get(k) != v]
+        if mismatches:
+            raise ValueError(f"Cannot resume from {self.fpath}, the run differs in: {', '.join(mismatches)}")
+
+        if os.path.exists(self.files_log):
+            with open(self.files_log) as f:
+                for tile_file in f.read().splitlines():
+                    if tile_file not in state["tiles"] and os.path.isdir(tile_file):
+                        shutil.rmtree(tile_file)
+                    elif tile_file not in state["tiles"] and os.path.exists(tile_file):
+                        os.remove(tile_file)
+        self._files_log_handle = open(self.files_log, "a")
+
+        return state
+
+    def log_new_file(self, tile_file: str) -> None:
+        self._files_log_handle.write(f"{tile_file}\n")
+        self._files_log_handle.flush()
+
+    def save(
+        self,
+        *,  # enforce kwargs
+        tiles: dict,
+        input_offset: int,
+        seek_point: tuple[int, int],
+        compressed_offset: int,
+    ) -> None:
+        state = {
+            "run_config": self.run_config,
+            "input_offset": input_offset,
+            "seek_point": list(seek_point),
+            "compressed_offset": compressed_offset,
+            "tiles": tiles,
+        }
+        # written next to the manifest and renamed, so that a crash never leaves a partial manifest
+        with open(f"{self.fpath}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{self.fpath}.tmp", self.fpath)
+
+    def remove(self) -> None:
+        """Removes the manifest and the log, once the run has finished."""
+        self._files_log_handle.close()
+        os.remove(self.files_log)
+        os.remove(self.fpath)
+
+
 def process_multiple_unsorted_tiles(
     *,  # enforce kwargs
     in_fastq: str,
     out_path: str,
     out_prefix: str,
     out_suffix: str,
+    crop_seq_slice: slice = slice(None),
+    rev_comp: bool = False,
     sequence_preprocessor: Callable[[str], str] | None = None,
+    num_workers: int = 1,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+    out_format: str = "tsv",
+    checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    resume: bool = False,
+    tiles: list[int] | None = None,
+    tile_index: str | None = None,
 ):
-    if sequence_preprocessor is None:
-        sequence_preprocessor = lambda x: x
-    curr_tile = None
-    barcodes, xs, ys = [[], [], []]
-    fastq_size = os.stat(in_fastq).st_size  # in compressed bytes
-    last_byte = 0
-    with gzip.open(in_fastq, "rt") as f, tqdm(total=fastq_size, unit="B") as pbar:
-        for i, seq_id in enumerate(f):
-            seq = f.readline()
-            _ = f.readline()
-            _ = f.readline()
-            lane, tile, x, y = get_tile_info(seq_id)
-            next_tile = (lane, tile)
-            barcode = sequence_preprocessor(seq)
-            if next_tile != curr_tile and curr_tile is not None:
-                append_barcodes_to_disk(
-                    lane=curr_tile[0],
-                    tile=curr_tile[1],
-                    barcodes=barcodes,
-                    xs=xs,
-                    ys=ys,
-                    out_path=out_path,
-                    out_prefix=out_prefix,
-                    out_suffix=out_suffix,
-                )
-                barcodes, xs, ys = [[], [], []]
-            curr_tile = next_tile
-            barcodes.append(barcode)
-            xs.append(x)
-            ys.append(y)
-            if i % 10_000:
-                curr_byte = f.buffer.fileobj.tell()
-                pbar.update(curr_byte - last_byte)
-                last_byte = curr_byte
-    append_barcodes_to_disk(
-        lane=curr_tile[0],
-        tile=curr_tile[1],
-        barcodes=barcodes,
-        xs=xs,
-        ys=ys,
+    """
+    Writes the barcodes and coordinates of every read in `in_fastq` into one file per tile.
+
+    Sequences are cropped with `crop_seq_slice` and optionally reverse-complemented (vectorized), unless a
+    custom `sequence_preprocessor` is given. With `num_workers` > 1, record-aligned blocks are parsed in
+    worker processes (a custom `sequence_preprocessor` must then be picklable), while the results are
+    written from this process in input order, so that the output is deterministic.
+    BGZF-compressed input is also decompressed by `num_workers` threads (see `read_fastq_chunks`).
+    Tile files are written in `out_format`, one of SUPPORTED_OUT_FORMATS.
+
+    Every `checkpoint_interval` bytes of (uncompressed) input, all tile files are flushed and a
+    `RunCheckpoint` manifest is written to `out_path` (and removed at the end of the run). With `resume`,
+    an interrupted run continues from its last checkpoint; tile files are truncated to their state at that checkpoint.
+
+    If `tiles` is given, only the reads of these tiles are written. A tile index (see `build_tile_index`) is
+    loaded from `tile_index` (built there first if needed, by default next to `in_fastq`), and only the spans
+    of the FASTQ with these tiles are decompressed. Runs restricted to `tiles` do not write checkpoints.
+    """
+    if num_workers <= 0:
+        num_workers = os.cpu_count()
+
+    spans = None
+    if tiles is not None:
+        if resume:
+            raise ValueError("Runs restricted to a subset of tiles cannot be resumed")
+        checkpoint_interval = 0
+        tiles = set(tiles)
+        index = load_tile_index(in_fastq, tile_index or f"{in_fastq}.tile_index.tsv", num_workers=num_workers)
+        spans = _tile_spans(index, tiles)
+        n_bytes = sum(end - start for start, end, _ in spans)
+        logging.info(f"Reading {n_bytes} bytes (uncompressed) with the reads of {len(tiles)} tiles")
+
+    checkpoint, state = None, None
+    if checkpoint_interval > 0:
+        checkpoint = RunCheckpoint(
+            os.path.join(out_path, f"{out_prefix}{CHECKPOINT_SUFFIX}"),
+            run_config={
+                "in_fastq": os.path.abspath(in_fastq),
+                "fastq_size": os.stat(in_fastq).st_size,
+                "out_suffix": out_suffix,
+                "out_format": out_format,
+                "crop_seq_slice": [crop_seq_slice.start, crop_seq_slice.stop, crop_seq_slice.step],
+                "rev_comp": rev_comp,
+                "sequence_preprocessor": getattr(sequence_preprocessor, "__qualname__", repr(sequence_preprocessor)),
+            },
+        )
+        if resume:
+            state = checkpoint.resume()
+            if state is None:
+                logging.warning(f"No checkpoint found at {checkpoint.fpath}, starting from the beginning")
+        if state is None:
+            checkpoint.start()
+        else:
+            logging.info(f"Resuming from offset {state['input_offset']} (uncompressed) of {in_fastq}")
+    elif resume:
+        raise ValueError("Cannot resume a run without checkpoints (checkpoint_interval must be > 0)")
+
+    parse_block = functools.partial(
+        parse_fastq_block,
+        crop_seq_slice=crop_seq_slice,
+        rev_comp=rev_comp,
+        sequence_preprocessor=sequence_preprocessor,
+    )
+    executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    writer_pool = TileWriterPool(
         out_path=out_path,
         out_prefix=out_prefix,
         out_suffix=out_suffix,
+        out_format=out_format,
+        max_open_files=max_open_files,
+        resume_state=None if state is None else state["tiles"],
+        on_new_file=None if checkpoint is None else checkpoint.log_new_file,
     )
 
+    fastq_size = os.stat(in_fastq).st_size  # in compressed bytes
+    input_offset = 0 if state is None else state["input_offset"]
+    seek_point = (0, 0) if state is None else tuple(state["seek_point"])
+    last_byte = 0 if state is None else state["compressed_offset"]
+    last_checkpoint = input_offset
+    block_positions = deque()
+
+    def _blocks():
+        if spans is None:
+            chunks = read_fastq_chunks(in_fastq, start=input_offset, seek_point=seek_point, num_threads=num_workers)
+        else:
+            chunks = read_fastq_spans(in_fastq, spans, num_threads=num_workers)
+        for block, *position in read_fastq_blocks(chunks, block_size, start=input_offset):
+            block_positions.append(position)
+            yield block
+
+    try:
+        with writer_pool, tqdm(total=fastq_size, initial=last_byte, unit="B") as pbar:
+            for runs in _map_bounded(executor, parse_block, _blocks(), max_pending=2 * num_workers):
+                for (lane, tile), barcodes, xs, ys in runs:
+                    if tiles is not None and tile not in tiles:
+                        continue
+                    writer_pool.append(lane=lane, tile=tile, barcodes=barcodes, xs=xs, ys=ys)
+                curr_byte, input_offset, seek_point = block_positions.popleft()
+                pbar.update(curr_byte - last_byte)
+                last_byte = curr_byte
+
+                if checkpoint is not None and input_offset - last_checkpoint >= checkpoint_interval:
+                    checkpoint.save(
+                        tiles=writer_pool.checkpoint(),
+                        input_offset=input_offset,
+                        seek_point=seek_point,
+                        compressed_offset=curr_byte,
+                    )
+                    last_checkpoint = input_offset
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    if not writer_pool.written_files:
+        logging.warning(f"No reads were found in {in_fastq}")
+
 
 def _run_barcode_preprocessing(args):
     crop_seq_slice = slice(
@@ -118,13 +1238,9 @@ def _run_barcode_preprocessing(args):
         ]
     )
 
-    def sequence_preprocessor(sequence: str) -> str:
-        # slice --> translate --> reverse
-        sequence = sequence.strip()
-        sequence = sequence[crop_seq_slice].strip()
-        if args.rev_comp:
-            sequence = reverse_complement_table(sequence)
-        return sequence
+    out_suffix = args.out_suffix
+    if out_suffix is None:
+        out_suffix = OUT_FORMAT_SUFFIXES[args.out_format]
 
     start_time = time.time()
 
@@ -132,8 +1248,16 @@ def _run_barcode_preprocessing(args):
         in_fastq=args.fastq_in,
         out_path=args.tilecoords_out,
         out_prefix=args.out_prefix,
-        out_suffix=args.out_suffix,
-        sequence_preprocessor=sequence_preprocessor,
+        out_suffix=out_suffix,
+        crop_seq_slice=crop_seq_slice,
+        rev_comp=args.rev_comp,
+        num_workers=args.num_workers,
+        max_open_files=args.max_open_files,
+        out_format=args.out_format,
+        checkpoint_interval=int(args.checkpoint_interval_mb * 1024 * 1024),
+        resume=args.resume,
+        tiles=args.tiles,
+        tile_index=args.tile_index,
     )
 
     logging.info(f"Finished in {round(time.time()-start_time, 2)} sec")
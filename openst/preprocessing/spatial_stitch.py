@@ -1,22 +1,34 @@
 import logging
+import os
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Union
 from tqdm import tqdm
 
 import numpy as np
+import pandas as pd
 from anndata import AnnData, concat, read_h5ad
+from scipy import sparse
+
+try:
+    from anndata.io import read_elem, write_elem
+except ImportError:  # anndata < 0.11
+    from anndata.experimental import read_elem, write_elem
 
 from openst.utils.file import (check_directory_exists, check_file_exists,
                                check_obs_unique)
 
 DEFAULT_REGEX_TILE_ID = "(L[1-4][a-b]_tile_[1-2][0-7][0-9][0-9])"
 
-def _transform_tile(tile: AnnData, tiles_transform: dict):
+def _transform_tile(tile: AnnData, tiles_transform: Union["TileCoordinateSystem", dict]):
     """
-    Transform the spatial coordinates of an AnnData object based on a transformation dictionary.
+    Transform the spatial coordinates of an AnnData object based on a tile coordinate system.
 
     Args:
         tile (AnnData): AnnData object containing spatial coordinates to be transformed.
-        tiles_transform (dict): A dictionary containing transformation information.
+        tiles_transform (Union[TileCoordinateSystem, dict]): The tile coordinate system, or a dictionary
+                                                             (as returned by `parse_tile_coordinate_system_file`).
 
     Returns:
         AnnData: Transformed AnnData object with updated spatial coordinates.
@@ -27,18 +39,17 @@ def _transform_tile(tile: AnnData, tiles_transform: dict):
     if not check_obs_unique(tile, "tile_id"):
         raise ValueError("tile_id exists in AnnData object but are not unique")
 
-    _tile_id = np.unique(tile.obs["tile_id"])[0]
-    x_ofs = tiles_transform["x_offset"][_tile_id]
-    y_ofs = tiles_transform["y_offset"][_tile_id]
-    tile.obsm["spatial"][:, 0] += x_ofs
-    tile.obsm["spatial"][:, 1] += y_ofs
+    if isinstance(tiles_transform, dict):
+        tiles_transform = TileCoordinateSystem.from_dict(tiles_transform)
+
+    tile.obsm["spatial"] = tiles_transform.apply(tile.obsm["spatial"], tile.obs["tile_id"])
 
     return tile
 
 
 def create_spatial_stitch(
     tile: AnnData,
-    tile_transform: dict,
+    tile_transform: Union["TileCoordinateSystem", dict],
     reset_index: bool = True,
     transform: bool = True,
 ):
@@ -47,7 +58,7 @@ def create_spatial_stitch(
 
     Args:
         tile (AnnData): AnnData object to create a tile collection from.
-        tile_transform (dict): A dictionary containing transformation information.
+        tile_transform (Union[TileCoordinateSystem, dict]): The tile coordinate system.
         reset_index (bool, optional): Reset the index of the AnnData object. Defaults to True.
         transform (bool, optional): Apply spatial transformation. Defaults to True.
 
@@ -92,11 +103,184 @@ def parse_tile_id_from_path(f: str, tile_id_regex: str = DEFAULT_REGEX_TILE_ID):
     return tile_id
 
 
+def _check_tile_ids(f: Union[str, List[str]], tile_id: Union[str, List[str], None]):
+    """
+    Check that there is one tile ID per tile file (when tile IDs are provided), and make lists of both.
+
+    Args:
+        f (Union[str, List[str]]): File path or list of file paths of the tiles.
+        tile_id (Union[str, List[str], None]): Tile ID or list of tile IDs.
+
+    Returns:
+        tuple: The list of file paths and the list of tile IDs (or None).
+    """
+    if type(f) is str:
+        f = [f]
+
+    if tile_id is not None and type(tile_id) is str:
+        tile_id = [tile_id]
+    elif type(tile_id) is list and len(tile_id) != len(f):
+        raise ValueError(f"""You must provide {len(tile_id)} items in --tile-id,
+                           one per file in --tiles (currently provides {len(f)})""")
+
+    return f, tile_id
+
+
+def _assign_tile_id(
+    tile: AnnData,
+    f: str,
+    i: int,
+    tile_id: Union[List[str], None],
+    tile_id_regex: str,
+    tile_id_key: str,
+) -> AnnData:
+    """
+    Set the tile ID of an AnnData object, from --tile-id, the file name or the existing observation key.
+
+    Args:
+        tile (AnnData): AnnData object of the tile (only .obs is used).
+        f (str): File path of the tile.
+        i (int): Index of the tile in the list of tiles.
+        tile_id (Union[List[str], None]): List of tile IDs, one per tile, or None.
+        tile_id_regex (str): Regular expression pattern for extracting tile IDs from file paths.
+        tile_id_key (str): Observation key name for tile IDs in the AnnData object.
+
+    Returns:
+        AnnData: The same AnnData object, with the 'tile_id' observation key.
+    """
+    if tile_id_key not in tile.obs.keys() and tile_id is None:
+        if tile_id is None:
+            _tile_id = parse_tile_id_from_path(f, tile_id_regex=tile_id_regex)
+            if len(_tile_id) == 0:
+                raise ValueError(
+                    f"Could not find a 'tile_id' for tile {f} with the regular expression {tile_id_regex}"
+                )
+        else:
+            _tile_id = tile_id[i]
+
+        tile.obs[tile_id_key] = _tile_id
+    elif tile_id is not None:
+        _tile_id = tile_id[i]
+        tile.obs[tile_id_key] = _tile_id
+
+    if tile_id_key != "tile_id":
+        tile.obs["tile_id"] = _tile_id
+
+    if not check_obs_unique(tile, "tile_id"):
+        raise ValueError(f"'tile_id' exists in Open-ST h5 object but contains more than one unique value in tile {f}")
+
+    return tile
+
+
+def _read_tile(
+    f: str,
+    i: int,
+    tile_id: Union[List[str], None],
+    tile_id_regex: str,
+    tile_id_key: str,
+    tile_transform: Union["TileCoordinateSystem", None] = None,
+    reset_index: bool = True,
+    transform: bool = True,
+) -> AnnData:
+    """Read a tile, set its tile ID and (if `tile_transform` is set) run `create_spatial_stitch` on it."""
+    _f_obj = read_h5ad(f)
+
+    if "spatial" not in _f_obj.obsm.keys():
+        raise ValueError(f"Could not find valid .obsm['spatial'] data in {f}")
+
+    _f_obj = _assign_tile_id(_f_obj, f, i, tile_id, tile_id_regex, tile_id_key)
+
+    if tile_transform is not None:
+        _f_obj = create_spatial_stitch(_f_obj, tile_transform, reset_index, transform)
+
+    return _f_obj
+
+
+def _imap_tiles(
+    fn: Callable,
+    f: List[str],
+    *args,
+    num_workers: int = 1,
+    max_pending: Union[int, None] = None,
+    desc: Union[str, None] = None,
+) -> Iterator[tuple]:
+    """
+    Run `fn(f[i], i, *args)` for every tile, in a process pool when `num_workers` > 1.
+
+    Args:
+        fn (Callable): Function applied to every tile. It must be picklable when `num_workers` > 1.
+        f (List[str]): List of file paths of the tiles.
+        *args: Further arguments passed to `fn`.
+        num_workers (int, optional): Number of worker processes. Set to -1 to use all CPUs. Defaults to 1.
+        max_pending (Union[int, None], optional): Maximum number of tiles being processed (or processed but
+                                                  not consumed yet). Defaults to None (no limit).
+        desc (Union[str, None], optional): Description of the progress bar.
+
+    Yields:
+        tuple: The file path, the result of `fn` (or None) and the exception raised by `fn` (or None),
+               in the same order as `f`.
+    """
+    if num_workers <= 0:
+        num_workers = os.cpu_count()
+
+    if num_workers == 1:
+        for i, _f in tqdm(enumerate(f), total=len(f), desc=desc):
+            try:
+                yield _f, fn(_f, i, *args), None
+            except Exception as e:
+                yield _f, None, e
+        return
+
+    if max_pending is None:
+        max_pending = len(f)
+
+    def _result(_f, future):
+        pbar.update(1)
+        try:
+            return _f, future.result(), None
+        except Exception as e:
+            return _f, None, e
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor, tqdm(total=len(f), desc=desc) as pbar:
+        pending = deque()
+        for i, _f in enumerate(f):
+            pending.append((_f, executor.submit(fn, _f, i, *args)))
+            if len(pending) >= max_pending:
+                yield _result(*pending.popleft())
+
+        while len(pending) > 0:
+            yield _result(*pending.popleft())
+
+
+def _check_tile_errors(errors: List[tuple], n_tiles: int):
+    """
+    Raise a single error listing all tiles that could not be processed.
+
+    Args:
+        errors (List[tuple]): Pairs of (file path, exception).
+        n_tiles (int): Total number of tiles.
+
+    Raises:
+        ValueError: If `errors` is not empty.
+    """
+    if len(errors) == 0:
+        return
+
+    raise ValueError(
+        f"{len(errors)} out of {n_tiles} tiles could not be processed:\n"
+        + "\n".join(f"  {_f}: {type(_error).__name__}: {_error}" for _f, _error in errors)
+    )
+
+
 def read_tiles_to_list(
     f: Union[str, List[str]],
     tile_id: Union[int, List[int], None] = None,
     tile_id_regex: str = DEFAULT_REGEX_TILE_ID,
     tile_id_key: str = "tile_id",
+    num_workers: int = 1,
+    tile_transform: Union["TileCoordinateSystem", None] = None,
+    reset_index: bool = True,
+    transform: bool = True,
 ):
     """
     Read tile data from one or more files into a list of AnnData objects.
@@ -107,72 +291,233 @@ def read_tiles_to_list(
         tile_id_regex (str, optional): Regular expression pattern for extracting tile IDs from file paths.
                                        Defaults to DEFAULT_REGEX_TILE_ID.
         tile_id_key (str, optional): Observation key name for tile IDs in the AnnData object. Defaults to "tile_id".
+        num_workers (int, optional): Number of worker processes loading tiles concurrently. Set to -1 to use all
+                                     CPUs. Defaults to 1.
+        tile_transform (Union[TileCoordinateSystem, None], optional): If set, `create_spatial_stitch` is applied
+                                                                      to every tile (within the worker).
+        reset_index (bool, optional): Passed to `create_spatial_stitch`. Defaults to True.
+        transform (bool, optional): Passed to `create_spatial_stitch`. Defaults to True.
 
     Returns:
-        List[AnnData]: List of AnnData objects representing tiles.
+        List[AnnData]: List of AnnData objects representing tiles, in the same order as `f`.
+
+    Raises:
+        ValueError: If any of the tiles could not be read; all failing tiles are reported together.
     """
-    if type(f) is str:
-        f = [f]
+    f, tile_id = _check_tile_ids(f, tile_id)
 
-    if tile_id is not None and type(tile_id) is str:
-        tile_id = [tile_id]
-    elif type(tile_id) is list and len(tile_id) != len(f):
-        raise ValueError(f"""You must provide {len(tile_id)} items in --tile-id,
-                           one per file in --tiles (currently provides {len(f)})""")
+    tiles, errors = [], []
+    for _f, _tile, _error in _imap_tiles(
+        _read_tile,
+        f,
+        tile_id,
+        tile_id_regex,
+        tile_id_key,
+        tile_transform,
+        reset_index,
+        transform,
+        num_workers=num_workers,
+        desc="Loading tiles",
+    ):
+        if _error is not None:
+            errors.append((_f, _error))
+        else:
+            tiles.append(_tile)
 
-    tiles = []
+    _check_tile_errors(errors, len(f))
 
-    for i, f in tqdm(enumerate(f)):
-        _f_obj = read_h5ad(f)
+    return tiles
 
-        if "spatial" not in _f_obj.obsm.keys():
-            raise ValueError(f"Could not find valid .obsm['spatial'] data in {f}")
-        if tile_id_key not in _f_obj.obs.keys() and tile_id is None:
-            if tile_id is None:
-                _tile_id = parse_tile_id_from_path(f, tile_id_regex=tile_id_regex)
-                if len(_tile_id) == 0:
-                    raise ValueError(
-                        f"Could not find a 'tile_id' for tile {f} with the regular expression {tile_id_regex}"
+
+TILE_COORDINATES_CACHE_SUFFIX = ".cache.npz"
+
+
+class TileCoordinateSystem:
+    """
+    Coordinate system of the tiles of a flow cell: per tile ID, the offsets (and further numeric columns)
+    of the tile in the global coordinate system.
+
+    Args:
+        tile_ids (pd.Index): Unique tile IDs.
+        values (np.ndarray): Array of shape (len(tile_ids), len(columns)), as float64.
+        columns (List[str]): Column names of `values`; 'x_offset' and 'y_offset' are required.
+        source_hash (str, optional): Hash of the file the coordinate system was parsed from.
+
+    Raises:
+        ValueError: If the tile IDs are not unique, offsets are missing, or values are not finite.
+    """
+
+    def __init__(self, tile_ids: pd.Index, values: np.ndarray, columns: List[str], source_hash: str = ""):
+        self.tile_ids = pd.Index(tile_ids).astype(str)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.columns = list(columns)
+        self.source_hash = source_hash
+
+        if not self.tile_ids.is_unique:
+            raise ValueError("Tile IDs of the coordinate system are not unique")
+        for c in ["x_offset", "y_offset"]:
+            if c not in self.columns:
+                raise ValueError(f"The tile coordinate system does not have a '{c}' column")
+        if self.values.shape != (len(self.tile_ids), len(self.columns)):
+            raise ValueError(f"Expected values of shape {(len(self.tile_ids), len(self.columns))}")
+
+        self.offsets = self.values[:, [self.columns.index("x_offset"), self.columns.index("y_offset")]]
+        if not np.isfinite(self.offsets).all():
+            _invalid = self.tile_ids[~np.isfinite(self.offsets).all(axis=1)]
+            raise ValueError(f"Missing or invalid offsets in the tile coordinate system for tiles {list(_invalid)}")
+        # Integer coordinates stay integer when all offsets are whole numbers
+        self.integral_offsets = bool(np.all(self.offsets == np.round(self.offsets)))
+
+    def __len__(self) -> int:
+        return len(self.tile_ids)
+
+    @classmethod
+    def from_dict(cls, cs: dict) -> "TileCoordinateSystem":
+        """Create the coordinate system from a dictionary {column: {tile_id: value}}."""
+        df = pd.DataFrame(cs)
+        return cls(df.index, df.to_numpy(dtype=np.float64), df.columns)
+
+    def to_dict(self) -> dict:
+        """Dictionary {column: {tile_id: value}}, as returned by `parse_tile_coordinate_system_file`."""
+        return pd.DataFrame(self.values, index=self.tile_ids, columns=self.columns).to_dict(orient="dict")
+
+    def offset(self, tile_id: str) -> np.ndarray:
+        """(x, y) offset of a single tile."""
+        return self.offsets[self._indexer([tile_id])[0]]
+
+    def _indexer(self, tile_ids) -> np.ndarray:
+        idx = self.tile_ids.get_indexer(pd.Index(tile_ids).astype(str))
+        if np.any(idx < 0):
+            _missing = list(pd.Index(tile_ids)[idx < 0])
+            raise KeyError(f"Tiles {_missing} are not in the tile coordinate system")
+        return idx
+
+    def apply(self, coords: np.ndarray, tile_ids) -> np.ndarray:
+        """
+        Add the offset of every row's tile to the spatial coordinates, in place when their dtype allows it.
+
+        Args:
+            coords (np.ndarray): Array of shape (n, >=2); the first two columns are (x, y).
+            tile_ids (array-like): Tile ID of every row. Rows are grouped by category code, so that
+                                   every tile ID is looked up once.
+
+        Returns:
+            np.ndarray: `coords`, or a float64 copy of it if it has an integer dtype and some offsets are not
+                        whole numbers.
+        """
+        tile_ids = pd.Categorical(tile_ids)
+        ofs = self.offsets[self._indexer(tile_ids.categories)]
+        coords = np.asarray(coords)
+        if self.coords_dtype(coords.dtype) != coords.dtype:
+            coords = coords.astype(np.float64)
+        coords[:, :2] += ofs[tile_ids.codes].astype(coords.dtype)
+
+        return coords
+
+    def coords_dtype(self, dtype) -> np.dtype:
+        """dtype of coordinates of 'dtype' after `apply`."""
+        dtype = np.dtype(dtype)
+        if np.issubdtype(dtype, np.floating) or (np.issubdtype(dtype, np.integer) and self.integral_offsets):
+            return dtype
+        return np.dtype(np.float64)
+
+    @classmethod
+    def from_file(cls, f: str, cache: bool = True) -> "TileCoordinateSystem":
+        """
+        Parse a tile coordinate system file (comma, tab or '|' separated, with a header), with tile IDs in the
+        first column. Duplicated tile IDs are dropped (the first one is kept).
+
+        When `cache` is True, the parsed coordinate system is stored next to the file (as
+        <f>.cache.npz) along with the hash of the file, and reused while the hash matches.
+
+        Args:
+            f (str): File path to the tile coordinate system file.
+            cache (bool, optional): Whether to read/write the binary cache. Defaults to True.
+
+        Returns:
+            TileCoordinateSystem: The parsed coordinate system.
+        """
+        import hashlib
+
+        with open(f, "rb") as _f:
+            content = _f.read()
+        source_hash = hashlib.sha256(content).hexdigest()
+        cache_path = f + TILE_COORDINATES_CACHE_SUFFIX
+
+        if cache and os.path.exists(cache_path):
+            try:
+                with np.load(cache_path, allow_pickle=False) as cached:
+                    if str(cached["source_hash"]) == source_hash:
+                        return cls(cached["tile_ids"], cached["values"], cached["columns"].tolist(), source_hash)
+            except (OSError, KeyError, ValueError) as e:
+                logging.warning(f"Could not read the cached tile coordinate system {cache_path} ({e})")
+
+        cs = cls._parse(content, source_hash)
+
+        if cache:
+            try:
+                with open(cache_path + ".tmp", "wb") as _f:
+                    np.savez(
+                        _f,
+                        tile_ids=cs.tile_ids.to_numpy(dtype=str),
+                        values=cs.values,
+                        columns=np.array(cs.columns, dtype=str),
+                        source_hash=np.array(source_hash),
                     )
-            else:
-                _tile_id = tile_id[i]
+                os.replace(cache_path + ".tmp", cache_path)
+            except OSError as e:
+                logging.warning(f"Could not write the cached tile coordinate system {cache_path} ({e})")
 
-            _f_obj.obs[tile_id_key] = _tile_id
-        elif tile_id is not None:
-            _tile_id = tile_id[i]
-            _f_obj.obs[tile_id_key] = _tile_id
+        return cs
 
-        if tile_id_key != "tile_id":
-            _f_obj.obs["tile_id"] = _tile_id
+    @classmethod
+    def _parse(cls, content: bytes, source_hash: str = "") -> "TileCoordinateSystem":
+        import io
 
-        if not check_obs_unique(_f_obj, "tile_id"):
-            raise ValueError(f"'tile_id' exists in Open-ST h5 object but contains more than one unique value in tile {f}")
+        header = content.split(b"\n", 1)[0].decode()
+        seps = [sep for sep in [",", "\t", "|"] if sep in header]
+        if len(seps) != 1:
+            raise ValueError(f"Could not find a unique separator (',', tab or '|') in the header '{header}'")
 
-        tiles.append(_f_obj)
+        cs = pd.read_csv(io.BytesIO(content), sep=seps[0], engine="c", dtype={0: str})
+        cs.columns = cs.columns.str.strip()
+        cs = cs.set_index(cs.columns[0])
+        cs.index = cs.index.str.strip()
+        cs = cs.loc[~cs.index.duplicated(keep="first")]
 
-    return tiles
+        try:
+            values = cs.to_numpy(dtype=np.float64)
+        except ValueError:
+            raise ValueError(f"Columns {list(cs.columns)} of the tile coordinate system must be numeric")
 
+        return cls(cs.index, values, cs.columns, source_hash)
 
-def parse_tile_coordinate_system_file(f: str):
+
+def load_tile_coordinate_system(f: str, cache: bool = True) -> TileCoordinateSystem:
     """
-    Parse a tile coordinate system file into a dictionary.
+    Load a tile coordinate system file (see `TileCoordinateSystem.from_file`).
 
     Args:
         f (str): File path to the tile coordinate system file.
+        cache (bool, optional): Whether to read/write the binary cache next to the file. Defaults to True.
 
     Returns:
-        dict: Dictionary containing tile coordinate system information.
+        TileCoordinateSystem: The parsed coordinate system.
     """
-    import pandas as pd
+    return TileCoordinateSystem.from_file(f, cache=cache)
 
-    cs = pd.read_csv(f, sep="[,|\t]", engine="python")
 
-    _tile_id_col = cs.columns[0]
-    cs = cs.set_index(_tile_id_col)
+def parse_tile_coordinate_system_file(f: str):
+    """
+    Parse a tile coordinate system file into a dictionary.
 
-    cs = cs.loc[~cs.index.duplicated(keep="first")]
+    Args:
+        f (str): File path to the tile coordinate system file.
 
-    return cs.to_dict(orient="dict")
+    Returns:
+        dict: Dictionary containing tile coordinate system information.
+    """
+    return load_tile_coordinate_system(f).to_dict()
 
 
 def merge_tiles_to_collection(
@@ -185,6 +530,7 @@ def merge_tiles_to_collection(
     no_transform: bool = False,
     merge_output: str = "same",
     join_output: str = "inner",
+    num_workers: int = 1,
 ):
     """
     Merge multiple tiles into a single tile collection AnnData object.
@@ -200,26 +546,674 @@ def merge_tiles_to_collection(
         no_transform (bool, optional): Skip applying spatial transformation. Defaults to False.
         merge_output (str, optional): Merge method for AnnData objects. Defaults to "same".
         join_output (str, optional): Join method for AnnData objects. Defaults to "inner".
+        num_workers (int, optional): Number of worker processes loading tiles concurrently. Defaults to 1.
 
     Returns:
         AnnData: Merged tile collection AnnData object.
     """
-    tile_transform = parse_tile_coordinate_system_file(tile_coordinates)
-
-    tiles_list = read_tiles_to_list(tiles, tile_id, tile_id_regex, tile_id_key)
+    tile_transform = load_tile_coordinate_system(tile_coordinates)
 
-    spatial_stitch_list = []
+    spatial_stitch_list = read_tiles_to_list(
+        tiles,
+        tile_id,
+        tile_id_regex,
+        tile_id_key,
+        num_workers=num_workers,
+        tile_transform=tile_transform,
+        reset_index=not no_reset_index,
+        transform=False,
+    )
 
-    for tile in tiles_list:
-        spatial_stitch_list += [create_spatial_stitch(tile, tile_transform, ~no_reset_index, ~no_transform)]
+    spatial_stitch = concat_tiles(spatial_stitch_list, merge_output, join_output)
 
-    spatial_stitch = concat(spatial_stitch_list, merge=merge_output, join=join_output)
+    # Offsets are applied once, over the rows of all tiles
+    if not no_transform:
+        spatial_stitch.obsm["spatial"] = tile_transform.apply(
+            spatial_stitch.obsm["spatial"], spatial_stitch.obs["tile_id"]
+        )
 
     spatial_stitch.uns = {np.unique(tile.obs[tile_id_key])[0]: tile.uns for tile in spatial_stitch_list}
 
     return spatial_stitch
 
 
+def read_tile_headers(
+    f: Union[str, List[str]],
+    tile_id: Union[str, List[str], None] = None,
+    tile_id_regex: str = DEFAULT_REGEX_TILE_ID,
+    tile_id_key: str = "tile_id",
+    num_workers: int = 1,
+):
+    """
+    Read the metadata of one or more tiles (obs, var and uns), without loading their expression matrices.
+
+    Args:
+        f (Union[str, List[str]]): File path or list of file paths to read tiles from.
+        tile_id (Union[str, List[str], None], optional): Tile ID or list of tile IDs. Defaults to None.
+        tile_id_regex (str, optional): Regular expression pattern for extracting tile IDs from file paths.
+                                       Defaults to DEFAULT_REGEX_TILE_ID.
+        tile_id_key (str, optional): Observation key name for tile IDs in the AnnData object. Defaults to "tile_id".
+        num_workers (int, optional): Number of worker processes reading tiles concurrently. Defaults to 1.
+
+    Returns:
+        tuple: A tuple containing:
+            - List[AnnData]: AnnData objects without X (only obs, var and uns), one per tile.
+            - List[dict]: Per tile, the dtype of X and the shape (excluding rows) and dtype of the arrays under obsm.
+    """
+    f, tile_id = _check_tile_ids(f, tile_id)
+
+    headers, layouts, errors = [], [], []
+    for _f, _header, _error in _imap_tiles(
+        _read_tile_header,
+        f,
+        tile_id,
+        tile_id_regex,
+        tile_id_key,
+        num_workers=num_workers,
+        desc="Reading tile headers",
+    ):
+        if _error is not None:
+            errors.append((_f, _error))
+        else:
+            headers.append(_header[0])
+            layouts.append(_header[1])
+
+    _check_tile_errors(errors, len(f))
+
+    return headers, layouts
+
+
+def _read_tile_header(f: str, i: int, tile_id: Union[List[str], None], tile_id_regex: str, tile_id_key: str):
+    """Read obs, var and uns of a tile (see `read_tile_headers`)."""
+    import h5py
+
+    with h5py.File(f, "r") as _h5:
+        if "obsm/spatial" not in _h5:
+            raise ValueError(f"Could not find valid .obsm['spatial'] data in {f}")
+
+        _header = AnnData(obs=read_elem(_h5["obs"]), var=read_elem(_h5["var"]))
+        if "uns" in _h5:
+            _header.uns = read_elem(_h5["uns"])
+
+        _X = _h5["X"]
+        layout = {
+            "X_dtype": _X["data"].dtype if isinstance(_X, h5py.Group) else _X.dtype,
+            "obsm": {k: (v.shape[1:], v.dtype) for k, v in _h5["obsm"].items() if isinstance(v, h5py.Dataset)},
+            "dropped": [k for k in ["layers", "obsp"] if k in _h5 and len(_h5[k]) > 0],
+        }
+
+    return _assign_tile_id(_header, f, i, tile_id, tile_id_regex, tile_id_key), layout
+
+
+def _read_tile_arrays(f: str, i: int, obsm_keys: List[str]):
+    """Read X (as CSR) and the arrays under `obsm_keys` of a tile."""
+    import h5py
+
+    with h5py.File(f, "r") as _h5:
+        X = sparse.csr_matrix(read_elem(_h5["X"]))
+        obsm = {key: _h5["obsm"][key][()] for key in obsm_keys}
+
+    return X, obsm
+
+
+def concat_csr_columns(
+    Xs: List[sparse.csr_matrix],
+    var_names: List[pd.Index],
+    out_var_names: pd.Index,
+    dtype: Union[np.dtype, None] = None,
+) -> sparse.csr_matrix:
+    """
+    Stack CSR matrices by rows, moving their columns to the positions of `out_var_names`.
+
+    Columns whose name is not in `out_var_names` are dropped (inner join); columns of `out_var_names` missing
+    in a matrix are implicit zeros (outer join). The column indices of every matrix are remapped with a single
+    gather and written (with `data` and `indptr`) into the preallocated output, without intermediate reindexed
+    copies of each matrix.
+
+    Args:
+        Xs (List[sparse.csr_matrix]): Input matrices.
+        var_names (List[pd.Index]): Column names of every input matrix.
+        out_var_names (pd.Index): Column names of the output matrix.
+        dtype (Union[np.dtype, None], optional): dtype of the output. Defaults to the common dtype of `Xs`.
+
+    Returns:
+        sparse.csr_matrix: Matrix of shape (sum of rows of `Xs`, len(out_var_names)).
+    """
+    if dtype is None:
+        dtype = np.result_type(*[X.dtype for X in Xs])
+
+    col_maps = [out_var_names.get_indexer(v) for v in var_names]
+    kept = [None if np.all(col_map >= 0) else col_map[X.indices] >= 0 for X, col_map in zip(Xs, col_maps)]
+    nnz = [X.nnz if _kept is None else int(_kept.sum()) for X, _kept in zip(Xs, kept)]
+    n_obs, n_vars = sum(X.shape[0] for X in Xs), len(out_var_names)
+
+    idx_dtype = np.int32 if max(sum(nnz), n_vars) < np.iinfo(np.int32).max else np.int64
+    data = np.empty(sum(nnz), dtype=dtype)
+    indices = np.empty(sum(nnz), dtype=idx_dtype)
+    indptr = np.empty(n_obs + 1, dtype=idx_dtype)
+    indptr[0] = 0
+
+    obs_start, nnz_start = 0, 0
+    needs_sort = False
+    for X, col_map, _kept, _nnz in zip(Xs, col_maps, kept, nnz):
+        obs_end, nnz_end = obs_start + X.shape[0], nnz_start + _nnz
+        if _kept is None:
+            np.take(col_map, X.indices, out=indices[nnz_start:nnz_end])
+            data[nnz_start:nnz_end] = X.data
+            indptr[obs_start + 1 : obs_end + 1] = X.indptr[1:] + nnz_start
+        else:
+            indices[nnz_start:nnz_end] = col_map[X.indices][_kept]
+            data[nnz_start:nnz_end] = X.data[_kept]
+            indptr[obs_start + 1 : obs_end + 1] = np.concatenate([[0], np.cumsum(_kept)])[X.indptr[1:]] + nnz_start
+
+        _kept_cols = col_map[col_map >= 0]
+        needs_sort |= bool(np.any(_kept_cols[1:] < _kept_cols[:-1]))
+        obs_start, nnz_start = obs_end, nnz_end
+
+    X = sparse.csr_matrix((data, indices, indptr), shape=(n_obs, n_vars))
+    if needs_sort:
+        X.sort_indices()
+
+    return X
+
+
+def concat_tiles(tiles: List[AnnData], merge_output: str = "same", join_output: str = "inner") -> AnnData:
+    """
+    Concatenate tiles along obs, like `anndata.concat`, with a dedicated path for sparse (CSR) tiles.
+
+    The merged obs and var are computed by `anndata.concat` on tiles without X; then, X is built with
+    `concat_csr_columns` instead of reindexing every tile against the joined genes. Tiles that are not CSR,
+    or have layers, obsp, varm or different obsm keys, are concatenated with `anndata.concat`.
+
+    Args:
+        tiles (List[AnnData]): List of tiles.
+        merge_output (str, optional): Merge method for AnnData objects. Defaults to "same".
+        join_output (str, optional): Join method for AnnData objects. Defaults to "inner".
+
+    Returns:
+        AnnData: Concatenated AnnData object.
+    """
+    obsm_keys = set(tiles[0].obsm.keys())
+    if not all(
+        sparse.isspmatrix_csr(tile.X)
+        and len(tile.layers) == 0
+        and len(tile.obsp) == 0
+        and len(tile.varm) == 0
+        and set(tile.obsm.keys()) == obsm_keys
+        and all(tile.obsm[k].shape[1:] == tiles[0].obsm[k].shape[1:] for k in obsm_keys)
+        for tile in tiles
+    ):
+        return concat(tiles, merge=merge_output, join=join_output)
+
+    spatial_stitch = concat(
+        [AnnData(obs=tile.obs, var=tile.var) for tile in tiles], merge=merge_output, join=join_output
+    )
+    spatial_stitch.X = concat_csr_columns(
+        [tile.X for tile in tiles], [tile.var_names for tile in tiles], spatial_stitch.var_names
+    )
+    for k in obsm_keys:
+        spatial_stitch.obsm[k] = np.concatenate([np.asarray(tile.obsm[k]) for tile in tiles])
+
+    return spatial_stitch
+
+
+STITCH_MANIFEST_KEY = "spatial_stitch_manifest"
+
+
+def _stitch_config(
+    tile_transform: TileCoordinateSystem,
+    tile_id_key: str,
+    no_reset_index: bool,
+    no_transform: bool,
+    merge_output: str,
+    join_output: str,
+) -> dict:
+    """Settings of a streaming stitch; an incremental re-stitch is only possible if these did not change."""
+    return {
+        "tile_coordinates_hash": tile_transform.source_hash,
+        "tile_id_key": tile_id_key,
+        "reset_index": not no_reset_index,
+        "transform": not no_transform,
+        "merge_output": merge_output,
+        "join_output": join_output,
+    }
+
+
+def _stitch_manifest(segments: List[tuple], config: dict) -> dict:
+    """
+    Per-tile manifest of a stitched h5ad: source path, tile ID, mtime and size of the tile, and its range of rows
+    (and of nonzero values of X) in the output.
+
+    Args:
+        segments (List[tuple]): Per tile, (path, tile_id, obs_start, obs_end, nnz_start, nnz_end).
+        config (dict): Settings of the stitch (see `_stitch_config`).
+
+    Returns:
+        dict: The manifest, with 'tiles' (a DataFrame) and 'config'.
+    """
+    tiles = pd.DataFrame(
+        [
+            (os.path.abspath(tile), str(tile_id), os.stat(tile).st_mtime_ns, os.stat(tile).st_size, *ranges)
+            for tile, tile_id, *ranges in segments
+        ],
+        columns=["path", "tile_id", "mtime_ns", "size", "obs_start", "obs_end", "nnz_start", "nnz_end"],
+    )
+    tiles.index = tiles.index.astype(str)
+
+    return {"tiles": tiles, "config": config}
+
+
+def _write_tile_rows(out, X: sparse.csr_matrix, obsm: dict, obs_start: int, nnz_start: int):
+    """Write the nonzero values of X and the obsm arrays of a tile into the (streaming) output file."""
+    out_X = out["X"]
+    nnz_end = nnz_start + X.nnz
+    for key in ["data", "indices"]:
+        if out_X[key].shape[0] < nnz_end:
+            out_X[key].resize((nnz_end,))
+
+    out_X["data"][nnz_start:nnz_end] = X.data
+    out_X["indices"][nnz_start:nnz_end] = X.indices
+    for key, arr in obsm.items():
+        out["obsm"][key][obs_start : obs_start + len(arr)] = arr
+
+
+def stream_tiles_to_h5ad(
+    h5_out: str,
+    tiles: List[str],
+    tile_id: List[str],
+    tile_coordinates: str,
+    tile_id_regex: str = None,
+    tile_id_key: str = "tile_id",
+    no_reset_index: bool = False,
+    no_transform: bool = False,
+    merge_output: str = "same",
+    join_output: str = "inner",
+    num_workers: int = 1,
+):
+    """
+    Merge multiple tiles into a tile collection h5ad file, holding a single tile in memory at a time.
+
+    The metadata of all tiles (obs, var, uns) is read first, to compute the merged obs and var and the shape of
+    the output. Then, the expression matrix (as CSR) and the arrays under obsm are appended to the output tile by
+    tile, with the spatial coordinates transformed on the fly. Layers and obsp are not merged.
+
+    Args:
+        h5_out (str): Path of the output h5ad file.
+        tiles (List[str]): List of file paths containing tile data.
+        tile_id (List[str]): List of tile IDs.
+        tile_coordinates (str): File path to the tile coordinate system file.
+        tile_id_regex (str, optional): Regular expression pattern for extracting tile IDs from file paths.
+                                       Defaults to None.
+        tile_id_key (str, optional): Observation key name for tile IDs in the AnnData object. Defaults to "tile_id".
+        no_reset_index (bool, optional): Skip resetting the index of the AnnData objects. Defaults to False.
+        no_transform (bool, optional): Skip applying spatial transformation. Defaults to False.
+        merge_output (str, optional): Merge method for AnnData objects. Defaults to "same".
+        join_output (str, optional): Join method for AnnData objects. Defaults to "inner".
+        num_workers (int, optional): Number of worker processes loading tiles concurrently. Defaults to 1.
+    """
+    import h5py
+
+    if num_workers <= 0:
+        num_workers = os.cpu_count()
+
+    tile_transform = load_tile_coordinate_system(tile_coordinates)
+
+    tiles, _ = _check_tile_ids(tiles, tile_id)
+    headers, layouts = read_tile_headers(tiles, tile_id, tile_id_regex, tile_id_key, num_workers=num_workers)
+
+    for tile, layout in zip(tiles, layouts):
+        if len(layout["dropped"]) > 0:
+            logging.warning(f"{', '.join(layout['dropped'])} of {tile} are not merged in streaming mode")
+
+    headers = [create_spatial_stitch(h, tile_transform, not no_reset_index, transform=False) for h in headers]
+    spatial_stitch = concat(headers, merge=merge_output, join=join_output)
+    spatial_stitch.uns = {np.unique(h.obs[tile_id_key])[0]: h.uns for h in headers}
+
+    n_obs, n_vars = spatial_stitch.shape
+    var_names = spatial_stitch.var_names
+    X_dtype = np.result_type(*[layout["X_dtype"] for layout in layouts])
+
+    # Only dense obsm arrays with the same number of columns in every tile are merged
+    obsm_layouts = {}
+    for key, (shape, _) in layouts[0]["obsm"].items():
+        if all(key in layout["obsm"] and layout["obsm"][key][0] == shape for layout in layouts):
+            obsm_layouts[key] = (shape, np.result_type(*[layout["obsm"][key][1] for layout in layouts]))
+        else:
+            logging.warning(f".obsm['{key}'] is not present (or has different shapes) in all tiles; not merged")
+    if "spatial" in obsm_layouts and not no_transform:
+        shape, dtype = obsm_layouts["spatial"]
+        obsm_layouts["spatial"] = (shape, tile_transform.coords_dtype(dtype))
+
+    with h5py.File(h5_out, "w") as out:
+        out.attrs["encoding-type"] = "anndata"
+        out.attrs["encoding-version"] = "0.1.0"
+
+        write_elem(out, "obs", spatial_stitch.obs)
+        write_elem(out, "var", spatial_stitch.var)
+        write_elem(out, "uns", spatial_stitch.uns)
+        for key in ["layers", "obsp", "varm", "varp"]:
+            write_elem(out, key, {})
+
+        out_X = out.create_group("X")
+        out_X.attrs["encoding-type"] = "csr_matrix"
+        out_X.attrs["encoding-version"] = "0.1.0"
+        out_X.attrs["shape"] = (n_obs, n_vars)
+        out_X.create_dataset("data", shape=(0,), maxshape=(None,), dtype=X_dtype, chunks=True)
+        out_X.create_dataset("indices", shape=(0,), maxshape=(None,), dtype=np.int32, chunks=True)
+        out_X.create_dataset("indptr", data=np.zeros(n_obs + 1, dtype=np.int64), maxshape=(None,), chunks=True)
+
+        out_obsm = out.create_group("obsm")
+        out_obsm.attrs["encoding-type"] = "dict"
+        out_obsm.attrs["encoding-version"] = "0.1.0"
+        for key, (shape, dtype) in obsm_layouts.items():
+            out_obsm.create_dataset(key, shape=(n_obs, *shape), maxshape=(None, *shape), dtype=dtype, chunks=True)
+            out_obsm[key].attrs["encoding-type"] = "array"
+            out_obsm[key].attrs["encoding-version"] = "0.2.0"
+
+        obs_start, nnz, errors, segments = 0, 0, [], []
+        for (tile, arrays, error), header in zip(
+            _imap_tiles(
+                _read_tile_arrays,
+                tiles,
+                list(obsm_layouts.keys()),
+                num_workers=num_workers,
+                max_pending=num_workers,
+                desc="Merging tiles",
+            ),
+            headers,
+        ):
+            obs_end = obs_start + header.n_obs
+            if error is not None:
+                errors.append((tile, error))
+                obs_start = obs_end
+                continue
+
+            X, obsm = arrays
+            X = concat_csr_columns([X], [header.var_names], var_names, X_dtype)
+            if not no_transform:
+                obsm["spatial"] = tile_transform.apply(obsm["spatial"], header.obs["tile_id"])
+
+            _write_tile_rows(out, X, obsm, obs_start, nnz)
+            out_X["indptr"][obs_start + 1 : obs_end + 1] = X.indptr[1:] + nnz
+            segments.append((tile, np.unique(header.obs[tile_id_key])[0], obs_start, obs_end, nnz, nnz + X.nnz))
+
+            obs_start, nnz = obs_end, nnz + X.nnz
+
+        if len(errors) == 0:
+            config = _stitch_config(
+                tile_transform, tile_id_key, no_reset_index, no_transform, merge_output, join_output
+            )
+            write_elem(out["uns"], STITCH_MANIFEST_KEY, _stitch_manifest(segments, config))
+
+    if len(errors) > 0:
+        os.remove(h5_out)
+    _check_tile_errors(errors, len(tiles))
+
+
+def _move_rows(dset, moves: List[tuple], chunk_size: int = 2**24):
+    """
+    Move ranges of rows of an h5py dataset, in place.
+
+    Args:
+        dset (h5py.Dataset): Dataset, large enough to hold the moved ranges.
+        moves (List[tuple]): Non-overlapping (src_start, src_end, dst_start) ranges, sorted by src_start and
+                             keeping their order after the move (as when tiles before them grow or shrink).
+        chunk_size (int, optional): Maximum number of values copied at once.
+    """
+    chunk_rows = max(1, chunk_size // max(1, int(np.prod(dset.shape[1:]))))
+
+    # Ranges moving forward are moved last-to-first, and copied from their end;
+    # then ranges moving backward are moved first-to-last, and copied from their start
+    for src_start, src_end, dst_start in reversed([m for m in moves if m[2] > m[0]]):
+        shift = dst_start - src_start
+        for end in range(src_end, src_start, -chunk_rows):
+            start = max(src_start, end - chunk_rows)
+            dset[start + shift : end + shift] = dset[start:end]
+
+    for src_start, src_end, dst_start in [m for m in moves if m[2] < m[0]]:
+        shift = dst_start - src_start
+        for start in range(src_start, src_end, chunk_rows):
+            end = min(src_end, start + chunk_rows)
+            dset[start + shift : end + shift] = dset[start:end]
+
+
+def read_stitch_manifest(h5_out: str) -> Union[dict, None]:
+    """
+    Read the per-tile manifest of a stitched h5ad file written with `stream_tiles_to_h5ad`.
+
+    Args:
+        h5_out (str): Path of the stitched h5ad file.
+
+    Returns:
+        Union[dict, None]: The manifest (with 'tiles' and 'config'), or None if the file has none.
+    """
+    import h5py
+
+    if not os.path.exists(h5_out):
+        return None
+
+    with h5py.File(h5_out, "r") as out:
+        if f"uns/{STITCH_MANIFEST_KEY}" not in out:
+            return None
+        return read_elem(out["uns"][STITCH_MANIFEST_KEY])
+
+
+def _read_tile_var(f: str, i: int) -> pd.DataFrame:
+    """Read var of a tile."""
+    import h5py
+
+    with h5py.File(f, "r") as _h5:
+        return read_elem(_h5["var"])
+
+
+def update_stitched_h5ad(
+    h5_out: str,
+    tiles: List[str],
+    tile_id: List[str],
+    tile_coordinates: str,
+    tile_id_regex: str = None,
+    tile_id_key: str = "tile_id",
+    no_reset_index: bool = False,
+    no_transform: bool = False,
+    merge_output: str = "same",
+    join_output: str = "inner",
+    num_workers: int = 1,
+) -> bool:
+    """
+    Update a stitched h5ad file (written by `stream_tiles_to_h5ad`) in place, after tiles were added or
+    re-processed. Only the rows of changed tiles (according to the mtime and size stored in the manifest) are
+    rewritten, new tiles are appended, and the rows of unchanged tiles are shifted when needed.
+
+    The update is not possible (and False is returned) when the file has no manifest, was stitched with other
+    settings or coordinate system, tiles were removed, or the merged var or obsm would change.
+
+    Args:
+        h5_out (str): Path of the stitched h5ad file.
+        tiles (List[str]): List of file paths containing tile data.
+        tile_id (List[str]): List of tile IDs.
+        tile_coordinates (str): File path to the tile coordinate system file.
+        tile_id_regex (str, optional): Regular expression pattern for extracting tile IDs from file paths.
+                                       Defaults to None.
+        tile_id_key (str, optional): Observation key name for tile IDs in the AnnData object. Defaults to "tile_id".
+        no_reset_index (bool, optional): Skip resetting the index of the AnnData objects. Defaults to False.
+        no_transform (bool, optional): Skip applying spatial transformation. Defaults to False.
+        merge_output (str, optional): Merge method for AnnData objects. Defaults to "same".
+        join_output (str, optional): Join method for AnnData objects. Defaults to "inner".
+        num_workers (int, optional): Number of worker processes loading tiles concurrently. Defaults to 1.
+
+    Returns:
+        bool: Whether the file was updated (or was already up to date).
+    """
+    import h5py
+
+    manifest = read_stitch_manifest(h5_out)
+    if manifest is None:
+        logging.info(f"{h5_out} does not exist or has no stitch manifest; it will be fully stitched")
+        return False
+
+    tile_transform = load_tile_coordinate_system(tile_coordinates)
+    config = _stitch_config(tile_transform, tile_id_key, no_reset_index, no_transform, merge_output, join_output)
+    if manifest["config"] != config:
+        logging.info(f"{h5_out} was stitched with other settings or tile coordinates; it will be fully stitched")
+        return False
+
+    tiles, tile_id = _check_tile_ids(tiles, tile_id)
+    paths = [os.path.abspath(tile) for tile in tiles]
+    previous = manifest["tiles"].set_index("path")
+    if not previous.index.isin(paths).all():
+        logging.info(f"Tiles were removed from {h5_out}; it will be fully stitched")
+        return False
+
+    def _changed(path):
+        return path not in previous.index or (os.stat(path).st_mtime_ns, os.stat(path).st_size) != (
+            previous.loc[path, "mtime_ns"],
+            previous.loc[path, "size"],
+        )
+
+    # Previous tiles keep their order (changed tiles are rewritten in place), new tiles are appended
+    order = [paths.index(path) for path in previous.index]
+    order += [i for i, path in enumerate(paths) if path not in previous.index]
+    updated = [i for i in order if _changed(paths[i])]
+    if len(updated) == 0:
+        logging.info(f"{h5_out} is up to date")
+        return True
+
+    logging.info(f"Re-stitching {len(updated)} out of {len(tiles)} tiles into {h5_out}")
+    headers, layouts = read_tile_headers(
+        [tiles[i] for i in updated],
+        None if tile_id is None else [tile_id[i] for i in updated],
+        tile_id_regex,
+        tile_id_key,
+        num_workers=num_workers,
+    )
+    headers = dict(zip(updated, [create_spatial_stitch(h, None, not no_reset_index, False) for h in headers]))
+    layouts = dict(zip(updated, layouts))
+
+    _vars, errors = {}, []
+    for _f, _var, _error in _imap_tiles(
+        _read_tile_var,
+        [tiles[i] for i in order if i not in headers],
+        num_workers=num_workers,
+        desc="Reading tile var",
+    ):
+        if _error is not None:
+            errors.append((_f, _error))
+        else:
+            _vars[_f] = _var
+    _check_tile_errors(errors, len(tiles))
+
+    var = concat(
+        [AnnData(var=headers[i].var if i in headers else _vars[tiles[i]]) for i in order],
+        merge=merge_output,
+        join=join_output,
+    ).var
+
+    with h5py.File(h5_out, "r+") as out:
+        out_X, out_obsm = out["X"], out["obsm"]
+        if not var.equals(read_elem(out["var"])):
+            logging.info(f"The merged var of {h5_out} would change; it will be fully stitched")
+            return False
+        for i in updated:
+            _obsm = layouts[i]["obsm"]
+            if any(k not in _obsm or _obsm[k][0] != out_obsm[k].shape[1:] for k in out_obsm):
+                logging.info(f"obsm of {tiles[i]} does not match {h5_out}; it will be fully stitched")
+                return False
+            if np.result_type(layouts[i]["X_dtype"], out_X["data"].dtype) != out_X["data"].dtype:
+                logging.info(f"The dtype of X in {tiles[i]} does not match {h5_out}; it will be fully stitched")
+                return False
+            if len(layouts[i]["dropped"]) > 0:
+                logging.warning(f"{', '.join(layouts[i]['dropped'])} of {tiles[i]} are not merged in streaming mode")
+
+        arrays, errors = {}, []
+        for (_f, _arrays, _error), i in zip(
+            _imap_tiles(
+                _read_tile_arrays,
+                [tiles[i] for i in updated],
+                list(out_obsm.keys()),
+                num_workers=num_workers,
+                desc="Loading changed tiles",
+            ),
+            updated,
+        ):
+            if _error is not None:
+                errors.append((_f, _error))
+                continue
+
+            X, obsm = _arrays
+            X = concat_csr_columns([X], [headers[i].var_names], var.index, out_X["data"].dtype)
+            if not no_transform:
+                obsm["spatial"] = tile_transform.apply(obsm["spatial"], headers[i].obs["tile_id"])
+            arrays[i] = X, obsm
+        _check_tile_errors(errors, len(tiles))
+
+        # New layout: (tile, obs_start, obs_end, nnz_start, nnz_end) of every tile, and moves of unchanged tiles
+        segments, obs_moves, nnz_moves = [], [], []
+        obs_start, nnz_start = 0, 0
+        for i in order:
+            if i in arrays:
+                n_obs, nnz = arrays[i][0].shape[0], arrays[i][0].nnz
+            else:
+                _prev = previous.loc[paths[i]]
+                n_obs, nnz = _prev["obs_end"] - _prev["obs_start"], _prev["nnz_end"] - _prev["nnz_start"]
+                obs_moves.append((_prev["obs_start"], _prev["obs_end"], obs_start))
+                nnz_moves.append((_prev["nnz_start"], _prev["nnz_end"], nnz_start))
+            segments.append((i, obs_start, obs_start + n_obs, nnz_start, nnz_start + nnz))
+            obs_start, nnz_start = obs_start + n_obs, nnz_start + nnz
+        n_obs_total, nnz_total = obs_start, nnz_start
+
+        for dset, moves, n in [(out_X["data"], nnz_moves, nnz_total), (out_X["indices"], nnz_moves, nnz_total)] + [
+            (out_obsm[key], obs_moves, n_obs_total) for key in out_obsm
+        ]:
+            dset.resize((max(dset.shape[0], n), *dset.shape[1:]))
+            _move_rows(dset, moves)
+            dset.resize((n, *dset.shape[1:]))
+
+        old_indptr = out_X["indptr"][()]
+        indptr = np.zeros(n_obs_total + 1, dtype=np.int64)
+        for i, _obs_start, _obs_end, _nnz_start, _ in segments:
+            if i in arrays:
+                X, obsm = arrays[i]
+                _write_tile_rows(out, X, obsm, _obs_start, _nnz_start)
+                indptr[_obs_start + 1 : _obs_end + 1] = X.indptr[1:] + _nnz_start
+            else:
+                _prev = previous.loc[paths[i]]
+                _old = old_indptr[_prev["obs_start"] : _prev["obs_end"] + 1]
+                indptr[_obs_start + 1 : _obs_end + 1] = _old[1:] - _old[0] + _nnz_start
+        out_X["indptr"].resize((n_obs_total + 1,))
+        out_X["indptr"][:] = indptr
+        out_X.attrs["shape"] = (n_obs_total, len(var))
+
+        old_obs = read_elem(out["obs"])
+        obs = []
+        for i in order:
+            if i in headers:
+                obs.append(AnnData(obs=headers[i].obs))
+            else:
+                _prev = previous.loc[paths[i]]
+                obs.append(AnnData(obs=old_obs.iloc[_prev["obs_start"] : _prev["obs_end"]]))
+        del out["obs"]
+        write_elem(out, "obs", concat(obs, join=join_output).obs)
+
+        tile_ids = {
+            i: str(np.unique(headers[i].obs[tile_id_key])[0]) if i in headers else previous.loc[paths[i], "tile_id"]
+            for i in order
+        }
+        for i in updated:
+            for _tile_id in {tile_ids[i], previous["tile_id"].get(paths[i])} - {None}:
+                if _tile_id in out["uns"]:
+                    del out["uns"][_tile_id]
+            write_elem(out["uns"], tile_ids[i], headers[i].uns)
+
+        del out["uns"][STITCH_MANIFEST_KEY]
+        write_elem(
+            out["uns"],
+            STITCH_MANIFEST_KEY,
+            _stitch_manifest([(tiles[i], tile_ids[i], *s) for i, *s in segments], config),
+        )
+
+    return True
+
+
 def _run_spatial_stitch(args):
     """_run_spatial_stitch."""
     # Check input and output data
@@ -235,6 +1229,38 @@ def _run_spatial_stitch(args):
     if args.metadata != "" and not check_directory_exists(args.metadata):
         raise FileNotFoundError("Parent directory for the metadata does not exist")
 
+    if args.incremental and update_stitched_h5ad(
+        h5_out=args.h5_out,
+        tiles=args.tiles,
+        tile_id=args.tile_id,
+        tile_coordinates=args.tile_coordinates,
+        tile_id_regex=args.tile_id_regex,
+        tile_id_key=args.tile_id_key,
+        no_reset_index=args.no_reset_index,
+        no_transform=args.no_transform,
+        merge_output=args.merge_output,
+        join_output=args.join_output,
+        num_workers=args.num_workers,
+    ):
+        return
+
+    if args.streaming or args.incremental:
+        logging.info(f"Merging {len(args.tiles)} tiles into {args.h5_out}, one tile at a time")
+        stream_tiles_to_h5ad(
+            h5_out=args.h5_out,
+            tiles=args.tiles,
+            tile_id=args.tile_id,
+            tile_coordinates=args.tile_coordinates,
+            tile_id_regex=args.tile_id_regex,
+            tile_id_key=args.tile_id_key,
+            no_reset_index=args.no_reset_index,
+            no_transform=args.no_transform,
+            merge_output=args.merge_output,
+            join_output=args.join_output,
+            num_workers=args.num_workers,
+        )
+        return
+
     logging.info(f"Loading {len(args.tiles)} tiles, correcting coordinates and merging")
     spatial_stitch = merge_tiles_to_collection(
         tiles=args.tiles,
@@ -246,6 +1272,7 @@ def _run_spatial_stitch(args):
         no_transform=args.no_transform,
         merge_output=args.merge_output,
         join_output=args.join_output,
+        num_workers=args.num_workers,
     )
 
     logging.info(f"Writing merged tiles into {args.h5_out}")
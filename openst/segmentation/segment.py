@@ -298,12 +298,17 @@ def _load_image(args):
         adata = h5py.File(args.h5_in, 'r+')
 
         if args.rna_segment:
-            im, _ = create_unpaired_pseudoimage(adata, 
-                                      args.rna_segment_spatial_coord_key,
-                                      args.rna_segment_input_resolution,
-                                      args.rna_segment_render_scale,
-                                      args.rna_segment_render_sigma,
-                                      args.rna_segment_output_resolution)
+            im, _ = create_unpaired_pseudoimage(
+                adata,
+                args.rna_segment_spatial_coord_key,
+                args.rna_segment_input_resolution,
+                args.rna_segment_render_scale,
+                args.rna_segment_render_sigma,
+                args.rna_segment_output_resolution,
+                chunk_size=args.chunk_size if args.chunked else None,
+            )
+            if args.chunked:
+                im = im[..., None]  # to have 3 dimensions, as the chunked staining images
             logging.info("Will perform segmentation on a pseudoimage")
         else:
             im = adata[args.image_in]
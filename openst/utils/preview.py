@@ -30,7 +30,9 @@ def _show_viewer(adata, args):
             else:
                 pseudoimage_units_to_um = args.pseudoimage_units_to_um[i]
 
-            _pseudoimage, _ = create_unpaired_pseudoimage(adata, _pseudoimage_key, pseudoimage_units_to_um, write_rescaled=False)
+            _pseudoimage, _ = create_unpaired_pseudoimage(
+                adata, _pseudoimage_key, pseudoimage_units_to_um, write_rescaled=False, use_pyramid=True
+            )
 
             viewer.add_image(data=_pseudoimage)
 
@@ -1,9 +1,320 @@
+import hashlib
+
 import cv2
+import h5py
 import numpy as np
+import pandas as pd
 from skimage.transform import resize
 from skimage.filters import gaussian
 import logging
 
+SUPPORTED_RESIZE_METHODS = ["bincount", "scikit-image", "cv2"]
+
+
+def rasterize_points(
+    coords: np.ndarray,
+    shape: tuple,
+    weights: np.ndarray = None,
+    scale: float = 1,
+    out: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Bin points into an image with `np.bincount`, i.e., without sorting the points (as `np.histogram2d` does).
+
+    Args:
+        coords (np.ndarray): (n, 2) coordinates; the pixel of every point is `int(coords * scale)`.
+        shape (tuple): Shape of the image. As in `np.histogram2d`, points on the upper edge (pixel == shape)
+                       are counted in the last row/column, and points further outside are dropped.
+        weights (np.ndarray, optional): Weight of every point (e.g., UMI counts). Points are counted if None.
+        scale (float, optional): Scaling applied to the coordinates before binning.
+        out (np.ndarray, optional): Output buffer of `shape` (any numeric dtype), reused across calls.
+
+    Returns:
+        np.ndarray: The binned image (`out`, if provided; float32 otherwise).
+    """
+    h, w = shape
+    if out is None:
+        out = np.empty((h, w), dtype=np.float32)
+    elif out.shape != (h, w):
+        raise ValueError(f"'out' has shape {out.shape}, but {(h, w)} was expected")
+
+    rows = coords[:, 0] * scale if scale != 1 else coords[:, 0]
+    cols = coords[:, 1] * scale if scale != 1 else coords[:, 1]
+    rows = rows.astype(np.int64)
+    cols = cols.astype(np.int64)
+    rows[rows == h] = h - 1
+    cols[cols == w] = w - 1
+
+    valid = (rows >= 0) & (rows < h) & (cols >= 0) & (cols < w)
+    if not valid.all():
+        rows, cols = rows[valid], cols[valid]
+        weights = weights[valid] if weights is not None else None
+
+    rows *= w
+    rows += cols
+    out.reshape(-1)[:] = np.bincount(rows, weights=weights, minlength=h * w)
+
+    return out
+
+
+def _column_min(a: np.ndarray) -> np.ndarray:
+    # Reducing every column separately is several times faster than a.min(axis=0) for (n, 2) arrays
+    return np.array([a[:, i].min() for i in range(a.shape[1])], dtype=a.dtype)
+
+
+def _column_max(a: np.ndarray) -> np.ndarray:
+    return np.array([a[:, i].max() for i in range(a.shape[1])], dtype=a.dtype)
+
+
+def _normalize_to_uint8(im: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """Min-max scaling of an image to [0, 255], as uint8 (written into `out`, if provided)."""
+    im = im - im.min()
+    if im.max() > 0:
+        im /= im.max()
+    im *= 255
+    if out is None:
+        return im.astype(np.uint8)
+    np.copyto(out, im, casting="unsafe")
+    return out
+
+
+PSEUDOIMAGE_PYRAMID_KEY = "uns/pseudoimage_pyramid"
+
+
+def pseudoimage_pyramid_fingerprint(coords: np.ndarray, weights: np.ndarray = None, bin_size: float = 1) -> str:
+    """
+    Hash (sha256) of the coordinates, weights and bin size a pseudoimage pyramid is computed from.
+
+    Args:
+        coords (np.ndarray): (n, 2) coordinates.
+        weights (np.ndarray, optional): Weight of every coordinate.
+        bin_size (float, optional): Size of the bins of the finest level, in coordinate units.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    h = hashlib.sha256()
+    h.update(repr((coords.shape, coords.dtype.str, float(bin_size))).encode())
+    h.update(np.ascontiguousarray(coords).data)
+    if weights is not None:
+        weights = np.asarray(weights)
+        h.update(weights.dtype.str.encode())
+        h.update(np.ascontiguousarray(weights).data)
+    return h.hexdigest()
+
+
+def _overlap_matrix(n: int, origin: float, bin_size: float, offset: float, pixel_size: float, size: int):
+    """
+    Sparse (size, n) matrix with the fraction of every bin (of a pyramid level) that falls into every pixel,
+    along one axis. Returns the matrix restricted to the overlapping bins, and the slice of these bins.
+    """
+    from scipy import sparse
+
+    bin_edges = origin - offset + np.arange(n + 1) * bin_size
+    first = max(0, int(np.floor(-bin_edges[0] / bin_size)))
+    last = min(n, int(np.ceil((size * pixel_size - bin_edges[0]) / bin_size)))
+    if last <= first:
+        return None, slice(0, 0)
+
+    lo, hi = bin_edges[first:last], bin_edges[first + 1 : last + 1]
+    pixel = np.floor(lo / pixel_size).astype(np.int64)
+    bins, pixels, fractions = [], [], []
+    for d in range(int(np.ceil(bin_size / pixel_size)) + 1):
+        _pixel = pixel + d
+        _overlap = np.minimum(hi, (_pixel + 1) * pixel_size) - np.maximum(lo, _pixel * pixel_size)
+        _valid = (_overlap > 0) & (_pixel >= 0) & (_pixel < size)
+        bins.append(np.flatnonzero(_valid))
+        pixels.append(_pixel[_valid])
+        fractions.append(_overlap[_valid] / bin_size)
+
+    matrix = sparse.csr_matrix(
+        (np.concatenate(fractions), (np.concatenate(pixels), np.concatenate(bins))), shape=(size, last - first)
+    )
+    return matrix, slice(first, last)
+
+
+class PseudoimagePyramid:
+    """
+    Multi-resolution binning of (weighted) coordinates. Level `k` holds the sum of the weights in bins of
+    `bin_size * 2**k` coordinate units, starting at `origin`. Levels are either arrays or (lazily read) h5 datasets.
+
+    Args:
+        levels (list): Binned images, from the finest to the coarsest.
+        bin_size (float): Size of the bins of the finest level, in coordinate units.
+        origin (np.ndarray): Coordinate of the upper-left corner of all levels.
+        fingerprint (str, optional): Hash of the data the pyramid was computed from.
+    """
+
+    def __init__(self, levels: list, bin_size: float, origin: np.ndarray, fingerprint: str = ""):
+        if len(levels) == 0:
+            raise ValueError("A pseudoimage pyramid needs at least one level")
+        if bin_size <= 0:
+            raise ValueError("'bin_size' must be positive")
+
+        self.levels = levels
+        self.bin_size = float(bin_size)
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(
+        cls,
+        coords: np.ndarray,
+        weights: np.ndarray = None,
+        bin_size: float = 1,
+        min_size: int = 256,
+        fingerprint: str = "",
+    ) -> "PseudoimagePyramid":
+        """
+        Bin the coordinates at `bin_size`, then sum 2x2 blocks until the coarsest level fits in `min_size` pixels.
+
+        Args:
+            coords (np.ndarray): (n, 2) coordinates.
+            weights (np.ndarray, optional): Weight of every coordinate (e.g., UMI counts). Points are counted if None.
+            bin_size (float, optional): Size of the bins of the finest level, in coordinate units.
+            min_size (int, optional): Maximum size (both dimensions) of the coarsest level.
+            fingerprint (str, optional): Hash of the data the pyramid is computed from.
+
+        Returns:
+            PseudoimagePyramid: The pyramid, with levels held in memory.
+        """
+        if len(coords) == 0:
+            raise ValueError("Cannot create a pseudoimage pyramid without coordinates")
+
+        origin = _column_min(coords).astype(np.float64)
+        shape = tuple(((_column_max(coords) - origin) / bin_size).astype(int) + 1)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        levels = [rasterize_points(coords - origin, shape, weights, 1 / bin_size)]
+
+        while max(levels[-1].shape) > min_size:
+            _level = levels[-1]
+            h, w = _level.shape
+            if h % 2 or w % 2:
+                _level = np.pad(_level, ((0, h % 2), (0, w % 2)))
+            levels.append(_level.reshape(_level.shape[0] // 2, 2, _level.shape[1] // 2, 2).sum(axis=(1, 3)))
+
+        return cls(levels, bin_size, origin, fingerprint)
+
+    @classmethod
+    def from_group(cls, group) -> "PseudoimagePyramid":
+        """Pyramid stored in an h5 group (see `write`); the levels are read only when rendered."""
+        n_levels = int(group.attrs["n_levels"])
+        return cls(
+            [group[f"level_{k}"] for k in range(n_levels)],
+            group.attrs["bin_size"],
+            group.attrs["origin"],
+            group.attrs["fingerprint"],
+        )
+
+    def write(self, group, chunk_size: int = 256, compression: str = "gzip", compression_opts: int = 4):
+        """Store the levels as chunked, compressed datasets of an h5 group."""
+        for k, level in enumerate(self.levels):
+            _chunks = tuple(max(1, min(chunk_size, s)) for s in level.shape)
+            group.create_dataset(
+                f"level_{k}",
+                data=np.asarray(level, dtype=np.float32),
+                chunks=_chunks,
+                compression=compression,
+                compression_opts=compression_opts,
+                shuffle=True,
+            )
+        group.attrs["encoding-type"] = "dict"
+        group.attrs["encoding-version"] = "0.1.0"
+        group.attrs["n_levels"] = len(self.levels)
+        group.attrs["bin_size"] = self.bin_size
+        group.attrs["origin"] = self.origin
+        group.attrs["fingerprint"] = self.fingerprint
+
+    def level_for(self, pixel_size: float) -> int:
+        """Coarsest level with bins not larger than `pixel_size` (the finest level, if all are larger)."""
+        k = int(np.floor(np.log2(pixel_size / self.bin_size) + 1e-9)) if pixel_size >= self.bin_size else 0
+        return min(k, len(self.levels) - 1)
+
+    def render(self, pixel_size: float, shape: tuple, offset: np.ndarray = None, out: np.ndarray = None) -> np.ndarray:
+        """
+        Binned image with pixels of `pixel_size` coordinate units, whose upper-left corner is at `offset`.
+        Bins of the closest level are split between the pixels they overlap (proportionally to the overlap),
+        so only the overlapping region of that level is read.
+
+        Args:
+            pixel_size (float): Size of the pixels, in coordinate units.
+            shape (tuple): Shape of the image.
+            offset (np.ndarray, optional): Coordinate of the upper-left corner; (0, 0) if None.
+            out (np.ndarray, optional): Output buffer of `shape` (any numeric dtype), reused across calls.
+
+        Returns:
+            np.ndarray: The binned image (`out`, if provided; float32 otherwise).
+        """
+        h, w = shape
+        if out is None:
+            out = np.zeros((h, w), dtype=np.float32)
+        elif out.shape != (h, w):
+            raise ValueError(f"'out' has shape {out.shape}, but {(h, w)} was expected")
+
+        offset = np.zeros(2) if offset is None else np.asarray(offset, dtype=np.float64)
+        k = self.level_for(pixel_size)
+        level = self.levels[k]
+        bin_size = self.bin_size * 2**k
+
+        rows, row_slice = _overlap_matrix(level.shape[0], self.origin[0], bin_size, offset[0], pixel_size, h)
+        cols, col_slice = _overlap_matrix(level.shape[1], self.origin[1], bin_size, offset[1], pixel_size, w)
+        if rows is not None and cols is not None:
+            _level = np.asarray(level[row_slice, col_slice], dtype=np.float64)
+            out[:] = cols.dot(rows.dot(_level).T).T
+        else:
+            out[:] = 0
+
+        return out
+
+
+def load_pseudoimage_pyramid(
+    adata,
+    name: str,
+    coords: np.ndarray,
+    weights: np.ndarray = None,
+    bin_size: float = 1,
+    min_size: int = 256,
+) -> PseudoimagePyramid:
+    """
+    Pseudoimage pyramid cached under 'uns/pseudoimage_pyramid/<name>' of an h5 object. The cache is
+    recomputed when the fingerprint of `coords`, `weights` and `bin_size` changed, and written
+    only if the file is writable.
+
+    Args:
+        adata (h5py.File): Spatial object (opened with h5py).
+        name (str): Name of the pyramid, describing the coordinates and weights (e.g., 'obsm_spatial_total_counts').
+        coords (np.ndarray): (n, 2) coordinates.
+        weights (np.ndarray, optional): Weight of every coordinate. Points are counted if None.
+        bin_size (float, optional): Size of the bins of the finest level, in coordinate units.
+        min_size (int, optional): Maximum size (both dimensions) of the coarsest level.
+
+    Returns:
+        PseudoimagePyramid: The cached pyramid (levels read on demand), or a newly computed one.
+    """
+    key = f"{PSEUDOIMAGE_PYRAMID_KEY}/{name}"
+    fingerprint = pseudoimage_pyramid_fingerprint(coords, weights, bin_size)
+
+    if key in adata and adata[key].attrs.get("fingerprint", "") == fingerprint:
+        logging.info(f"Using the pseudoimage pyramid at {key}")
+        return PseudoimagePyramid.from_group(adata[key])
+
+    pyramid = PseudoimagePyramid.build(coords, weights, bin_size, min_size, fingerprint)
+    logging.info(f"Created a pseudoimage pyramid with {len(pyramid.levels)} levels")
+
+    if adata.file.mode == "r+":
+        if key in adata:
+            del adata[key]
+        if PSEUDOIMAGE_PYRAMID_KEY not in adata:
+            adata.create_group(PSEUDOIMAGE_PYRAMID_KEY).attrs.update(
+                {"encoding-type": "dict", "encoding-version": "0.1.0"}
+            )
+        pyramid.write(adata.create_group(key))
+        logging.info(f"Pseudoimage pyramid written to {key}")
+
+    return pyramid
+
+
 def create_paired_pseudoimage(
     coords: np.ndarray,
     scale: float,
@@ -13,6 +324,9 @@ def create_paired_pseudoimage(
     rescale=True,
     values=None,
     resize_method: str = 'scikit-image',
+    output_dtype: type = np.uint8,
+    out: np.ndarray = None,
+    pyramid: PseudoimagePyramid = None,
 ) -> dict:
     """
     Create a pseudoimage representation from input coordinates (two-dimensional), paired
@@ -25,7 +339,20 @@ def create_paired_pseudoimage(
         valid_locations (np.ndarray, optional): Boolean mask indicating valid locations for creating the pseudoimage.
         recenter (bool, optional): If True, the minimum (x, y) coordinate will be offset to a new (0, 0).
         rescale (bool, optional): If True, a new scaling will be applied according to the argument 'scale'.
-        values (np.ndarray, optional): When not None, will be used to populate the image intensity values.
+        values (np.ndarray, optional): When not None, will be used to populate the image intensity values
+                                       (as weights of every coordinate, either for all or for the valid locations).
+        resize_method (str, optional): How the binned coordinates are brought to 'target_size':
+            - 'scikit-image': binning at the 'scale' resolution, then anti-aliased resize.
+            - 'cv2': binning at the 'scale' resolution, box blur and nearest-neighbor resize.
+            - 'bincount': binning at the 'scale' resolution and nearest-neighbor upsampling when 'target_size'
+              is larger; otherwise, binning directly at the 'target_size' resolution. No full-size float arrays
+              are allocated.
+        output_dtype (type, optional): np.uint8 for a pseudoimage scaled to [0, 255] (default), or np.float32 for
+                                       the binned values (counts, or sum of 'values', per pixel).
+        out (np.ndarray, optional): Output buffer of shape 'target_size' and 'output_dtype', reused across calls.
+        pyramid (PseudoimagePyramid, optional): Pyramid of the (valid) coordinates and values, in the units of
+                                                'coords'. When set, the binned image is read from its closest
+                                                level instead of binning the coordinates.
 
     Returns:
         dict: A dictionary containing the pseudoimage and related metadata.
@@ -50,26 +377,30 @@ def create_paired_pseudoimage(
     elif coords.ndim != 2:
         raise ValueError("'coords' array does not have the expected number of dimensions")
 
-    # Apply coordinate transformation (zero-rescaling)
-    coords = coords.copy()
+    if resize_method not in SUPPORTED_RESIZE_METHODS:
+        raise NotImplementedError(f"The resize method '{resize_method}' was not implemented")
+
+    if output_dtype not in [np.uint8, np.float32]:
+        raise ValueError("'output_dtype' must be np.uint8 or np.float32")
+
+    # Apply coordinate transformation (zero-rescaling); a single new array is allocated
     offset_factor = None
 
     if recenter:
-        offset_factor = coords.min(axis=0)
-        coords -= offset_factor
+        offset_factor = _column_min(coords)
+        coords_rescaled = np.subtract(coords, offset_factor, dtype=float)
+    else:
+        coords_rescaled = coords.astype(float)
 
     # Rescale the coordinates to have approximately PSEUDOIMG_SIZE
     if rescale:
-        rescale_factor = coords.max(axis=0).min()
-        coords_rescaled = coords / rescale_factor
+        rescale_factor = _column_max(coords_rescaled).min()
+        coords_rescaled /= rescale_factor
         coords_rescaled *= scale
-        coords_rescaled_int = coords_rescaled.astype(int)
     else:
         rescale_factor = None
-        coords_rescaled = coords
-        coords_rescaled_int = coords_rescaled.astype(int)
 
-    dim_1, dim_2 = coords_rescaled_int.max(axis=0)
+    dim_1, dim_2 = _column_max(coords_rescaled).astype(int)
 
     # Preserve aspect ratio given a target_size
     if target_size is not None:
@@ -83,40 +414,72 @@ def create_paired_pseudoimage(
             dim_2 = int(dim_2_prop) + 1
             dim_1 = int(dim_2_prop / (target_size[1] / target_size[0])) + 1
 
-    _sts_pseudoimage = np.zeros((dim_1 + 1, dim_2 + 1))
-
+    _coords = coords_rescaled
     if valid_locations is not None:
-        coords_rescaled_int = coords_rescaled_int[valid_locations]
+        _coords = coords_rescaled[valid_locations]
+        if values is not None and len(values) == len(coords_rescaled):
+            values = values[valid_locations]
 
-    if values is None:
-        values = 1
-    
-    # new version to generate the pseudoimage
-    # np.add.at(_sts_pseudoimage, (coords_rescaled_int[:, 0], coords_rescaled_int[:, 1]), values)
-    _sts_pseudoimage, _, _ = np.histogram2d(coords_rescaled_int[:, 0], coords_rescaled_int[:, 1],
-                                   bins=(dim_1, dim_2),
-                                   range=[[0, dim_1], [0, dim_2]])
-    #_sts_pseudoimage[coords_rescaled_int[:, 0], coords_rescaled_int[:, 1]] += values
-
-    if resize_method == 'scikit-image':
-        sts_pseudoimage = resize(_sts_pseudoimage, target_size[:2], anti_aliasing=True)
+    if values is not None:
+        values = np.asarray(values, dtype=np.float64)
+
+    out_shape = tuple(target_size[:2])
+    if out is not None and (out.shape != out_shape or out.dtype != output_dtype):
+        raise ValueError(f"'out' must be an array of shape {out_shape} and dtype {np.dtype(output_dtype)}")
+
+    # calculate scaling ratio from the initially transformed points;
+    # use these points for applying the transform matrix (not integer)
+    rescaling_factor = out_shape[0] / dim_1
+
+    # Size of the bins in the units of 'coords', for reading the pyramid
+    pixel_size = rescale_factor / scale if rescale else 1
+    pixel_offset = offset_factor if recenter else None
+
+    def _bin_points(shape, _rescaling_factor=1, _out=None):
+        if pyramid is None:
+            return rasterize_points(_coords, shape, values, _rescaling_factor, _out)
+        return pyramid.render(pixel_size / _rescaling_factor, shape, pixel_offset, _out)
+
+    if resize_method == 'bincount' and rescaling_factor <= 1:
+        # Downsampling: bin directly at the target resolution
+        _out = out if output_dtype == np.float32 else None
+        sts_pseudoimage = _bin_points(out_shape, rescaling_factor, _out)
+    elif resize_method == 'bincount':
+        # Upsampling: every pixel takes the value of its (nearest) bin, so the image is scaled before upsampling
+        _sts_pseudoimage = _bin_points((dim_1, dim_2))
+        if output_dtype == np.uint8:
+            _sts_pseudoimage = _normalize_to_uint8(_sts_pseudoimage)
+        _rows = np.minimum((np.arange(out_shape[0]) / rescaling_factor).astype(int), dim_1 - 1)
+        _cols = np.minimum((np.arange(out_shape[1]) / rescaling_factor).astype(int), dim_2 - 1)
+        sts_pseudoimage = np.take(np.take(_sts_pseudoimage, _rows, axis=0), _cols, axis=1, out=out)
+    elif resize_method == 'scikit-image':
+        _sts_pseudoimage = _bin_points((dim_1, dim_2), _out=np.empty((dim_1, dim_2)))
+        sts_pseudoimage = resize(_sts_pseudoimage, out_shape, anti_aliasing=True)
     elif resize_method == 'cv2':
         _ker = 2
         if np.array(target_size).max() > 5000:
             _ker = 6
         elif np.array(target_size).max() > 1000:
             _ker = 4
+        _sts_pseudoimage = _bin_points((dim_1, dim_2), _out=np.empty((dim_1, dim_2)))
         _sts_pseudoimage = cv2.blur(_sts_pseudoimage, (_ker, _ker))
-        sts_pseudoimage = cv2.resize(_sts_pseudoimage, target_size[:2][::-1], interpolation=cv2.INTER_NEAREST)
-    else:
-        raise NotImplementedError(f"The resize method '{resize_method}' was not implemented")
-    
-    sts_pseudoimage = sts_pseudoimage - sts_pseudoimage.min()
-    sts_pseudoimage = ((sts_pseudoimage / sts_pseudoimage.max()) * 255).astype(np.uint8)
+        if rescaling_factor >= 1:
+            # Nearest-neighbor upsampling keeps all values, so the image is scaled before upsampling
+            if output_dtype == np.uint8:
+                _sts_pseudoimage = _normalize_to_uint8(_sts_pseudoimage)
+            else:
+                _sts_pseudoimage = _sts_pseudoimage.astype(np.float32)
+            sts_pseudoimage = cv2.resize(_sts_pseudoimage, out_shape[::-1], dst=out, interpolation=cv2.INTER_NEAREST)
+        else:
+            sts_pseudoimage = cv2.resize(_sts_pseudoimage, out_shape[::-1], interpolation=cv2.INTER_NEAREST)
 
-    # calculate scaling ratio from the initially transformed points;
-    # use these points for applying the transform matrix (not integer)
-    rescaling_factor = sts_pseudoimage.shape[0] / _sts_pseudoimage.shape[0]
+    if output_dtype == np.uint8 and sts_pseudoimage.dtype != np.uint8:
+        sts_pseudoimage = _normalize_to_uint8(sts_pseudoimage, out)
+    elif sts_pseudoimage.dtype != output_dtype:
+        sts_pseudoimage = sts_pseudoimage.astype(output_dtype)
+    if out is not None and sts_pseudoimage is not out:
+        out[:] = sts_pseudoimage
+        sts_pseudoimage = out
 
     pseudoimage_and_metadata = {
         "pseudoimage": sts_pseudoimage,
@@ -139,17 +502,88 @@ def recenter_points(points):
     points_roi[:, 1] = points_roi[:, 1] - points[:, 1].min()
     return points_roi
 
+def _chunk_bounds(size: int, chunk_size: int, min_chunk_size: int = 1) -> np.ndarray:
+    # Bounds of chunks of 'chunk_size'; a last chunk smaller than 'min_chunk_size' is merged into the previous one
+    bounds = np.append(np.arange(0, size, chunk_size), size)
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_chunk_size:
+        bounds = np.delete(bounds, -2)
+    return bounds
+
+
+def smooth_and_resize(im: np.ndarray, sigma: float, output_shape: tuple, chunk_size: int = None):
+    """
+    Gaussian smoothing (`skimage.filters.gaussian`) followed by `skimage.transform.resize` (bilinear, anti-aliased
+    when downsampling). With 'chunk_size', both run lazily on overlapping tiles of the image (dask), so only
+    a few tiles are held in memory at once; the values are the same as for the whole image.
+
+    Args:
+        im (np.ndarray): Two-dimensional image (e.g., binned counts).
+        sigma (float): Standard deviation of the gaussian smoothing.
+        output_shape (tuple): Shape of the resized image.
+        chunk_size (int, optional): Size of the tiles of the input image. The whole image is processed if None.
+
+    Returns:
+        np.ndarray or dask.array.Array: The smoothed and resized image (float64); a dask array if 'chunk_size' is set.
+    """
+    if chunk_size is None:
+        return resize(gaussian(im, sigma), output_shape)
+
+    import dask.array as da
+    from scipy import ndimage as ndi
+
+    output_shape = tuple(int(s) for s in output_shape)
+    factors = np.divide(im.shape, output_shape)
+    anti_aliasing = any(o < i for o, i in zip(output_shape, im.shape))
+    anti_aliasing_sigma = np.maximum(0, (factors - 1) / 2) if anti_aliasing else np.zeros(2)
+
+    # Margin covering both gaussian kernels (truncated at 4 sigma) and the bilinear interpolation
+    depth = tuple(int(4 * sigma + 0.5) + int(4 * s + 0.5) + 2 for s in anti_aliasing_sigma)
+    in_bounds = [_chunk_bounds(s, chunk_size, d + 1) for s, d in zip(im.shape, depth)]
+    # Every output pixel is computed in the tile containing its (bilinear) sampling position
+    out_bounds = [
+        np.clip(np.ceil((b + 0.5) / f - 0.5), 0, o).astype(int) for b, f, o in zip(in_bounds, factors, output_shape)
+    ]
+    for b, o in zip(out_bounds, output_shape):
+        b[0], b[-1] = 0, o
+
+    def _smooth_and_resize_block(block, block_id=None):
+        i, j = block_id
+        start = (in_bounds[0][i] - (depth[0] if i > 0 else 0), in_bounds[1][j] - (depth[1] if j > 0 else 0))
+        # At the image border, blocks are not extended, so the boundary modes match those of the whole image
+        block = gaussian(block, sigma)
+        if anti_aliasing:
+            block = ndi.gaussian_filter(block, anti_aliasing_sigma, mode="mirror")
+        rows = (np.arange(out_bounds[0][i], out_bounds[0][i + 1]) + 0.5) * factors[0] - 0.5 - start[0]
+        cols = (np.arange(out_bounds[1][j], out_bounds[1][j + 1]) + 0.5) * factors[1] - 0.5 - start[1]
+        return ndi.map_coordinates(block, np.meshgrid(rows, cols, indexing="ij"), order=1, mode="mirror")
+
+    im = da.from_array(im, chunks=tuple(tuple(np.diff(b)) for b in in_bounds))
+    return da.map_overlap(
+        _smooth_and_resize_block,
+        im,
+        depth=depth,
+        boundary="none",
+        trim=False,
+        chunks=tuple(tuple(np.diff(b)) for b in out_bounds),
+        dtype=np.float64,
+    )
+
+
 def show_expression_on_image(points_roi,
-                             render_scale: int = 1, 
+                             render_scale: int = 1,
                              render_sigma: float = 1.5,
-                             output_resolution: float = 1):
-    im_shape = points_roi.max(axis=0)
+                             output_resolution: float = 1,
+                             weights: np.ndarray = None,
+                             chunk_size: int = None):
+    # Points with zero weight are not rendered (the same as repeating every point by its weight)
+    _points = points_roi if weights is None else points_roi[weights > 0]
+    im_shape = _column_max(_points)
 
     gene_im, _, _ = np.histogram2d(points_roi[:, 0], points_roi[:, 1],
-                                   bins=tuple((im_shape * (1/render_scale)).astype(int)))
-    gene_im = gaussian(gene_im, render_sigma)
-    gene_im = resize(gene_im, tuple((im_shape * output_resolution).astype(int)))
-    return gene_im
+                                   bins=tuple((im_shape * (1/render_scale)).astype(int)),
+                                   range=list(zip(_column_min(_points), im_shape)),
+                                   weights=weights)
+    return smooth_and_resize(gene_im, render_sigma, tuple((im_shape * output_resolution).astype(int)), chunk_size)
 
 def create_unpaired_pseudoimage(
     adata,
@@ -158,7 +592,9 @@ def create_unpaired_pseudoimage(
     render_scale: float = 1,
     render_sigma: float = 1.5,
     output_resolution: float = 1,
-    write_rescaled: bool = True
+    write_rescaled: bool = True,
+    use_pyramid: bool = False,
+    chunk_size: int = None,
 ):
     """
     Create pseudoimage for segmentation based on RNA density (experimental feature), i.e.,
@@ -170,9 +606,13 @@ def create_unpaired_pseudoimage(
         shape (tuple): the final shape of the image that will be segmented. Should lead to 1:1 aspect ratio.
         render_scale (float): rescale the coordinates by render_scale for calculating the bin image
         render_sigma (float): apply gaussian smoothing with render_sigma to the rendered pseudoimage.
+        use_pyramid (bool): read the binned image from the (cached) pseudoimage pyramid of the coordinates,
+                            instead of binning them. For visualization; bins are aligned to the closest level.
+        chunk_size (int): if set, smoothing and resizing run on tiles of this size (in bins), and the pseudoimage
+                          is returned as a (lazy) dask array.
 
     Returns:
-        numpy.ndarray: pseudoimage
+        numpy.ndarray: pseudoimage (dask.array.Array, if 'chunk_size' is set)
         numpy.ndarray: transformed points
     """
 
@@ -185,9 +625,22 @@ def create_unpaired_pseudoimage(
         logging.info("'pct_counts_mt' was not found; pseudoimage may contain mitochondrial counts")
 
     marker_filtered = recenter_points(_spatial_coords) * input_resolution
-    marker_filtered_repeat = marker_filtered[np.repeat(np.arange(len(marker_filtered)), _total_counts)]
 
-    pim = show_expression_on_image(marker_filtered_repeat, render_scale, render_sigma, output_resolution)
+    if use_pyramid:
+        _pyramid_name = f"{spatial_coord_key.strip('/').replace('/', '_')}_total_counts"
+        pyramid = load_pseudoimage_pyramid(adata, _pyramid_name, _spatial_coords, _total_counts)
+        im_shape = _column_max(marker_filtered[_total_counts > 0])
+        pim = pyramid.render(
+            render_scale / input_resolution,
+            tuple((im_shape * (1 / render_scale)).astype(int)),
+            _column_min(_spatial_coords),
+        )
+        pim = smooth_and_resize(pim, render_sigma, tuple((im_shape * output_resolution).astype(int)), chunk_size)
+    else:
+        # UMI counts are used as weights of the bins (instead of repeating every coordinate by its counts)
+        pim = show_expression_on_image(
+            marker_filtered, render_scale, render_sigma, output_resolution, _total_counts, chunk_size
+        )
     logging.info(f"Created pseudoimage with {pim.shape} pixels")
 
     marker_filtered_scaled = marker_filtered * output_resolution
@@ -205,6 +658,175 @@ def create_unpaired_pseudoimage(
 
     return pim, marker_filtered_scaled
 
+def parse_gene_sets(genes: list) -> dict:
+    """
+    Parse gene (set) definitions into channels: 'GENE' renders a single gene, and 'NAME=GENE1,GENE2'
+    renders the sum of several genes as the channel 'NAME'.
+
+    Args:
+        genes (list): Gene (set) definitions.
+
+    Returns:
+        dict: Channel name to list of genes, in the order of 'genes'.
+    """
+    gene_sets = {}
+    for g in genes:
+        name, _, members = g.rpartition("=")
+        members = [m.strip() for m in members.split(",") if m.strip() != ""]
+        if len(members) == 0:
+            raise ValueError(f"No genes were specified for '{g}'")
+        gene_sets[name if name != "" else ",".join(members)] = members
+    return gene_sets
+
+
+def _histogram_bins(points: np.ndarray, bins: tuple, lims: list) -> np.ndarray:
+    """Flat bin index of every point, as in `np.histogram2d(..., bins, range=lims)`; -1 for points outside."""
+    flat = np.zeros(len(points), dtype=np.int64)
+    valid = np.ones(len(points), dtype=bool)
+    for i in range(2):
+        edges = np.linspace(lims[i][0], lims[i][1], bins[i] + 1)
+        idx = np.searchsorted(edges, points[:, i], side="right") - 1
+        idx[points[:, i] == edges[-1]] = bins[i] - 1
+        valid &= (idx >= 0) & (idx < bins[i])
+        flat = flat * bins[i] + idx
+    flat[~valid] = -1
+    return flat
+
+
+def rasterize_genes(
+    X,
+    pixels: np.ndarray,
+    membership,
+    n_pixels: int,
+    out: np.ndarray = None,
+    row_offset: int = 0,
+) -> np.ndarray:
+    """
+    Sum the expression of every gene (set) per pixel, in a single pass over the nonzero values of `X`.
+
+    Args:
+        X (scipy.sparse.csr_matrix): Spot-by-gene matrix (or a block of consecutive rows).
+        pixels (np.ndarray): Flat pixel of every spot (-1 for spots that are not rendered).
+        membership (scipy.sparse.csr_matrix): Gene-by-channel matrix, with the weight of every gene in every channel.
+        n_pixels (int): Number of pixels of every channel.
+        out (np.ndarray, optional): (K, n_pixels) float64 accumulator; the sums are added to it.
+        row_offset (int, optional): Index (in 'pixels') of the first row of 'X'.
+
+    Returns:
+        np.ndarray: (K, n_pixels) sums (`out`, if provided).
+    """
+    n_channels = membership.shape[1]
+    if out is None:
+        out = np.zeros((n_channels, n_pixels), dtype=np.float64)
+
+    # Expand every nonzero value of a selected gene into one entry per channel of that gene
+    n_channels_of_gene = np.diff(membership.indptr)
+    rows = np.repeat(np.arange(X.shape[0]) + row_offset, np.diff(X.indptr))
+    keep = n_channels_of_gene[X.indices] > 0
+    keep &= pixels[rows] >= 0
+    rows, genes, values = rows[keep], X.indices[keep], X.data[keep]
+
+    n_entries = n_channels_of_gene[genes]
+    total = n_entries.sum()
+    if total == 0:
+        return out
+    entry_starts = np.repeat(membership.indptr[genes] - (np.cumsum(n_entries) - n_entries), n_entries)
+    entries = entry_starts + np.arange(total)
+
+    flat = membership.indices[entries].astype(np.int64) * n_pixels + np.repeat(pixels[rows], n_entries)
+    weights = np.repeat(values, n_entries) * membership.data[entries]
+    out += np.bincount(flat, weights=weights, minlength=n_channels * n_pixels).reshape(n_channels, n_pixels)
+
+    return out
+
+
+def create_gene_pseudoimages(
+    adata,
+    gene_sets: dict,
+    spatial_coord_key: str = "obsm/spatial",
+    input_resolution: float = 1,
+    render_scale: float = 1,
+    render_sigma: float = 1.5,
+    output_resolution: float = 1,
+    gene_key: str = None,
+    matrix_key: str = "X",
+    chunk_rows: int = 1_000_000,
+) -> np.ndarray:
+    """
+    Create pseudoimages of genes or gene sets, on the same grid as `create_unpaired_pseudoimage`
+    (the transformed coordinates it writes also apply to these). The matrix is read in blocks of rows
+    and never densified.
+
+    Args:
+        adata (h5py.File): Spatial object (opened with h5py).
+        gene_sets (dict): Channel name to list of genes (see `parse_gene_sets`).
+        spatial_coord_key (str): Path to the spatial coordinates.
+        input_resolution (float): Conversion factor from spatial units to micron.
+        render_scale (float): Size of the bins (in microns).
+        render_sigma (float): Gaussian smoothing applied to every channel.
+        output_resolution (float): Resolution of the output pseudoimages.
+        gene_key (str, optional): Column of 'var' with the gene names. The index of 'var' is used if None.
+        matrix_key (str, optional): Path to the spot-by-gene matrix (CSR or dense), e.g., 'X' or 'layers/counts'.
+        chunk_rows (int, optional): Number of spots read at once.
+
+    Returns:
+        np.ndarray: (K, H, W) pseudoimages, one per channel of 'gene_sets'.
+    """
+    from scipy import sparse
+
+    try:
+        from anndata.io import read_elem
+    except ImportError:  # anndata < 0.11
+        from anndata.experimental import read_elem
+
+    var = read_elem(adata["var"])
+    var_names = var.index if gene_key is None else var[gene_key]
+    var_index = pd.Index(var_names.astype(str))
+
+    genes, channels = [], []
+    for k, members in enumerate(gene_sets.values()):
+        _missing = [g for g in members if g not in var_index]
+        if len(_missing) > 0:
+            raise ValueError(f"Genes {_missing} were not found in 'var' of the spatial object")
+        genes += [var_index.get_loc(g) for g in members]
+        channels += [k] * len(members)
+    membership = sparse.csr_matrix(
+        (np.ones(len(genes)), (genes, channels)), shape=(len(var_index), len(gene_sets))
+    )
+
+    # Same bins as the (total counts) pseudoimage of 'create_unpaired_pseudoimage'
+    _total_counts = adata["obs/total_counts"][:]
+    marker_filtered = recenter_points(adata[spatial_coord_key][:]) * input_resolution
+    _points = marker_filtered[_total_counts > 0]
+    im_shape = _column_max(_points)
+    bins = tuple((im_shape * (1 / render_scale)).astype(int))
+    pixels = _histogram_bins(marker_filtered, bins, list(zip(_column_min(_points), im_shape)))
+
+    n_pixels = bins[0] * bins[1]
+    gene_ims = np.zeros((len(gene_sets), n_pixels), dtype=np.float64)
+    X = adata[matrix_key]
+    n_obs = len(pixels)
+    _cols = np.unique(genes)
+    for r0 in range(0, n_obs, chunk_rows):
+        r1 = min(r0 + chunk_rows, n_obs)
+        if isinstance(X, h5py.Dataset):
+            _X = sparse.csr_matrix(X[r0:r1, _cols])
+            _X = sparse.csr_matrix((_X.data, _cols[_X.indices], _X.indptr), shape=(r1 - r0, len(var_index)))
+        else:
+            _indptr = X["indptr"][r0 : r1 + 1]
+            _X = sparse.csr_matrix(
+                (X["data"][_indptr[0] : _indptr[-1]], X["indices"][_indptr[0] : _indptr[-1]], _indptr - _indptr[0]),
+                shape=(r1 - r0, len(var_index)),
+            )
+        rasterize_genes(_X, pixels, membership, n_pixels, gene_ims, r0)
+
+    output_shape = tuple((im_shape * output_resolution).astype(int))
+    pims = np.stack([smooth_and_resize(im.reshape(bins), render_sigma, output_shape) for im in gene_ims])
+    logging.info(f"Created {len(gene_sets)} gene pseudoimages with {output_shape} pixels")
+
+    return pims
+
+
 def _run_pseudoimage_visualizer(args):
     import h5py
     try:
@@ -224,10 +846,25 @@ def _run_pseudoimage_visualizer(args):
                                      args.input_resolution,
                                      args.render_scale,
                                      args.render_sigma,
-                                     args.output_resolution)
+                                     args.output_resolution,
+                                     use_pyramid=True)
     
     viewer = napari.Viewer()
     viewer.add_image(data=im)
+
+    if args.genes is not None:
+        gene_sets = parse_gene_sets(args.genes)
+        gene_ims = create_gene_pseudoimages(adata,
+                                            gene_sets,
+                                            args.spatial_coord_key,
+                                            args.input_resolution,
+                                            args.render_scale,
+                                            args.render_sigma,
+                                            args.output_resolution,
+                                            gene_key=args.gene_key,
+                                            matrix_key=args.matrix_key)
+        viewer.add_image(data=gene_ims, channel_axis=0, name=list(gene_sets.keys()))
+
     napari.run()
 
 if __name__ == "__main__":